@@ -0,0 +1,113 @@
+"""Compare ``/graphql`` on ASGI with ``/graphql/sync`` on WSGI under load.
+
+Both applications are driven in-process, without a server in front: the
+ASGI one by ``--concurrency`` tasks on one event loop, the WSGI one by a
+pool of as many threads.  Every request picks one of a few read queries
+against a seeded throwaway test database::
+
+    python benchmarks/asgi_vs_wsgi.py --requests 2000 --concurrency 1 10 50
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from clients import Response, run_asgi, run_wsgi  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.models import Color, Fruit  # noqa: E402
+
+QUERIES = [
+    "{ fruits(pagination: {limit: 50}) { name color { name } } }",
+    "{ colors(pagination: {limit: 10}) { name fruits { name } } }",
+    "{ color(pk: %d) { name } }",
+    "{ fruit(pk: %d) { name color { name } } }",
+]
+
+
+def seed(colors: int, fruits_per_color: int) -> None:
+    """Create ``colors`` colors with ``fruits_per_color`` fruits each."""
+    for i in range(colors):
+        color = Color.objects.create(name=f"color{i}")
+        Fruit.objects.bulk_create(
+            Fruit(name=f"fruit{i}-{j}", color=color) for j in range(fruits_per_color)
+        )
+
+
+def bodies(count: int, seed_value: int = 0) -> list[bytes]:
+    """Return ``count`` request bodies drawn from :data:`QUERIES`."""
+    rng = random.Random(seed_value)
+    color_pks = list(Color.objects.values_list("pk", flat=True))
+    fruit_pks = list(Fruit.objects.values_list("pk", flat=True))
+    result = []
+    for _ in range(count):
+        query = rng.choice(QUERIES)
+        if "color(pk" in query:
+            query %= rng.choice(color_pks)
+        elif "fruit(pk" in query:
+            query %= rng.choice(fruit_pks)
+        result.append(json.dumps({"query": query}).encode())
+    return result
+
+
+def measure(
+    runner: Callable[[str, list[bytes], int], list[Response]],
+    path: str,
+    requests: list[bytes],
+    concurrency: int,
+) -> tuple[float, float, float]:
+    """Return requests per second, p50 and p99 latency in milliseconds."""
+    start = time.perf_counter()
+    latencies = [latency for latency, _ in runner(path, requests, concurrency)]
+    elapsed = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100)
+    return len(requests) / elapsed, percentiles[49] * 1000, percentiles[98] * 1000
+
+
+def main() -> None:
+    """Print throughput and latency of both applications per concurrency."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--colors", type=int, default=100)
+    parser.add_argument("--fruits-per-color", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.colors, args.fruits_per_color)
+        requests = bodies(args.requests)
+        # Warm up the document caches and the URL resolver.
+        run_asgi("/graphql", requests[:20], 1)
+        run_wsgi("/graphql/sync", requests[:20], 1)
+        print(
+            f"{'conc':>5} {'app':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}",
+        )
+        for concurrency in args.concurrency:
+            for name, runner, path in [
+                ("asgi", run_asgi, "/graphql"),
+                ("wsgi", run_wsgi, "/graphql/sync"),
+            ]:
+                rps, p50, p99 = measure(runner, path, requests, concurrency)
+                print(f"{concurrency:>5} {name:>5} {rps:>9.0f} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compare the bulk list mutations with strawberry-django's row-by-row ones.
+
+Runs the stock ``createFruits``, ``updateFruits`` and ``deleteFruits`` for
+each size, then their ``bulk`` counterparts, on a throwaway test database::
+
+    python benchmarks/bulk_mutations.py --sizes 100 1000 10000
+"""
+
+import argparse
+import os
+import time
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.context import Context  # noqa: E402
+from envision.core.models import Color  # noqa: E402
+from envision.core.schema import schema  # noqa: E402
+
+STOCK = {"create": "createFruits", "update": "updateFruits", "delete": "deleteFruits"}
+BULK = {step: f"bulk{field[0].upper()}{field[1:]}" for step, field in STOCK.items()}
+
+CREATE = """
+    mutation Create($data: [FruitInput!]!) { %s(data: $data) { id } }
+"""
+UPDATE = """
+    mutation Update($color: ID!) {
+        %s(
+            filters: {color: {name: {exact: "red"}}}
+            data: {name: "renamed", color: {set: $color}}
+        ) { id }
+    }
+"""
+DELETE = """
+    mutation { %s(filters: {color: {name: {exact: "blue"}}}) { id } }
+"""
+
+
+def execute(query: str, variables: dict[str, Any]) -> float:
+    """Run ``query`` and return the elapsed seconds."""
+    context = Context(
+        request=RequestFactory().post("/graphql"),
+        response=HttpResponse(),
+    )
+    start = time.perf_counter()
+    result = schema.execute_sync(query, variables, context_value=context)
+    elapsed = time.perf_counter() - start
+    if result.errors:
+        raise RuntimeError(result.errors)
+    return elapsed
+
+
+def run(fields: dict[str, str], size: int) -> dict[str, float]:
+    """Create, update and delete ``size`` fruits, timing each step."""
+    red = Color.objects.create(name="red")
+    blue = Color.objects.create(name="blue")
+    data = [{"name": f"fruit{i}", "color": {"set": red.pk}} for i in range(size)]
+    timings = {
+        "create": execute(CREATE % fields["create"], {"data": data}),
+        "update": execute(UPDATE % fields["update"], {"color": blue.pk}),
+        "delete": execute(DELETE % fields["delete"], {}),
+    }
+    Color.objects.all().delete()
+    return timings
+
+
+def main() -> None:
+    """Print per-step timings of both code paths for every size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(f"{'rows':>8} {'step':>7} {'stock s':>9} {'bulk s':>9} {'speedup':>8}")
+        for size in args.sizes:
+            stock = run(STOCK, size)
+            bulk = run(BULK, size)
+            for step, seconds in stock.items():
+                print(
+                    f"{size:>8} {step:>7} {seconds:>9.3f} {bulk[step]:>9.3f}"
+                    f" {seconds / bulk[step]:>7.1f}x",
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
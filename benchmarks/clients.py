@@ -0,0 +1,125 @@
+"""In-process HTTP clients for the ASGI and WSGI applications.
+
+Requests are handed straight to ``envision.asgi.application`` and
+``envision.wsgi.application``, so the numbers include Django's request
+handling and the GraphQL views but no server or network.  Import this
+after ``django.setup()``.
+"""
+
+import asyncio
+import io
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from envision.asgi import application as asgi_application
+from envision.wsgi import application as wsgi_application
+
+HOST = "testserver"
+
+Response = tuple[float, bytes]
+"""Latency in seconds and body of one request."""
+
+
+async def asgi_post(path: str, body: bytes) -> Response:
+    """POST a JSON ``body`` to ``path`` on the ASGI application."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [
+            (b"host", HOST.encode()),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": (HOST, 80),
+    }
+    status = 0
+    chunks: list[bytes] = []
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    done = asyncio.Event()
+
+    async def receive() -> dict[str, Any]:
+        if messages:
+            return messages.pop()
+        # Django waits for a disconnect while the view runs.
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Mapping[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            return
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            done.set()
+
+    start = time.perf_counter()
+    await asgi_application(scope, receive, send)
+    elapsed = time.perf_counter() - start
+    if status != 200:
+        raise RuntimeError(status)
+    return elapsed, b"".join(chunks)
+
+
+def wsgi_post(path: str, body: bytes) -> Response:
+    """POST a JSON ``body`` to ``path`` on the WSGI application."""
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": HOST,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": HOST,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.url_scheme": "http",
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    statuses = []
+
+    def start_response(status: str, headers: list[Any], *args: Any) -> None:
+        statuses.append(status)
+
+    start = time.perf_counter()
+    response = wsgi_application(environ, start_response)  # type: ignore[arg-type]
+    content = b"".join(response)
+    response.close()
+    elapsed = time.perf_counter() - start
+    if not statuses[0].startswith("200"):
+        raise RuntimeError(statuses[0])
+    return elapsed, content
+
+
+def run_asgi(path: str, bodies: list[bytes], concurrency: int) -> list[Response]:
+    """Send ``bodies`` to the ASGI application, ``concurrency`` at a time."""
+
+    async def main() -> list[Response]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(body: bytes) -> Response:
+            async with semaphore:
+                return await asgi_post(path, body)
+
+        return await asyncio.gather(*(bounded(body) for body in bodies))
+
+    return asyncio.run(main())
+
+
+def run_wsgi(path: str, bodies: list[bytes], concurrency: int) -> list[Response]:
+    """Send ``bodies`` to the WSGI application from ``concurrency`` threads."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda body: wsgi_post(path, body), bodies))
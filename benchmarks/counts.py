@@ -0,0 +1,100 @@
+"""Time counting fruits per color against loading them to count.
+
+Seeds ``--colors`` colors with ``--fruits-per-color`` fruits each in a
+throwaway test database and lists every color with the number of its
+fruits: by selecting ``fruits { id }``, through the ``fruitCount``
+annotation and from the ``fruit_count`` counter column::
+
+    python benchmarks/counts.py --colors 200 --fruits-per-color 1000
+"""
+
+import argparse
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.context import Context  # noqa: E402
+from envision.core.models import Color, Fruit  # noqa: E402
+from envision.core.schema import schema  # noqa: E402
+
+LIST = "{ colors(pagination: {limit: 1000}) { name fruits { id } } }"
+COUNT = "{ colors(pagination: {limit: 1000}) { name fruitCount } }"
+
+
+def seed(colors: int, per_color: int) -> None:
+    """Create ``colors`` colors with ``per_color`` fruits each."""
+    Color.objects.bulk_create(Color(name=f"color{i}") for i in range(colors))
+    for color_pk in Color.objects.values_list("pk", flat=True):
+        Fruit.objects.bulk_create(
+            (Fruit(name=f"fruit{i}", color_id=color_pk) for i in range(per_color)),
+            batch_size=10_000,
+        )
+
+
+def execute(query: str, repeat: int) -> tuple[float, int]:
+    """Return the best time of ``repeat`` runs and the response size."""
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        context = Context(
+            request=RequestFactory().post("/graphql"),
+            response=HttpResponse(),
+        )
+        start = time.perf_counter()
+        result = schema.execute_sync(query, context_value=context)
+        size = len(json.dumps(result.data))
+        best = min(best, time.perf_counter() - start)
+        if result.errors:
+            raise RuntimeError(result.errors)
+    return best, size
+
+
+def main() -> None:
+    """Print the best time and response size of each strategy."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--colors", type=int, default=200)
+    parser.add_argument("--fruits-per-color", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.colors, args.fruits_per_color)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        # Listing every fruit is exactly what the cost budgets reject.
+        with override_settings(
+            GRAPHQL_MAX_QUERY_COST=None,
+            GRAPHQL_MAX_BATCH_COST=None,
+        ):
+            results = {
+                "fruits { id }": execute(LIST, args.repeat),
+                "fruitCount": execute(COUNT, args.repeat),
+            }
+            with override_settings(GRAPHQL_COUNTER_COLUMNS=True):
+                results["fruitCount (column)"] = execute(COUNT, args.repeat)
+
+        print(f"{'selection':<20} {'ms':>9} {'bytes':>10}")
+        for name, (seconds, size) in results.items():
+            print(f"{name:<20} {seconds * 1000:>9.2f} {size:>10}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
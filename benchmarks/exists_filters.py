@@ -0,0 +1,95 @@
+"""Compare ``ColorFilter.fruits`` as EXISTS with the JOIN it replaces.
+
+Seeds ``--colors`` colors with ``--fruits-per-color`` fruits each in a
+throwaway test database, then filters colors by their fruits three ways:
+the plain JOIN (one row per matching fruit), the JOIN with ``DISTINCT``
+and the ``EXISTS`` subquery the filter now compiles to::
+
+    python benchmarks/exists_filters.py --colors 200 --fruits-per-color 1000
+"""
+
+import argparse
+import os
+import time
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import QuerySet  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.exporter import filter_queryset  # noqa: E402
+from envision.core.models import Color, Fruit  # noqa: E402
+
+# Name lookups selecting one, about a tenth and all of the fruits.
+LOOKUPS = {
+    "one fruit": {"exact": "fruit1234"},
+    "a tenth": {"startsWith": "fruit1"},
+    "every fruit": {"startsWith": "fruit"},
+}
+
+DJANGO_LOOKUPS = {"exact": "name", "startsWith": "name__startswith"}
+
+
+def seed(colors: int, per_color: int) -> None:
+    """Create ``colors`` colors with ``per_color`` fruits each."""
+    Color.objects.bulk_create(Color(name=f"color{i}") for i in range(colors))
+    for color_pk in Color.objects.values_list("pk", flat=True):
+        Fruit.objects.bulk_create(
+            (Fruit(name=f"fruit{i}", color_id=color_pk) for i in range(per_color)),
+            batch_size=10_000,
+        )
+
+
+def measure(queryset: QuerySet[Any], repeat: int) -> tuple[float, int]:
+    """Return the best time of ``repeat`` evaluations and the rows fetched."""
+    best, rows = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(list(queryset.values_list("pk", "name")))
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main() -> None:
+    """Print rows fetched and the best time of each strategy per lookup."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--colors", type=int, default=200)
+    parser.add_argument("--fruits-per-color", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.colors, args.fruits_per_color)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        print(f"{'lookup':<12} {'strategy':<15} {'rows':>8} {'ms':>9}")
+        for label, lookup in LOOKUPS.items():
+            ((name, value),) = lookup.items()
+            join = Color.objects.filter(**{f"fruits__{DJANGO_LOOKUPS[name]}": value})
+            filters = {"fruits": {"name": lookup, "color": {}}}
+            strategies = {
+                "join": join,
+                "join distinct": join.distinct(),
+                "exists": filter_queryset(Color, filters),
+            }
+            for strategy, queryset in strategies.items():
+                seconds, rows = measure(queryset, args.repeat)
+                print(f"{label:<12} {strategy:<15} {rows:>8} {seconds * 1000:>9.2f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
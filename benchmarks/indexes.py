@@ -0,0 +1,172 @@
+"""Time name lookups and sorts with and without their indexes.
+
+Seeds ``--rows`` fruits over ``--colors`` colors in a throwaway test
+database, runs each query through the schema with the indexes in place,
+drops them and runs the queries again over table scans::
+
+    python benchmarks/indexes.py --rows 200000 --colors 100000
+
+A request costs about a millisecond before it reads any row, so the
+color rows only show their index with many colors: at 1000, both ways
+take as long.  The ``search`` row compares the FTS5 ``search`` filter
+with the ``iContains`` filter it replaces, which no B-tree index can
+serve.
+"""
+
+import argparse
+import os
+import time
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.context import Context  # noqa: E402
+from envision.core.models import Color, Fruit  # noqa: E402
+from envision.core.schema import schema  # noqa: E402
+
+QUERIES = {
+    "fruit name exact": """
+        query ($name: String!) {
+            fruits(filters: {name: {exact: $name}, color: {}}) { id }
+        }
+    """,
+    "fruits by name": """
+        { fruits(ordering: [{name: ASC}], pagination: {limit: 20}) { name } }
+    """,
+    "color fruits by name": """
+        query ($color: ID!) {
+            fruits(
+                filters: {color: {id: {exact: $color}}}
+                ordering: [{name: ASC}]
+                pagination: {limit: 20}
+            ) { name }
+        }
+    """,
+    "color name exact": """
+        query ($colorName: String!) {
+            colors(filters: {name: {exact: $colorName}}) { id }
+        }
+    """,
+    "colors by name": """
+        { colors(ordering: [{name: ASC}], pagination: {limit: 20}) { name } }
+    """,
+}
+
+SEARCH = """
+    query ($search: String!) {
+        fruits(filters: {search: $search, color: {}}) { name }
+    }
+"""
+CONTAINS = """
+    query ($search: String!) {
+        fruits(filters: {name: {iContains: $search}, color: {}}) { name }
+    }
+"""
+
+
+def seed(rows: int, colors: int) -> None:
+    """Create ``rows`` fruits spread over ``colors`` colors."""
+    Color.objects.bulk_create(Color(name=f"color{i}") for i in range(colors))
+    color_pks = list(Color.objects.order_by("pk").values_list("pk", flat=True))
+    batch = 10_000
+    for start in range(0, rows, batch):
+        Fruit.objects.bulk_create(
+            Fruit(name=f"fruit{i}", color_id=color_pks[i % len(color_pks)])
+            for i in range(start, min(start + batch, rows))
+        )
+
+
+def execute(query: str, variables: dict[str, Any], repeat: int) -> tuple[float, str]:
+    """Return the best time of ``repeat`` runs and the plan of the last one."""
+    best = float("inf")
+    for _ in range(repeat):
+        context = Context(
+            request=RequestFactory().post("/graphql"),
+            response=HttpResponse(),
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            result = schema.execute_sync(query, variables, context_value=context)
+            best = min(best, time.perf_counter() - start)
+        if result.errors:
+            raise RuntimeError(result.errors)
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {ctx.captured_queries[-1]['sql']}")
+        plan = "; ".join(row[-1] for row in cursor.fetchall())
+    return best, plan
+
+
+def set_indexes(enabled: bool) -> None:
+    """Create or drop the indexes declared on the models."""
+    with connection.schema_editor() as editor:
+        for model in [Fruit, Color]:
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+
+
+def main() -> None:
+    """Print the best time of every query over indexes and over scans."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--colors", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.rows, args.colors)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        middle = args.rows // 2
+        variables = {
+            "name": f"fruit{middle}",
+            "color": Color.objects.order_by("pk").values_list("pk", flat=True)[
+                args.colors // 2
+            ],
+            "colorName": f"color{args.colors // 2}",
+            "search": f"fruit{middle // 10}",
+        }
+
+        indexed = {
+            name: execute(query, variables, args.repeat)
+            for name, query in QUERIES.items()
+        }
+        indexed["search"] = execute(SEARCH, variables, args.repeat)
+        set_indexes(enabled=False)
+        scanned = {
+            name: execute(query, variables, args.repeat)
+            for name, query in QUERIES.items()
+        }
+        scanned["search"] = execute(CONTAINS, variables, args.repeat)
+
+        print(f"{'query':<22} {'index ms':>9} {'scan ms':>9} {'speedup':>8}  plan")
+        for name, (seconds, plan) in indexed.items():
+            scan_seconds, scan_plan = scanned[name]
+            print(
+                f"{name:<22} {seconds * 1000:>9.2f} {scan_seconds * 1000:>9.2f}"
+                f" {scan_seconds / seconds:>7.1f}x  {plan}",
+            )
+            print(f"{'':<51}  {scan_plan}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time JSON encoding and decoding of GraphQL responses by size.
+
+Builds ``data.fruits`` responses of 1 KB up to 50 MB from a cycle of
+fruit rows and times strawberry's default encoder, then each codec of
+:data:`envision.core.encoding.CODECS` in both directions::
+
+    python benchmarks/json_encoding.py --repeat 5
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.core.serializers.json import DjangoJSONEncoder  # noqa: E402
+
+from envision.core import encoding  # noqa: E402
+
+SIZES = {
+    "1KB": 2**10,
+    "100KB": 100 * 2**10,
+    "1MB": 2**20,
+    "10MB": 10 * 2**20,
+    "50MB": 50 * 2**20,
+}
+
+
+def response(size: int) -> dict[str, Any]:
+    """Return a response of about ``size`` bytes once encoded."""
+    rows = (
+        {
+            "id": str(i),
+            "name": f"fruit {i} açaí",
+            "color": {"id": str(i % 20), "name": f"color {i % 20}"},
+        }
+        for i in itertools.count()
+    )
+    fruits, total = [], 20
+    for row in rows:
+        if total >= size:
+            break
+        fruits.append(row)
+        total += len(encoding.CODECS["json"].dumps(row)) + 1
+    return {"data": {"fruits": fruits}}
+
+
+def best(function: Callable[[Any], Any], value: Any, repeat: int) -> float:
+    """Return the fastest of ``repeat`` calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(value)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    """Print encode and decode times of each codec for every size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    encoders: dict[str, Callable[[Any], Any]] = {
+        # What strawberry's view did: a ``str`` encoded again by Django.
+        "default": lambda data: json.dumps(data, cls=DjangoJSONEncoder).encode(),
+        **{name: codec.dumps for name, codec in encoding.CODECS.items()},
+    }
+    print(f"{'size':<6} {'codec':<8} {'dumps ms':>9} {'loads ms':>9} {'bytes':>10}")
+    for label, size in SIZES.items():
+        data = response(size)
+        for name, dumps in encoders.items():
+            encoded = dumps(data)
+            loads = encoding.CODECS.get(name, encoding.CODECS["json"]).loads
+            print(
+                f"{label:<6} {name:<8} {best(dumps, data, args.repeat):>9.2f} "
+                f"{best(loads, encoded, args.repeat):>9.2f} {len(encoded):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
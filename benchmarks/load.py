@@ -0,0 +1,418 @@
+"""Replay a mixed GraphQL workload and write the measurements as JSON.
+
+For every dataset size, the throwaway test database is topped up to that
+many fruits spread over ``--colors`` colors.  ``--requests`` operations
+drawn from :data:`OPERATIONS` are then sent to ``/graphql`` (ASGI) and
+``/graphql/sync`` (WSGI) at each concurrency level::
+
+    python benchmarks/load.py --rows 1000 100000 1000000 --output base.json
+    python benchmarks/load.py --compare base.json head.json
+
+Each scenario records req/s, p50/p95/p99 latency, SQL statements per
+request and the peak RSS of the process so far, overall and per
+operation.  ``--compare`` prints the change between two such files.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from clients import Response, run_asgi, run_wsgi  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.backends.base.base import BaseDatabaseWrapper  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.models import Color, Fruit  # noqa: E402
+
+Runner = Callable[[str, list[bytes], int], list[Response]]
+
+APPS: dict[str, tuple[Runner, str]] = {
+    "asgi": (run_asgi, "/graphql"),
+    "wsgi": (run_wsgi, "/graphql/sync"),
+}
+
+
+@dataclass(frozen=True)
+class Operation:
+    """One kind of request in the mix, with its relative weight."""
+
+    name: str
+    weight: int
+    query: str
+    variables: Callable[[random.Random, int, int], dict[str, Any]]
+
+
+OPERATIONS = [
+    Operation(
+        "fruit_by_pk",
+        20,
+        "query ($pk: ID!) { fruit(pk: $pk) { name color { name } } }",
+        lambda rng, rows, colors: {"pk": rng.randint(1, rows)},
+    ),
+    Operation(
+        "fruits_filtered",
+        20,
+        """
+        query ($color: String!) {
+            fruits(
+                filters: {color: {name: {exact: $color}}}
+                ordering: {name: ASC}
+                pagination: {limit: 20}
+            ) { name color { name } }
+        }
+        """,
+        lambda rng, rows, colors: {"color": f"color{rng.randrange(colors)}"},
+    ),
+    Operation(
+        "fruits_deep_page",
+        10,
+        """
+        query ($offset: Int!) {
+            fruits(pagination: {offset: $offset, limit: 20}) { name }
+        }
+        """,
+        lambda rng, rows, colors: {"offset": rng.randrange(max(rows - 20, 1))},
+    ),
+    Operation(
+        "fruits_connection",
+        10,
+        """
+        {
+            fruitsConnection(first: 20, ordering: {name: ASC}) {
+                edges { cursor node { name } }
+            }
+        }
+        """,
+        lambda rng, rows, colors: {},
+    ),
+    Operation(
+        "colors_nested",
+        20,
+        """
+        {
+            colors(pagination: {limit: 10}) {
+                name
+                fruits(pagination: {limit: 5}) { name color { name } }
+            }
+        }
+        """,
+        lambda rng, rows, colors: {},
+    ),
+    Operation(
+        "create_fruit",
+        10,
+        """
+        mutation ($color: ID!) {
+            createFruit(data: {name: "created", color: {set: $color}}) { id }
+        }
+        """,
+        lambda rng, rows, colors: {"color": rng.randint(1, colors)},
+    ),
+    Operation(
+        "update_fruits",
+        10,
+        """
+        mutation ($pk: ID!) {
+            updateFruits(
+                filters: {id: {exact: $pk}, color: {}}
+                data: {name: "updated"}
+            ) { id }
+        }
+        """,
+        lambda rng, rows, colors: {"pk": rng.randint(1, rows)},
+    ),
+]
+
+
+class QueryCounter:
+    """Count SQL statements on every connection, across threads."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, execute: Any, sql: str, params: Any, many: bool, context: Any
+    ) -> Any:
+        """Count the statement and run it."""
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(
+        self, sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+    ) -> None:
+        """Add the counter to a newly opened connection."""
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def seed(rows: int, colors: int) -> None:
+    """Top the database up to ``rows`` fruits spread over ``colors`` colors."""
+    Color.objects.bulk_create(
+        Color(name=f"color{i}") for i in range(Color.objects.count(), colors)
+    )
+    color_pks = list(Color.objects.order_by("pk").values_list("pk", flat=True))
+    existing = Fruit.objects.count()
+    batch = 10_000
+    for start in range(existing, rows, batch):
+        Fruit.objects.bulk_create(
+            Fruit(name=f"fruit{i}", color_id=color_pks[i % len(color_pks)])
+            for i in range(start, min(start + batch, rows))
+        )
+
+
+def workload(
+    count: int,
+    rows: int,
+    colors: int,
+    seed_value: int,
+) -> list[tuple[str, bytes]]:
+    """Return ``count`` operation names and request bodies."""
+    rng = random.Random(seed_value)
+    weights = [operation.weight for operation in OPERATIONS]
+    return [
+        (
+            operation.name,
+            json.dumps(
+                {
+                    "query": operation.query,
+                    "variables": operation.variables(rng, rows, colors),
+                },
+            ).encode(),
+        )
+        for operation in rng.choices(OPERATIONS, weights, k=count)
+    ]
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    """Return p50, p95 and p99 of ``latencies`` in milliseconds."""
+    if len(latencies) < 2:
+        latencies = latencies * 2
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 3),
+        "p95": round(cuts[94] * 1000, 3),
+        "p99": round(cuts[98] * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MiB."""
+    # ``ru_maxrss`` is in KiB on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def sql_per_operation(app: str, counter: QueryCounter) -> dict[str, int]:
+    """Return the SQL statements one request of each operation runs."""
+    runner, path = APPS[app]
+    result = {}
+    for name, body in workload(len(OPERATIONS) * 50, 1, 1, 0):
+        if name in result:
+            continue
+        before = counter.count
+        runner(path, [body], 1)
+        result[name] = counter.count - before
+    return result
+
+
+def scenario(
+    app: str,
+    requests: list[tuple[str, bytes]],
+    concurrency: int,
+    counter: QueryCounter,
+) -> dict[str, Any]:
+    """Send ``requests`` to ``app`` and return its measurements."""
+    runner, path = APPS[app]
+    before = counter.count
+    start = time.perf_counter()
+    responses = runner(path, [body for _, body in requests], concurrency)
+    elapsed = time.perf_counter() - start
+    queries = counter.count - before
+
+    by_operation: dict[str, list[float]] = {}
+    errors = 0
+    for (name, _), (latency, content) in zip(requests, responses, strict=True):
+        by_operation.setdefault(name, []).append(latency)
+        errors += "errors" in json.loads(content)
+    return {
+        "app": app,
+        "concurrency": concurrency,
+        "requests": len(requests),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(requests) / elapsed, 1),
+        "latency_ms": percentiles([latency for latency, _ in responses]),
+        "sql_per_request": round(queries / len(requests), 2),
+        "peak_rss_mb": peak_rss_mb(),
+        "operations": {
+            name: {"count": len(latencies), "latency_ms": percentiles(latencies)}
+            for name, latencies in sorted(by_operation.items())
+        },
+    }
+
+
+def metadata(args: argparse.Namespace) -> dict[str, Any]:
+    """Describe the environment, so runs can be told apart."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "started": datetime.now(UTC).isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "colors": args.colors,
+        "seed": args.seed,
+    }
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every scenario and return the report."""
+    counter = QueryCounter()
+    connection_created.connect(counter.install)
+    connection.ensure_connection()
+    counter.install(None, connection)
+
+    report: dict[str, Any] = {"meta": metadata(args), "datasets": []}
+    for rows in sorted(args.rows):
+        start = time.perf_counter()
+        seed(rows, args.colors)
+        dataset: dict[str, Any] = {
+            "rows": rows,
+            "seed_seconds": round(time.perf_counter() - start, 3),
+            "sql_per_operation": {},
+            "scenarios": [],
+        }
+        requests = workload(args.requests, rows, args.colors, args.seed)
+        for app in args.apps:
+            # Warm up the document caches and the URL resolver.
+            APPS[app][0](APPS[app][1], [body for _, body in requests[:20]], 1)
+            dataset["sql_per_operation"][app] = sql_per_operation(app, counter)
+            for concurrency in args.concurrency:
+                result = scenario(app, requests, concurrency, counter)
+                dataset["scenarios"].append(result)
+                print(
+                    f"{rows:>9} {app:>5} {concurrency:>5}"
+                    f" {result['rps']:>9.1f}"
+                    f" {result['latency_ms']['p50']:>8.2f}"
+                    f" {result['latency_ms']['p95']:>8.2f}"
+                    f" {result['latency_ms']['p99']:>8.2f}"
+                    f" {result['sql_per_request']:>6.2f}"
+                    f" {result['peak_rss_mb']:>8.1f}",
+                )
+        report["datasets"].append(dataset)
+    return report
+
+
+def compare(baseline_path: Path, candidate_path: Path) -> None:
+    """Print req/s and p99 of two reports side by side."""
+    baseline = json.loads(baseline_path.read_text())
+    candidate = json.loads(candidate_path.read_text())
+
+    def scenarios(report: dict[str, Any]) -> dict[tuple[int, str, int], Any]:
+        return {
+            (dataset["rows"], result["app"], result["concurrency"]): result
+            for dataset in report["datasets"]
+            for result in dataset["scenarios"]
+        }
+
+    before, after = scenarios(baseline), scenarios(candidate)
+    print(
+        f"{'rows':>9} {'app':>5} {'conc':>5} {'req/s':>17} {'delta':>7}"
+        f" {'p99 ms':>17} {'delta':>7}",
+    )
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        old_p99, new_p99 = old["latency_ms"]["p99"], new["latency_ms"]["p99"]
+        print(
+            f"{key[0]:>9} {key[1]:>5} {key[2]:>5}"
+            f" {old['rps']:>8.1f} {new['rps']:>8.1f}"
+            f" {(new['rps'] / old['rps'] - 1) * 100:>+6.1f}%"
+            f" {old_p99:>8.2f} {new_p99:>8.2f}"
+            f" {(new_p99 / old_p99 - 1) * 100:>+6.1f}%",
+        )
+
+
+def main() -> None:
+    """Run the suite, or compare two earlier runs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--colors", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10])
+    parser.add_argument(
+        "--apps", nargs="+", choices=sorted(APPS), default=["asgi", "wsgi"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("load.json"))
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs=2,
+        metavar=("BASELINE", "CANDIDATE"),
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    setup_test_environment()
+    directory = tempfile.TemporaryDirectory()
+    if connection.vendor == "sqlite":
+        # The shared in-memory test database fails concurrent writers with
+        # "table is locked"; a database file in WAL mode, with transactions
+        # taking the write lock up front, waits for the lock instead.
+        path = Path(directory.name) / "load.sqlite3"
+        connection.settings_dict["TEST"]["NAME"] = str(path)
+        connection.settings_dict["OPTIONS"].update(
+            init_command="PRAGMA journal_mode=WAL;",
+            transaction_mode="IMMEDIATE",
+        )
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        print(
+            f"{'rows':>9} {'app':>5} {'conc':>5} {'req/s':>9} {'p50 ms':>8}"
+            f" {'p95 ms':>8} {'p99 ms':>8} {'sql':>6} {'rss MiB':>8}",
+        )
+        report = run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        directory.cleanup()
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Time queries served while a burst of users registers.
+
+Fires ``--signups`` concurrent ``register`` mutations at the async
+endpoint in a throwaway test database and, until they are all answered,
+times ``{ colors { name } }`` one request after another.  Runs once
+without registrations, once hashing inline on the database thread
+(``GRAPHQL_PASSWORD_WORKERS = 0``) and once on the hashing pool::
+
+    python benchmarks/registration.py --signups 10 --workers 2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import AsyncClient, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core import passwords  # noqa: E402
+from envision.core.models import Color  # noqa: E402
+
+QUERY = json.dumps({"query": "{ colors { name } }"})
+REGISTER = """
+    mutation ($input: UserInput!) {
+        register(data: $input) { username }
+    }
+"""
+
+usernames = (f"user{i}" for i in itertools.count())
+
+
+def percentile(values: list[float], q: int) -> float:
+    """Return the nearest-rank ``q``-th percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * q // 100) - 1)]
+
+
+async def post(client: AsyncClient, body: str) -> dict[str, object]:
+    """Post ``body`` to the async endpoint and return the decoded response."""
+    response = await client.post("/graphql", data=body, content_type="application/json")
+    return response.json()  # type: ignore[no-any-return]
+
+
+async def signup(client: AsyncClient) -> bool:
+    """Register a new user and return whether it was accepted."""
+    username = next(usernames)
+    variables = {
+        "input": {
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "analytical-engine",
+        }
+    }
+    result = await post(client, json.dumps({"query": REGISTER, "variables": variables}))
+    return result.get("data") is not None
+
+
+async def burst(signups: int, queries: int) -> tuple[list[float], float, int]:
+    """Time queries until ``signups`` registrations finish.
+
+    Returns the latencies, at least ``queries`` of them, the time until
+    the last registration was answered and how many were refused.
+    """
+    client = AsyncClient()
+    start = time.perf_counter()
+    registrations = asyncio.gather(*(signup(client) for _ in range(signups)))
+    registrations.add_done_callback(lambda _: finished.append(time.perf_counter()))
+    finished: list[float] = []
+    latencies: list[float] = []
+    while not registrations.done() or len(latencies) < queries:
+        sent = time.perf_counter()
+        result = await post(client, QUERY)
+        latencies.append(time.perf_counter() - sent)
+        if "errors" in result:
+            raise RuntimeError(result["errors"])
+    accepted = await registrations
+    return latencies, finished[0] - start, accepted.count(False)
+
+
+def main() -> None:
+    """Print query latency percentiles during each kind of burst."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signups", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=50, help="when idle")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        Color.objects.bulk_create(Color(name=f"color{i}") for i in range(20))
+        # Only queries sent while registrations are pending are timed.
+        runs = {
+            "idle": (0, 0, args.queries),
+            "inline": (args.signups, 0, 1),
+            "pool": (args.signups, args.workers, 1),
+        }
+        results = {}
+        for name, (signups, workers, queries) in runs.items():
+            passwords._reset()
+            with override_settings(
+                GRAPHQL_PASSWORD_WORKERS=workers,
+                GRAPHQL_PASSWORD_QUEUE=args.queue,
+            ):
+                results[name] = asyncio.run(burst(signups, queries))
+
+        print(
+            f"{'hashing':<8} {'queries':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'max ms':>8} {'burst ms':>9} {'refused':>8}"
+        )
+        for name, (latencies, seconds, refused) in results.items():
+            p50, p95 = (percentile(latencies, q) * 1000 for q in (50, 95))
+            print(
+                f"{name:<8} {len(latencies):>8} {p50:>8.2f} {p95:>8.2f} "
+                f"{max(latencies) * 1000:>8.2f} {seconds * 1000:>9.2f} {refused:>8}"
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
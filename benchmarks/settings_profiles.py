@@ -0,0 +1,135 @@
+"""Compare concurrent read/write throughput of the base and production settings.
+
+Each profile runs in a child process against its own SQLite test database
+file, seeded with ``--colors`` colors of ``--fruits-per-color`` fruits.
+``--concurrency`` threads send ``--requests`` requests to the WSGI
+application, a ``--write-ratio`` share of them ``createColor`` mutations
+and the rest read queries.  GraphQL errors, such as ``database is
+locked``, are counted instead of stopping the run::
+
+    python benchmarks/settings_profiles.py --requests 2000 --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROFILES = ["base", "production"]
+
+READS = [
+    "{ fruits(pagination: {limit: 50}) { name color { name } } }",
+    "{ colors(pagination: {limit: 10}) { name fruits { name } } }",
+]
+WRITE = 'mutation { createColor(data: {name: "new%d"}) { name } }'
+
+
+def bodies(count: int, write_ratio: float) -> list[bytes]:
+    """Return ``count`` request bodies, ``write_ratio`` of them mutations."""
+    rng = random.Random(0)
+    result = []
+    for i in range(count):
+        query = WRITE % i if rng.random() < write_ratio else rng.choice(READS)
+        result.append(json.dumps({"query": query}).encode())
+    return result
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Return the nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def child(args: argparse.Namespace) -> None:
+    """Run the workload under ``args.profile`` and print its result as JSON."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = f"envision.settings.{args.profile}"
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    os.environ.setdefault("DJANGO_ALLOWED_HOSTS", "testserver")
+    import django
+
+    django.setup()
+
+    from clients import wsgi_post
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from envision.core.models import Color, Fruit
+
+    def send(body: bytes) -> tuple[float, bool]:
+        try:
+            latency, content = wsgi_post("/graphql/sync", body)
+        except RuntimeError:
+            return 0.0, False
+        return latency, b'"errors"' not in content
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        # WAL only applies to files; test databases are in memory otherwise.
+        connection.settings_dict["TEST"]["NAME"] = str(Path(directory) / "db.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            for i in range(args.colors):
+                color = Color.objects.create(name=f"color{i}")
+                Fruit.objects.bulk_create(
+                    Fruit(name=f"fruit{i}-{j}", color=color)
+                    for j in range(args.fruits_per_color)
+                )
+            requests = bodies(args.requests, args.write_ratio)
+            connection.close()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                results = list(pool.map(send, requests))
+            elapsed = time.perf_counter() - start
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+    latencies = [latency for latency, ok in results if ok]
+    print(
+        json.dumps(
+            {
+                "rps": len(latencies) / elapsed,
+                "errors": len(results) - len(latencies),
+                "p50": percentile(latencies, 0.5) * 1000,
+                "p99": percentile(latencies, 0.99) * 1000,
+            }
+        )
+    )
+
+
+def main() -> None:
+    """Print throughput, errors and latency of each settings profile."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--colors", type=int, default=100)
+    parser.add_argument("--fruits-per-color", type=int, default=10)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        child(args)
+        return
+    print(f"{'profile':<11} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:], "--profile", profile],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{profile:<11} {result['rps']:>8.0f} {result['errors']:>7} "
+            f"{result['p50']:>8.2f} {result['p99']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Time the first and last byte of a large list, streamed or not.
+
+Seeds ``--fruits`` fruits in a throwaway test database and requests all
+of them from the async endpoint as one JSON document, then with
+``@stream(initialCount: --initial-count)`` as ``multipart/mixed``.
+The ``nested`` rows do the same for the fruits of each color.
+Peak memory is measured with ``tracemalloc`` in a separate run::
+
+    python benchmarks/stream.py --fruits 20000 --initial-count 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.http import StreamingHttpResponse  # noqa: E402
+from django.test import AsyncClient  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from envision.core.models import Color, Fruit  # noqa: E402
+
+QUERY = "{ fruits(filters: {color: {}}) %s { id name color { name } } }"
+NESTED = "{ colors { name fruits %s { id name } } }"
+
+
+def seed(fruits: int) -> None:
+    """Create ``fruits`` fruits spread over 20 colors."""
+    colors = Color.objects.bulk_create(Color(name=f"color{i}") for i in range(20))
+    Fruit.objects.bulk_create(
+        (Fruit(name=f"fruit{i}", color=colors[i % 20]) for i in range(fruits)),
+        batch_size=10_000,
+    )
+
+
+async def fetch(query: str, accept: str) -> tuple[float, float, int]:
+    """Return the seconds to the first and last chunk, and the body size."""
+    start = time.perf_counter()
+    response = await AsyncClient().post(
+        "/graphql",
+        data=json.dumps({"query": query}),
+        content_type="application/json",
+        headers={"accept": accept},
+    )
+    if not response.streaming:
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed, len(response.content)
+    assert isinstance(response, StreamingHttpResponse)
+    first, size = 0.0, 0
+    async for chunk in response.streaming_content:
+        first = first or time.perf_counter() - start
+        size += len(chunk)
+    return first, time.perf_counter() - start, size
+
+
+def peak(query: str, accept: str) -> int:
+    """Return the peak traced memory of one request, in bytes."""
+    tracemalloc.start()
+    try:
+        asyncio.run(fetch(query, accept))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    """Print first byte, last byte and peak memory of each response."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fruits", type=int, default=20_000)
+    parser.add_argument("--initial-count", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(args.fruits)
+        stream = f"@stream(initialCount: {args.initial_count})"
+        runs = {
+            "json": (QUERY % "", "application/json"),
+            "@stream": (QUERY % stream, "multipart/mixed"),
+            "nested": (NESTED % "", "application/json"),
+            "@stream n": (NESTED % stream, "multipart/mixed"),
+        }
+        print(
+            f"{'response':<10} {'first ms':>9} {'last ms':>9} {'bytes':>10} "
+            f"{'peak MB':>8}"
+        )
+        for name, (query, accept) in runs.items():
+            first, last, size = min(
+                asyncio.run(fetch(query, accept)) for _ in range(args.repeat)
+            )
+            megabytes = peak(query, accept) / 2**20
+            print(
+                f"{name:<10} {first * 1000:>9.2f} {last * 1000:>9.2f} {size:>10} "
+                f"{megabytes:>8.1f}"
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
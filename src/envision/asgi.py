@@ -0,0 +1,9 @@
+"""ASGI config for envision project."""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "envision.settings.base")
+
+application = get_asgi_application()
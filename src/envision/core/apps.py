@@ -6,3 +6,9 @@ from django.apps import AppConfig
 class ExampleAppConfig(AppConfig):
     name = "envision.core"
     verbose_name = "Example App"
+
+    def ready(self) -> None:
+        """Connect the signal receivers and load the password validators."""
+        from . import passwords, signals  # noqa: F401
+
+        passwords.preload()
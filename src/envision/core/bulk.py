@@ -0,0 +1,361 @@
+"""Bulk variants of strawberry-django's create, update and delete mutations.
+
+The stock list mutations save, clean and signal one row at a time.  The
+fields here validate every row first, reading foreign keys with a single
+query per relation, then write with ``bulk_create`` or queryset
+``update()``/``delete()`` calls in batches of ``GRAPHQL_BULK_BATCH_SIZE``
+inside the mutation's transaction.  Created and updated objects are
+returned by one trailing query.
+
+Bulk inserts and queryset updates send no model signals, so the response
+cache is invalidated explicitly for every model written to.  Queryset
+deletes still signal each row; the resolvers run inside
+:meth:`.ResponseCache.batch`, so every model is invalidated once per
+mutation.  The schema exposes these fields beside the stock ones, which
+keep their per-row ``save()`` and signals.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import ForeignKey, ManyToOneRel
+from strawberry import UNSET
+from strawberry.annotation import StrawberryAnnotation
+from strawberry.types import Info
+from strawberry_django.mutations import resolvers
+from strawberry_django.mutations.fields import (
+    DjangoCreateMutation,
+    DjangoDeleteMutation,
+    DjangoUpdateMutation,
+    get_pk,
+    get_vdata,
+)
+from strawberry_django.mutations.types import ParsedObject, ParsedObjectList
+from strawberry_django.optimizer import DjangoOptimizerExtension, optimize
+from strawberry_django.permissions import filter_with_perms
+from strawberry_django.resolvers import django_resolver
+
+from .response_cache import response_cache
+
+Relations = dict[ManyToOneRel, ParsedObjectList]
+
+
+def batch_size() -> int:
+    """Return the number of rows written per statement."""
+    size: int = getattr(settings, "GRAPHQL_BULK_BATCH_SIZE", 500)
+    return size
+
+
+def _pk(value: Any) -> Any:
+    if isinstance(value, ParsedObject):
+        value = value.pk
+    return value.pk if isinstance(value, models.Model) else value
+
+
+def apply_input(
+    instance: models.Model,
+    data: dict[str, Any],
+) -> tuple[list[str], Relations]:
+    """Set the parsed input ``data`` on ``instance``.
+
+    Returns
+    -------
+    tuple[list[str], Relations]
+        Attribute names of the concrete fields that were set, and the reverse
+        relation changes to apply once ``instance`` is saved.
+    """
+    opts = instance._meta
+    fields: list[str] = []
+    relations: Relations = {}
+    for name, value in data.items():
+        if value is UNSET:
+            continue
+        field = opts.get_field(name)
+        if isinstance(field, ManyToOneRel):
+            relations[field] = value
+            continue
+        assert isinstance(field, models.Field)
+        setattr(instance, field.attname, _pk(value) if field.is_relation else value)
+        fields.append(field.attname)
+    return fields, relations
+
+
+def validate(
+    model: type[models.Model],
+    instances: Sequence[models.Model],
+    *,
+    full_clean: bool = True,
+) -> None:
+    """Validate every instance before anything is written.
+
+    Foreign keys are checked with one query per relation instead of one per
+    row.  Uniqueness is left to the database, which rejects duplicates
+    inside the mutation's transaction.
+
+    Raises
+    ------
+    ValidationError
+        Listing the errors of every invalid row, keyed ``<index>.<field>``.
+    """
+    errors: dict[str, list[str]] = {}
+    foreign_keys = [
+        field for field in model._meta.concrete_fields if isinstance(field, ForeignKey)
+    ]
+    if full_clean:
+        exclude = [field.name for field in foreign_keys]
+        for index, instance in enumerate(instances):
+            try:
+                instance.full_clean(
+                    exclude=exclude,
+                    validate_unique=False,
+                    validate_constraints=False,
+                )
+            except ValidationError as error:
+                for name, messages in error.message_dict.items():
+                    errors[f"{index}.{name}"] = messages
+
+    for field in foreign_keys:
+        rows: defaultdict[Any, list[int]] = defaultdict(list)
+        for index, instance in enumerate(instances):
+            value = getattr(instance, field.attname)
+            if value is None:
+                if not field.null:
+                    errors[f"{index}.{field.name}"] = [
+                        str(field.error_messages["null"])
+                    ]
+                continue
+            try:
+                value = field.target_field.to_python(value)
+            except ValidationError as error:
+                errors[f"{index}.{field.name}"] = error.messages
+                continue
+            setattr(instance, field.attname, value)
+            rows[value].append(index)
+
+        target = field.target_field.attname
+        related_model = field.related_model
+        assert not isinstance(related_model, str)
+        existing = set(
+            related_model._base_manager.filter(
+                **{f"{target}__in": rows},
+            ).values_list(target, flat=True),
+        )
+        for value in rows.keys() - existing:
+            message = ValidationError(
+                field.error_messages["invalid"],
+                code="invalid",
+                params={
+                    "model": related_model._meta.verbose_name,
+                    "pk": value,
+                    "field": target,
+                    "value": value,
+                },
+            ).messages
+            for index in rows[value]:
+                errors[f"{index}.{field.name}"] = message
+
+    if errors:
+        raise ValidationError(errors)
+
+
+def apply_relations(instance: models.Model, relations: Relations) -> None:
+    """Point the rows named in ``relations`` at ``instance``."""
+    for rel, change in relations.items():
+        remote = rel.field
+        related_model = rel.related_model
+        assert not isinstance(related_model, str)
+        related = related_model._base_manager
+        attname = remote.attname
+        if change.set is not None and change.set is not UNSET:
+            ids = [_pk(value) for value in change.set]
+            related.filter(**{attname: instance.pk}).exclude(pk__in=ids).update(
+                **{attname: None},
+            )
+            related.filter(pk__in=ids).update(**{attname: instance.pk})
+        if change.add is not None and change.add is not UNSET:
+            ids = [_pk(value) for value in change.add]
+            related.filter(pk__in=ids).update(**{attname: instance.pk})
+        if change.remove is not None and change.remove is not UNSET:
+            ids = [_pk(value) for value in change.remove]
+            related.filter(pk__in=ids, **{attname: instance.pk}).update(
+                **{attname: None},
+            )
+        response_cache.invalidate(related_model)
+
+
+def refetch(
+    model: type[models.Model],
+    pks: Iterable[Any],
+    info: Info,
+) -> list[models.Model]:
+    """Return the rows with ``pks``, in order, with one optimized query."""
+    order = {pk: index for index, pk in enumerate(pks)}
+    queryset = model._default_manager.filter(pk__in=order)
+    if DjangoOptimizerExtension.enabled.get():
+        queryset = optimize(queryset, info=info)
+    return sorted(queryset, key=lambda instance: order[instance.pk])
+
+
+class BulkCreateMutation(DjangoCreateMutation):
+    """Create every input of the list with ``bulk_create``."""
+
+    @django_resolver
+    @transaction.atomic
+    @response_cache.batch()
+    def resolver(
+        self,
+        source: Any,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Validate all inputs, then insert them in batches."""
+        assert info is not None
+        model = self.django_model
+        assert model is not None
+
+        instances: list[models.Model] = []
+        relations: list[Relations] = []
+        for data in kwargs[self.argument_name]:
+            instance = model()
+            _, changes = apply_input(
+                instance,
+                resolvers.parse_input(info, vars(data), key_attr=self.key_attr),
+            )
+            instances.append(instance)
+            relations.append(changes)
+
+        validate(model, instances, full_clean=bool(self.full_clean))
+        model._default_manager.bulk_create(instances, batch_size=batch_size())
+        for instance, changes in zip(instances, relations, strict=True):
+            apply_relations(instance, changes)
+        response_cache.invalidate(model)
+        return refetch(model, [instance.pk for instance in instances], info)
+
+
+class BulkUpdateMutation(DjangoUpdateMutation):
+    """Apply the input to every filtered row with batched updates."""
+
+    @django_resolver
+    @transaction.atomic
+    @response_cache.batch()
+    def resolver(
+        self,
+        source: Any,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Validate the updated rows, then write them in batches."""
+        assert info is not None
+        model = self.django_model
+        assert model is not None
+
+        vdata = get_vdata(kwargs.get(self.argument_name))
+        pk = get_pk(vdata, key_attr=self.key_attr)
+        data = resolvers.parse_input(info, vdata, key_attr=self.key_attr)
+        queryset = filter_with_perms(
+            self.get_queryset(
+                queryset=model._default_manager.all(),
+                info=info,
+                **kwargs,
+            ),
+            info,
+        )
+        if pk not in (None, UNSET):
+            queryset = queryset.filter(pk=pk)
+
+        instances = list(queryset)
+        fields: list[str] = []
+        relations: list[Relations] = []
+        for instance in instances:
+            fields, changes = apply_input(instance, data)
+            relations.append(changes)
+
+        validate(model, instances, full_clean=bool(self.full_clean))
+        if fields and instances:
+            # Every row receives the same input, so one UPDATE per batch of
+            # primary keys replaces bulk_update()'s per-row CASE expressions.
+            values = {attname: getattr(instances[0], attname) for attname in fields}
+            pks = [instance.pk for instance in instances]
+            size = batch_size()
+            for start in range(0, len(pks), size):
+                model._default_manager.filter(
+                    pk__in=pks[start : start + size],
+                ).update(**values)
+        for instance, changes in zip(instances, relations, strict=True):
+            apply_relations(instance, changes)
+        response_cache.invalidate(model)
+        return refetch(model, [instance.pk for instance in instances], info)
+
+
+class BulkDeleteMutation(DjangoDeleteMutation):
+    """Delete every filtered row with batched queryset deletes."""
+
+    @django_resolver
+    @transaction.atomic
+    @response_cache.batch()
+    def resolver(
+        self,
+        source: Any,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Load the rows to return, then delete them in batches."""
+        assert info is not None
+        model = self.django_model
+        assert model is not None
+
+        queryset = filter_with_perms(
+            self.get_queryset(
+                queryset=model._default_manager.all(),
+                info=info,
+                **kwargs,
+            ),
+            info,
+        )
+        if DjangoOptimizerExtension.enabled.get():
+            queryset = optimize(queryset, info=info)
+        instances = list(queryset)
+
+        size = batch_size()
+        pks = [instance.pk for instance in instances]
+        for start in range(0, len(pks), size):
+            model._default_manager.filter(pk__in=pks[start : start + size]).delete()
+        return instances
+
+
+def bulk_create(input_type: type, *, full_clean: bool = True) -> Any:
+    """Return a list mutation creating ``input_type`` rows in bulk."""
+    return BulkCreateMutation(
+        list[input_type],  # type: ignore[valid-type]
+        python_name=None,
+        graphql_name=None,
+        type_annotation=StrawberryAnnotation.from_annotation(None),
+        full_clean=full_clean,
+    )
+
+
+def bulk_update(input_type: type, *, full_clean: bool = True) -> Any:
+    """Return a list mutation updating filtered rows in bulk."""
+    return BulkUpdateMutation(
+        input_type,
+        python_name=None,
+        graphql_name=None,
+        type_annotation=StrawberryAnnotation.from_annotation(None),
+        full_clean=full_clean,
+    )
+
+
+def bulk_delete() -> Any:
+    """Return a list mutation deleting filtered rows in bulk."""
+    return BulkDeleteMutation(
+        python_name=None,
+        graphql_name=None,
+        type_annotation=StrawberryAnnotation.from_annotation(None),
+    )
@@ -0,0 +1,29 @@
+"""Per-request GraphQL execution context."""
+
+from dataclasses import dataclass, field
+
+from strawberry.django.context import StrawberryDjangoContext
+
+from .loaders import Loaders
+from .streams import Incremental
+
+
+@dataclass
+class Context(StrawberryDjangoContext):
+    """Django context carrying request-scoped relation loaders.
+
+    The operations of a batched request share one context, so they also
+    share its loaders and the cost budget spent so far; ``batched`` is
+    set for them, so only batches are held to that budget.  ``incremental``
+    is set when the response may be sent in parts; ``streams`` then holds
+    the ``@stream`` lists and ``@defer`` fragments still to be sent.
+    ``primary`` is set once a mutation ran, so later operations of the
+    request read from the primary database (see :mod:`.routers`).
+    """
+
+    loaders: Loaders = field(default_factory=Loaders)
+    cost: int = 0
+    batched: bool = False
+    incremental: bool = False
+    streams: list[Incremental] = field(default_factory=list)
+    primary: bool = False
@@ -0,0 +1,252 @@
+"""Static cost and depth analysis of GraphQL operations.
+
+``Fruit.color`` and ``Color.fruits`` refer to each other, so the cost of a
+query grows multiplicatively with its nesting.  :class:`QueryCostExtension`
+computes the cost of the selected operation from the document alone, after
+validation and before any resolver runs, and rejects operations that go
+over the ``GRAPHQL_MAX_QUERY_DEPTH`` or ``GRAPHQL_MAX_QUERY_COST`` budgets.
+The operations of a batched request share one :class:`~.context.Context`,
+which also holds them to the ``GRAPHQL_MAX_BATCH_COST`` budget together;
+single operations are only held to ``GRAPHQL_MAX_QUERY_COST``.
+
+Every object costs 1 plus the cost of its selection; leaves cost nothing.
+A list costs as many objects as its page size: ``pagination.limit``,
+``first`` or ``last`` on the field (or on the connection that contains it),
+and ``GRAPHQL_DEFAULT_LIST_SIZE`` otherwise.  The result is reported under
+``extensions.cost``.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLNamedType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+    is_leaf_type,
+    is_list_type,
+    value_from_ast_untyped,
+)
+from strawberry.extensions import SchemaExtension
+
+from .context import Context
+
+
+@dataclass(frozen=True)
+class OperationCost:
+    """Estimated cost and nesting depth of one operation."""
+
+    cost: int
+    depth: int
+
+
+class CostAnalyzer:
+    """Compute :class:`OperationCost` for operations of ``document``.
+
+    Parameters
+    ----------
+    schema : GraphQLSchema
+        Schema the document was validated against.
+    document : DocumentNode
+        Parsed, valid document.
+    variables : dict[str, Any] | None
+        Variable values of the request.
+    default_list_size : int
+        Size assumed for lists without a page size argument.
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        document: DocumentNode,
+        variables: dict[str, Any] | None,
+        default_list_size: int,
+    ) -> None:
+        self.schema = schema
+        self.document = document
+        self.variables = variables or {}
+        self.default_list_size = default_list_size
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self._fragment_costs: dict[tuple[str, int | None], tuple[int, int]] = {}
+
+    def analyze(self, operation_name: str | None = None) -> OperationCost:
+        """Return the cost of the operation named ``operation_name``."""
+        operation = get_operation_ast(self.document, operation_name)
+        if operation is None:
+            return OperationCost(cost=0, depth=0)
+
+        defaults = {
+            definition.variable.name.value: value_from_ast_untyped(
+                definition.default_value
+            )
+            for definition in operation.variable_definitions
+            if definition.default_value is not None
+        }
+        self.variables = {**defaults, **self.variables}
+
+        root = self.schema.get_root_type(operation.operation)
+        assert root is not None
+        cost, depth = self._selection_set(root, operation.selection_set, None)
+        return OperationCost(cost=cost, depth=depth)
+
+    def _selection_set(
+        self,
+        parent: GraphQLNamedType,
+        selection_set: SelectionSetNode,
+        page_size: int | None,
+    ) -> tuple[int, int]:
+        cost = depth = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields: dict[str, GraphQLField] = getattr(parent, "fields", {})
+                field = fields.get(selection.name.value)
+                if field is None:
+                    # Introspection meta fields are not weighed.
+                    continue
+                child_cost, child_depth = self._field(field, selection, page_size)
+            elif isinstance(selection, InlineFragmentNode):
+                condition = selection.type_condition
+                child_cost, child_depth = self._selection_set(
+                    self._type(condition.name.value) if condition else parent,
+                    selection.selection_set,
+                    page_size,
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                child_cost, child_depth = self._fragment(
+                    selection.name.value,
+                    page_size,
+                )
+            cost += child_cost
+            depth = max(depth, child_depth)
+        return cost, depth
+
+    def _fragment(self, name: str, page_size: int | None) -> tuple[int, int]:
+        # Fragments are costed once per page size, so a document spreading
+        # the same fragment many times is still analyzed in linear time.
+        key = (name, page_size)
+        if key not in self._fragment_costs:
+            fragment = self.fragments[name]
+            self._fragment_costs[key] = self._selection_set(
+                self._type(fragment.type_condition.name.value),
+                fragment.selection_set,
+                page_size,
+            )
+        return self._fragment_costs[key]
+
+    def _field(
+        self,
+        field: GraphQLField,
+        node: FieldNode,
+        page_size: int | None,
+    ) -> tuple[int, int]:
+        named = get_named_type(field.type)
+        if is_leaf_type(named) or node.selection_set is None:
+            return 0, 1
+
+        requested = self._page_size(node)
+        if is_list_type(get_nullable_type(field.type)):  # type: ignore[arg-type]
+            size = requested if requested is not None else page_size
+            if size is None:
+                size = self.default_list_size
+            cost, depth = self._selection_set(named, node.selection_set, None)
+            return size * (1 + cost), 1 + depth
+
+        # Connections pass their page size on to the ``edges`` list.
+        cost, depth = self._selection_set(named, node.selection_set, requested)
+        return 1 + cost, 1 + depth
+
+    def _page_size(self, node: FieldNode) -> int | None:
+        arguments = {
+            argument.name.value: value_from_ast_untyped(argument.value, self.variables)
+            for argument in node.arguments
+        }
+        pagination = arguments.get("pagination")
+        candidates = [
+            pagination.get("limit") if isinstance(pagination, dict) else None,
+            arguments.get("first"),
+            arguments.get("last"),
+        ]
+        for value in candidates:
+            if isinstance(value, int) and value >= 0:
+                return value
+        return None
+
+    def _type(self, name: str) -> GraphQLNamedType:
+        named = self.schema.get_type(name)
+        assert named is not None
+        return named
+
+
+class QueryCostExtension(SchemaExtension):
+    """Reject operations over the depth or cost budget before execution.
+
+    The budgets are read from the ``GRAPHQL_MAX_QUERY_DEPTH``,
+    ``GRAPHQL_MAX_QUERY_COST`` and ``GRAPHQL_MAX_BATCH_COST`` settings;
+    ``None`` disables a check.  Operations of a batch are admitted in the
+    order they start executing, until their total cost runs out.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        """Analyze the operation and skip execution if it is too expensive."""
+        ec = self.execution_context
+        if ec.graphql_document is None:
+            yield
+            return
+
+        max_depth: int | None = getattr(settings, "GRAPHQL_MAX_QUERY_DEPTH", None)
+        max_cost: int | None = getattr(settings, "GRAPHQL_MAX_QUERY_COST", None)
+        max_batch_cost: int | None = getattr(settings, "GRAPHQL_MAX_BATCH_COST", None)
+        analysis = CostAnalyzer(
+            ec.schema._schema,
+            ec.graphql_document,
+            ec.variables,
+            default_list_size=getattr(settings, "GRAPHQL_DEFAULT_LIST_SIZE", 20),
+        ).analyze(ec.operation_name)
+        ec.extensions_results["cost"] = {
+            "requestedQueryCost": analysis.cost,
+            "maximumAvailable": max_cost,
+            "depth": analysis.depth,
+            "maximumDepth": max_depth,
+        }
+
+        error = None
+        if max_depth is not None and analysis.depth > max_depth:
+            error = f"Query depth {analysis.depth} exceeds the maximum of {max_depth}"
+        elif max_cost is not None and analysis.cost > max_cost:
+            error = f"Query cost {analysis.cost} exceeds the maximum of {max_cost}"
+        elif isinstance(ec.context, Context) and ec.context.batched:
+            total = ec.context.cost + analysis.cost
+            if max_batch_cost is not None and total > max_batch_cost:
+                error = f"Batch cost {total} exceeds the maximum of {max_batch_cost}"
+            else:
+                ec.context.cost = total
+        if error is not None:
+            ec.result = ExecutionResult(
+                data=None,
+                errors=[
+                    GraphQLError(error, extensions={"code": "QUERY_TOO_COMPLEX"}),
+                ],
+            )
+        yield
+
+    def get_results(self) -> dict[str, Any]:
+        """Report the computed cost under ``extensions.cost``."""
+        cost = self.execution_context.extensions_results.get("cost")
+        return {} if cost is None else {"cost": cost}
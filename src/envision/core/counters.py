@@ -0,0 +1,104 @@
+"""Denormalized counts of related rows.
+
+``Color.fruit_count`` holds the number of fruits of each color.  With
+``GRAPHQL_COUNTER_COLUMNS`` enabled, ``Color.fruitCount`` selects that
+column instead of counting the fruits, which keeps colors with many
+fruits as cheap to list as any other.
+
+The column is kept exact by the database: :func:`install` creates
+triggers adjusting it on every insert, delete or move of a fruit, so
+mutations, bulk writes, imports and cascades all update it in the same
+transaction.  Triggers are only installed on SQLite; elsewhere the
+setting is ignored and the fruits are counted.
+"""
+
+from typing import Any
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Expression, F, IntegerField, Value
+
+from . import subqueries
+from .models import Color
+
+# Counter column of each counted relation.
+COUNTERS: dict[tuple[type[models.Model], str], str] = {
+    (Color, "fruits"): "fruit_count",
+}
+
+
+def column(model: type[models.Model], name: str) -> str | None:
+    """Return the counter column of ``model.name`` if it is used."""
+    if not getattr(settings, "GRAPHQL_COUNTER_COLUMNS", False):
+        return None
+    if connection.vendor != "sqlite":
+        return None
+    return COUNTERS.get((model, name))
+
+
+class RelationCount(Expression):
+    """Number of ``name`` rows of each ``model`` row.
+
+    Resolves to the counter column when it is used and to a correlated
+    subquery otherwise.  The optimizer also copies the annotation onto
+    querysets reaching ``model`` through ``select_related``, where it
+    would be correlated to the wrong table, so on querysets of other
+    models it resolves to ``NULL`` and leaves the count to the loader.
+    """
+
+    def __init__(self, model: type[models.Model], name: str) -> None:
+        super().__init__(output_field=IntegerField())
+        self.model = model
+        self.name = name
+
+    def resolve_expression(self, query: Any = None, *args: Any, **kwargs: Any) -> Any:
+        """Return the expression counting the rows on ``query``'s model."""
+        if query is None or query.model is not self.model:
+            expression: Any = Value(None, output_field=IntegerField())
+        elif counter := column(self.model, self.name):
+            expression = F(counter)
+        else:
+            expression = subqueries.count(self.model, self.name)
+        return expression.resolve_expression(query, *args, **kwargs)
+
+
+def install(connection: BaseDatabaseWrapper) -> None:
+    """Create the counter triggers and recount every counter."""
+    if connection.vendor != "sqlite":
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for (model, name), counter in COUNTERS.items():
+            rel = model._meta.get_field(name)
+            assert isinstance(rel, models.ManyToOneRel)
+            related_model = rel.related_model
+            assert not isinstance(related_model, str)
+            parent = quote(model._meta.db_table)
+            child = quote(related_model._meta.db_table)
+            pk, fk = quote(rel.field.target_field.attname), quote(rel.field.attname)
+            counter = quote(counter)
+            increment = (
+                f"UPDATE {parent} SET {counter} = {counter} + 1 WHERE {pk} = new.{fk};"
+            )
+            decrement = (
+                f"UPDATE {parent} SET {counter} = {counter} - 1 WHERE {pk} = old.{fk};"
+            )
+            recount = (
+                f"UPDATE {parent} SET {counter} = "
+                f"(SELECT COUNT(*) FROM {child} WHERE {child}.{fk} = {parent}.{pk})"
+            )
+            prefix = f"{model._meta.db_table}_{name}_count"
+            for suffix, event, table, body in [
+                ("ai", "AFTER INSERT", child, increment),
+                ("ad", "AFTER DELETE", child, decrement),
+                ("au", f"AFTER UPDATE OF {fk}", child, decrement + increment),
+                # Fixtures may insert children before their parent.
+                ("pi", "AFTER INSERT", parent, f"{recount} WHERE {pk} = new.{pk};"),
+            ]:
+                trigger = quote(f"{prefix}_{suffix}")
+                cursor.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {trigger} {event} ON {table} "
+                    f"BEGIN {body} END"
+                )
+            cursor.execute(recount)
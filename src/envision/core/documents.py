@@ -0,0 +1,157 @@
+"""LRU cache of parsed and validated GraphQL documents.
+
+Clients send a small, fixed set of operations, so parsing and validating
+each request from scratch is wasted work.  :class:`DocumentCacheExtension`
+keys documents by the SHA-256 of their text and reuses both the parsed AST
+and the validation errors of earlier requests.  The capacity is read from
+the ``GRAPHQL_DOCUMENT_CACHE_SIZE`` setting; ``0`` disables caching.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from django.conf import settings
+from graphql import ASTValidationRule, DocumentNode, GraphQLError
+from strawberry.extensions import SchemaExtension
+
+
+def document_hash(query: str) -> str:
+    """Return the SHA-256 hex digest identifying ``query``."""
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedDocument:
+    """A parsed document and, once validated, its validation errors."""
+
+    document: DocumentNode
+    rules: tuple[type[ASTValidationRule], ...] | None = None
+    errors: tuple[GraphQLError, ...] = ()
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    """Snapshot of :class:`DocumentCache` counters."""
+
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class DocumentCache:
+    """Thread-safe, bounded LRU mapping of document hashes to documents.
+
+    Parameters
+    ----------
+    maxsize : int
+        Number of documents kept before the least recently used is evicted.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, CachedDocument] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedDocument | None:
+        """Return the entry for ``key`` and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return entry
+
+    def peek(self, key: str) -> CachedDocument | None:
+        """Return the entry for ``key`` without touching counters or order."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, entry: CachedDocument) -> None:
+        """Store ``entry``, evicting the least recently used if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Return the current hit/miss counters and size."""
+        with self._lock:
+            return CacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+document_cache = DocumentCache(
+    maxsize=getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 256),
+)
+
+
+class DocumentCacheExtension(SchemaExtension):
+    """Skip parsing and validation for documents seen before.
+
+    Validation errors are cached alongside the document, so an invalid
+    document keeps failing identically without being re-validated.  Entries
+    are only reused for the validation rules they were validated with.
+    """
+
+    cache = document_cache
+
+    def on_parse(self) -> Iterator[None]:
+        """Reuse the parsed document, or cache it once parsed."""
+        ec = self.execution_context
+        if ec.query is None or self.cache.maxsize <= 0:
+            yield
+            return
+
+        key = document_hash(ec.query)
+        entry = self.cache.get(key)
+        if entry is not None:
+            ec.graphql_document = entry.document
+        yield
+        if entry is None and ec.graphql_document is not None:
+            self.cache.set(key, CachedDocument(document=ec.graphql_document))
+
+    def on_validate(self) -> Iterator[None]:
+        """Reuse validation errors, or cache them once validated."""
+        ec = self.execution_context
+        if ec.query is None or ec.graphql_document is None:
+            yield
+            return
+
+        key = document_hash(ec.query)
+        entry = self.cache.peek(key)
+        if entry is not None and entry.rules == ec.validation_rules:
+            ec.pre_execution_errors = list(entry.errors)
+            yield
+            return
+
+        yield
+        if entry is not None and ec.pre_execution_errors is not None:
+            self.cache.set(
+                key,
+                CachedDocument(
+                    document=entry.document,
+                    rules=ec.validation_rules,
+                    errors=tuple(ec.pre_execution_errors),
+                ),
+            )
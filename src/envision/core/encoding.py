@@ -0,0 +1,74 @@
+"""JSON codecs for GraphQL requests and responses.
+
+``GRAPHQL_JSON_CODEC`` names the entry of :data:`CODECS` the views use:
+``"orjson"`` or ``"json"``.  The default, ``None``, picks orjson when it
+is installed and the standard library otherwise.
+
+orjson is an optional dependency, installed with the ``orjson`` extra.
+The ``json`` codec writes what strawberry's Django views always did:
+ASCII-escaped JSON with spaces after separators.  orjson writes compact
+UTF-8 instead, so installing it changes the bytes of every response but
+not the values they decode to.  Dates, decimals, UUIDs and lazy strings
+are encoded by :class:`~django.core.serializers.json.DjangoJSONEncoder`
+in either.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment,unused-ignore]
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Functions encoding values to JSON bytes and decoding them back."""
+
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[str | bytes], Any]
+
+
+_default = DjangoJSONEncoder().default
+
+
+def _json_dumps(data: Any) -> bytes:
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+CODECS: dict[str, Codec] = {"json": Codec(dumps=_json_dumps, loads=json.loads)}
+
+if orjson is not None:
+
+    def _orjson_dumps(data: Any) -> bytes:
+        # Leave datetimes and dataclasses to ``_default``, as ``json`` does.
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        encoded: bytes = orjson.dumps(data, default=_default, option=option)
+        return encoded
+
+    CODECS["orjson"] = Codec(dumps=_orjson_dumps, loads=orjson.loads)
+
+
+def codec() -> Codec:
+    """Return the codec selected by ``GRAPHQL_JSON_CODEC``.
+
+    Raises
+    ------
+    ImproperlyConfigured
+        If the setting names no codec of :data:`CODECS`.
+    """
+    name = getattr(settings, "GRAPHQL_JSON_CODEC", None)
+    if name is None:
+        name = "orjson" if "orjson" in CODECS else "json"
+    try:
+        return CODECS[name]
+    except KeyError:
+        msg = f"Unknown GRAPHQL_JSON_CODEC {name!r}; choose from {', '.join(CODECS)}"
+        raise ImproperlyConfigured(msg) from None
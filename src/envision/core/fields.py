@@ -0,0 +1,218 @@
+"""Django fields resolved through the request's relation loaders."""
+
+import inspect
+from typing import Any, Self
+
+from django.db import models
+from graphql.pyutils import AwaitableOrValue
+from strawberry.annotation import StrawberryAnnotation
+from strawberry.types.info import Info
+from strawberry.utils.inspect import in_async_context
+from strawberry_django.fields.field import StrawberryDjangoField
+
+from . import counters, streams
+from .loaders import Loaders
+
+
+class LoaderField(StrawberryDjangoField):
+    """Field that batches relation lookups with :class:`~.loaders.Loaders`.
+
+    Root fields resolved on the event loop query through Django's async ORM
+    API instead of a ``sync_to_async`` resolver.  In sync execution, root
+    list fields register their rows as peers so the next depth is batched.
+    Relation fields are loaded through :class:`~.loaders.RelationLoader`
+    unless Django already cached them or the client passed filters or
+    pagination, in which case the default queryset path applies.  Objects
+    cached by ``select_related`` become peers of each other, so that their
+    own relations and counts are batched as well.  Lists may be marked
+    ``@stream`` (see :mod:`.streams`).
+    """
+
+    streamable = True
+
+    @property
+    def disable_optimization(self) -> bool:
+        """Return whether the optimizer leaves this field out.
+
+        Relation lists streamed by the operation are not prefetched, so
+        their rows are only read as they are sent.
+        """
+        return self._disable_optimization or streams.is_streamed(self)
+
+    @disable_optimization.setter
+    def disable_optimization(self, value: bool) -> None:
+        self._disable_optimization = value
+
+    def get_result(
+        self,
+        source: models.Model | None,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> AwaitableOrValue[Any]:
+        """Resolve the field, going through the loaders where possible."""
+        if source is None and self.base_resolver is None and in_async_context():
+            assert info is not None
+            return self.aresolve_root(info, kwargs)
+
+        loaders = getattr(info.context, "loaders", None) if info else None
+        if not isinstance(loaders, Loaders) or self.base_resolver is not None:
+            return super().get_result(source, info, args, kwargs)
+
+        if source is None:
+            result = super().get_result(source, info, args, kwargs)
+            if self.is_list and not inspect.isawaitable(result):
+                loaders.add_peers(list(result))
+            return result
+
+        assert info is not None
+        if self.is_list and in_async_context():
+            arguments = streams.requested(info)
+            if arguments is not None:
+                return self.astream_relation(source, info, kwargs, arguments)
+
+        # Unset arguments arrive as ``None``, ``UNSET`` or ``[]``, all falsy.
+        if any(kwargs.values()):
+            return super().get_result(source, info, args, kwargs)
+
+        loader = loaders.relation(type(source), self.django_name or self.python_name)
+        if loader.is_cached(source):
+            if not loader.many:
+                loaders.add_cached_peers(loader, source)
+            return super().get_result(source, info, args, kwargs)
+        if in_async_context():
+            return loader.aload(source)
+        return loader.load(source)
+
+    async def aresolve_root(self, info: Info, kwargs: dict[str, Any]) -> Any:
+        """Fetch a root field with ``async for``, ``afirst`` or ``aget``.
+
+        Filters, ordering, pagination and the optimizer are applied by
+        :meth:`get_queryset`, which only builds the queryset.  Lists marked
+        ``@stream`` are read in chunks by :func:`~.streams.start`.
+        """
+        model = self.django_model
+        assert model is not None
+        with streams.planning(info):
+            queryset: models.QuerySet[Any] = self.get_queryset(  # type: ignore[no-untyped-call]
+                model._default_manager.all(),
+                info,
+                **kwargs,
+            )
+        if self.is_list:
+            arguments = streams.requested(info)
+            if arguments is not None:
+                return await streams.start(queryset, arguments)
+            return [obj async for obj in queryset]
+        if self.is_optional:
+            return await queryset.afirst()
+        return await queryset.aget()
+
+    async def astream_relation(
+        self,
+        source: models.Model,
+        info: Info,
+        kwargs: dict[str, Any],
+        arguments: dict[str, Any],
+    ) -> list[Any]:
+        """Read the first rows of a relation list marked ``@stream``.
+
+        The first rows of every parent are read in one batch; the rest are
+        left to :meth:`~.loaders.HeadLoader.rest` until they are sent.
+        """
+        model = self.django_model
+        assert model is not None
+        count = streams.initial_count(arguments)
+        loaders: Loaders = info.context.loaders
+        loader = loaders.head(
+            type(source),
+            self.django_name or self.python_name,
+            id(info._raw_info.field_nodes[0]),
+            lambda: self.get_queryset(  # type: ignore[no-untyped-call]
+                model._default_manager.all(), info, **kwargs
+            ),
+            count,
+        )
+        initial = await loader.aload(source) if count else []
+        rows = loader.rest(source, streams.chunk_size())
+        return streams.StreamedList(initial, rows, arguments.get("label"))
+
+
+class CountField(StrawberryDjangoField):
+    """Number of rows of a reverse relation, e.g. ``Color.fruitCount``.
+
+    When selected, the optimizer annotates the count onto the parent's
+    queryset (see :class:`~.counters.RelationCount`) and selects the
+    counter column.  Parents fetched without either are counted through
+    :class:`~.loaders.CountLoader`.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        model: type[models.Model],
+        relation: str,
+        **kwargs: Any,
+    ) -> None:
+        alias = f"_{relation}_count"
+        counter = counters.COUNTERS.get((model, relation))
+        super().__init__(
+            *args,
+            annotate={alias: counters.RelationCount(model, relation)},
+            # Unlike the annotation, the column is also selected on parents
+            # reached through ``select_related``.
+            only=[counter] if counter else None,
+            **kwargs,
+        )
+        self.model = model
+        self.relation = relation
+        self.alias = alias
+
+    def __copy__(self) -> Self:
+        """Copy the field along with the relation it counts."""
+        new_field = super().__copy__()
+        new_field.model = self.model
+        new_field.relation = self.relation
+        new_field.alias = self.alias
+        return new_field
+
+    @property
+    def counted_model(self) -> type[models.Model]:
+        """Return the model whose rows are counted, e.g. ``Fruit``."""
+        related_model = self.model._meta.get_field(self.relation).related_model
+        assert related_model is not None
+        assert not isinstance(related_model, str)
+        return related_model
+
+    def get_result(
+        self,
+        source: models.Model | None,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> AwaitableOrValue[Any]:
+        """Return the count fetched with ``source``, or load it in a batch."""
+        assert source is not None
+        column = counters.column(self.model, self.relation)
+        for name in [self.alias, column]:
+            if name is not None and name in source.__dict__:
+                return source.__dict__[name]
+
+        loaders = getattr(info.context, "loaders", None) if info else None
+        if not isinstance(loaders, Loaders):
+            loaders = Loaders()
+        loader = loaders.count(self.model, self.relation)
+        if in_async_context():
+            return loader.aload(source)
+        return loader.load(source)
+
+
+def count_field(model: type[models.Model], relation: str) -> Any:
+    """Return a field counting the ``relation`` rows of ``model``."""
+    return CountField(
+        model=model,
+        relation=relation,
+        python_name=None,
+        graphql_name=None,
+        type_annotation=StrawberryAnnotation.from_annotation(None),
+    )
@@ -0,0 +1,180 @@
+"""Ranked full-text search over ``Fruit.name`` and ``Color.name``.
+
+On SQLite every model gets an FTS5 table indexing ``name``, with the
+model table as its external content.  :func:`install` creates it after
+``migrate``, together with triggers keeping it in sync on every write,
+including bulk and raw SQL ones.
+
+The ``search`` filter of ``FruitFilter`` and ``ColorFilter`` matches
+names containing every word of the value as a word prefix.  Used at the
+top level it also orders the rows by bm25 rank, unless an ``ordering``
+argument replaces it.  The ranks of all matches are computed by one
+query, joined to the rows by :class:`RankJoin`.  Other databases fall
+back to ``icontains`` on every word, without ranking.
+"""
+
+import functools
+import operator
+import re
+from typing import Any
+
+from django.db import connections, models
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.db.models.sql.compiler import SQLCompiler
+from django.db.models.sql.constants import LOUTER
+
+from .models import Color, Fruit
+
+MODELS: tuple[type[models.Model], ...] = (Fruit, Color)
+
+WORD = re.compile(r"\w+")
+
+
+def table(model: type[models.Model]) -> str:
+    """Return the name of the FTS5 table of ``model``."""
+    return f"{model._meta.db_table}_fts"
+
+
+class RankJoin:
+    """``LEFT OUTER JOIN`` of the bm25 rank of every row matching ``query``.
+
+    The joined rows have a ``rowid`` and a ``rank`` column.  It is an outer
+    join so that rows kept by other filters, e.g. through ``OR``, are not
+    dropped; they rank as ``NULL``.  Django only needs the entries of
+    ``Query.alias_map`` to look like a ``Join``; subclassing it would make
+    Django read a ``join_field`` this join does not have.
+    """
+
+    nullable = True
+    filtered_relation = None
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        query: str,
+        parent_alias: str,
+        table_alias: str | None = None,
+        join_type: str = LOUTER,
+    ) -> None:
+        self.model = model
+        self.query = query
+        self.table_name = table(model)
+        self.parent_alias = parent_alias
+        self.table_alias = table_alias
+        self.join_type = join_type
+
+    def as_sql(
+        self, compiler: SQLCompiler, connection: BaseDatabaseWrapper
+    ) -> tuple[str, tuple[str, ...]]:
+        """Return the join clause and its parameters."""
+        quote = connection.ops.quote_name
+        fts = quote(self.table_name)
+        alias = quote(str(self.table_alias))
+        parent = compiler.quote_name_unless_alias(self.parent_alias)
+        pk = quote(self.model._meta.pk.column)
+        # ``OFFSET 0`` keeps SQLite from flattening the subquery into the
+        # join, which would run the MATCH again for every row.
+        sql = (
+            f"{self.join_type} (SELECT rowid, bm25({fts}) AS rank FROM {fts} "
+            f"WHERE {fts} MATCH %s LIMIT -1 OFFSET 0) {alias} "
+            f"ON ({alias}.rowid = {parent}.{pk})"
+        )
+        return sql, (self.query,)
+
+    def relabeled_clone(self, change_map: dict[str | None, str]) -> "RankJoin":
+        """Return a copy using the aliases of ``change_map``."""
+        return RankJoin(
+            self.model,
+            self.query,
+            change_map.get(self.parent_alias, self.parent_alias),
+            change_map.get(self.table_alias, self.table_alias),
+            self.join_type,
+        )
+
+    @property
+    def identity(self) -> tuple[Any, ...]:
+        """Return what makes two rank joins interchangeable."""
+        return (self.__class__, self.table_name, self.parent_alias, self.query)
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether ``other`` joins the same ranks to the same table."""
+        if not isinstance(other, RankJoin):
+            return NotImplemented
+        return self.identity == other.identity
+
+    def __hash__(self) -> int:
+        """Return the hash of :attr:`identity`."""
+        return hash(self.identity)
+
+    def equals(self, other: object) -> bool:
+        """Return whether ``other`` can be reused in place of this join."""
+        return self == other
+
+    def demote(self) -> "RankJoin":
+        """Return this join; it has to stay an outer join."""
+        return self
+
+    def promote(self) -> "RankJoin":
+        """Return this join, which already is an outer join."""
+        return self
+
+
+def install(connection: BaseDatabaseWrapper) -> None:
+    """Create the FTS5 tables and triggers missing from ``connection``."""
+    if connection.vendor != "sqlite":
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        existing = set(connection.introspection.table_names(cursor))
+        for model in MODELS:
+            if table(model) in existing:
+                continue
+            fts, content = quote(table(model)), quote(model._meta.db_table)
+            pk = quote(model._meta.pk.attname)
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5(name, content={content}, "
+                f"content_rowid={pk}, tokenize='unicode61 remove_diacritics 2')"
+            )
+            insert = f"INSERT INTO {fts}(rowid, name) VALUES (new.{pk}, new.name);"
+            delete = (
+                f"INSERT INTO {fts}({fts}, rowid, name) "
+                f"VALUES ('delete', old.{pk}, old.name);"
+            )
+            for name, event, body in [
+                ("ai", "AFTER INSERT", insert),
+                ("ad", "AFTER DELETE", delete),
+                ("au", "AFTER UPDATE OF name", delete + insert),
+            ]:
+                trigger = quote(f"{table(model)}_{name}")
+                cursor.execute(
+                    f"CREATE TRIGGER {trigger} {event} ON {content} BEGIN {body} END"
+                )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def search(
+    model: type[models.Model],
+    queryset: QuerySet[Any],
+    value: str,
+    prefix: str,
+) -> tuple[QuerySet[Any], Q]:
+    """Filter ``model`` rows, reached through ``prefix``, by ``value``."""
+    words = WORD.findall(value)
+    if not words:
+        return queryset, Q(**{f"{prefix}pk__in": []})
+    if connections[queryset.db].vendor != "sqlite":
+        lookups = (Q(**{f"{prefix}name__icontains": word}) for word in words)
+        return queryset, functools.reduce(operator.and_, lookups)
+
+    query = " ".join(f'"{word}"*' for word in words)
+    fts = table(model)
+    matches = RawSQL(f'SELECT rowid FROM "{fts}" WHERE "{fts}" MATCH %s', (query,))
+    if not prefix:
+        queryset = queryset.all()
+        rank_join = RankJoin(model, query, queryset.query.get_initial_alias())
+        alias = queryset.query.join(rank_join)  # type: ignore[arg-type]
+        rank = RawSQL(f'"{alias}"."rank"', ())
+        queryset = queryset.annotate(search_rank=rank).order_by("search_rank", "pk")
+    return queryset, Q(**{f"{prefix}pk__in": matches})
@@ -0,0 +1,315 @@
+"""Stream ``Fruit`` and ``Color`` rows from files into the database.
+
+Unlike ``loaddata``, inputs are parsed one record at a time and written
+with chunked ``bulk_create`` calls, each in its own transaction, so memory
+use is bounded by the batch size rather than the file size.
+
+Three formats are read:
+
+``json``
+    An array of objects, parsed incrementally.
+``ndjson``
+    One object per line.
+``csv``
+    A header row naming the columns.
+
+Records are either fixture objects, as written by ``dumpdata``
+(``{"model": "core.fruit", "pk": 1, "fields": {...}}``), or flat objects
+and CSV rows holding the fields of one model.  A fruit's ``color`` may be
+a color name or primary key and is resolved through :class:`ColorMap`.
+"""
+
+import csv
+import json
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Model
+
+from .models import Color, Fruit
+from .response_cache import response_cache
+
+FORMATS = ("json", "ndjson", "csv")
+SUFFIXES = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+MODELS: dict[str, type[Model]] = {
+    "fruit": Fruit,
+    "color": Color,
+    "core.fruit": Fruit,
+    "core.color": Color,
+}
+
+
+class InvalidRecord(ValueError):
+    """An input record cannot be imported."""
+
+
+@dataclass(frozen=True)
+class Record:
+    """One row to insert."""
+
+    model: type[Model]
+    fields: dict[str, Any]
+    pk: Any = None
+
+
+def detect_format(path: Path) -> str:
+    """Return the format implied by the suffix of ``path``."""
+    try:
+        return SUFFIXES[path.suffix.lower()]
+    except KeyError:
+        msg = f"Cannot tell the format of {path}; pass one of {', '.join(FORMATS)}"
+        raise InvalidRecord(msg) from None
+
+
+def iter_json_array(stream: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the items of the JSON array in ``stream`` one at a time."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Skip whitespace and separators, reading more input as needed.
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = stream.read(chunk_size), 0
+            eof = not buffer
+        if not started:
+            if buffer[position : position + 1] != "[":
+                msg = "Expected a JSON array"
+                raise InvalidRecord(msg)
+            started = True
+            position += 1
+            continue
+        if eof:
+            msg = "Unterminated JSON array"
+            raise InvalidRecord(msg)
+        if buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise InvalidRecord(str(error)) from error
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        # A number can be cut off at the end of the buffer; only trust it
+        # once the next character is in view.
+        if end == len(buffer) and not isinstance(item, (dict, list, str)):
+            chunk = stream.read(chunk_size)
+            if chunk:
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+        yield item
+        position = end
+
+
+def iter_ndjson(stream: IO[str]) -> Iterator[Any]:
+    """Yield the object on every non-blank line of ``stream``."""
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as error:
+            msg = f"Line {number}: {error}"
+            raise InvalidRecord(msg) from error
+
+
+def read(stream: IO[str], fmt: str) -> Iterator[Any]:
+    """Yield the raw records of ``stream`` in format ``fmt``."""
+    if fmt == "json":
+        return iter_json_array(stream)
+    if fmt == "ndjson":
+        return iter_ndjson(stream)
+    if fmt == "csv":
+        return iter(csv.DictReader(stream))
+    msg = f"Unknown format {fmt!r}"
+    raise InvalidRecord(msg)
+
+
+def to_record(raw: Any, model: type[Model] | None) -> Record:
+    """Return the :class:`Record` for a fixture object or a flat row."""
+    if not isinstance(raw, dict):
+        msg = f"Expected an object, got {raw!r}"
+        raise InvalidRecord(msg)
+    if "fields" in raw:
+        try:
+            fixture_model = MODELS[str(raw.get("model")).lower()]
+        except KeyError:
+            msg = f"Unknown model {raw.get('model')!r}"
+            raise InvalidRecord(msg) from None
+        return Record(fixture_model, dict(raw["fields"]), raw.get("pk"))
+    if model is None:
+        msg = "Records without a model need --model"
+        raise InvalidRecord(msg)
+    fields = {key: value for key, value in raw.items() if key not in {"id", "pk"}}
+    pk = raw.get("pk", raw.get("id")) or None
+    return Record(model, fields, pk)
+
+
+def synthetic(fruits: int, colors: int) -> Iterator[Record]:
+    """Yield ``colors`` colors, then ``fruits`` fruits spread over them."""
+    for i in range(colors):
+        yield Record(Color, {"name": f"color{i}"})
+    for i in range(fruits):
+        yield Record(Fruit, {"name": f"fruit{i}", "color": f"color{i % colors}"})
+
+
+class ColorMap:
+    """Color names and primary keys known to the database."""
+
+    def __init__(self) -> None:
+        self.by_name: dict[str, int] = {}
+        self.pks: set[int] = set()
+        for pk, name in Color.objects.order_by("pk").values_list("pk", "name"):
+            self.add(pk, name)
+
+    def add(self, pk: int, name: str) -> None:
+        """Remember a color; the oldest of several with one name wins."""
+        self.by_name.setdefault(name, pk)
+        self.pks.add(pk)
+
+    def resolve(self, value: Any) -> int | None:
+        """Return the pk of the color named or numbered ``value``."""
+        if value is None or value == "":
+            return None
+        if isinstance(value, str) and value in self.by_name:
+            return self.by_name[value]
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            pk = None
+        if pk is None or pk not in self.pks:
+            msg = f"Unknown color {value!r}"
+            raise InvalidRecord(msg)
+        return pk
+
+
+@dataclass
+class Importer:
+    """Insert :class:`Record` objects in batches of ``batch_size``.
+
+    ``on_batch`` is called with the model and the running count after
+    every committed batch.  Call :meth:`finish` once all records are in.
+    """
+
+    batch_size: int = 5000
+    create_colors: bool = False
+    on_batch: Callable[[type[Model], int], None] | None = None
+    counts: dict[type[Model], int] = field(default_factory=dict, init=False)
+    colors: ColorMap = field(default_factory=ColorMap, init=False)
+    _pending: dict[type[Model], list[Model]] = field(default_factory=dict, init=False)
+    _explicit_pks: set[type[Model]] = field(default_factory=set, init=False)
+
+    def add(self, record: Record) -> None:
+        """Queue ``record``, writing its batch once it is full."""
+        pending = self._pending.setdefault(record.model, [])
+        pending.append(self.build(record))
+        if len(pending) >= self.batch_size:
+            self.flush(record.model)
+
+    def add_all(self, records: Iterable[Record]) -> None:
+        """Queue every record of ``records``."""
+        for number, record in enumerate(records, start=1):
+            try:
+                self.add(record)
+            except InvalidRecord as error:
+                msg = f"Record {number}: {error}"
+                raise InvalidRecord(msg) from error
+
+    def add_file(self, path: Path, fmt: str, model: type[Model] | None) -> None:
+        """Queue the records of ``path``.
+
+        Without a default ``model`` the file holds fixture objects, which
+        may list fruits before their colors, so it is read twice: colors
+        first, then fruits.
+        """
+        passes: list[type[Model] | None] = [None] if model else [Color, Fruit]
+        for only in passes:
+            with path.open(newline="", encoding="utf-8") as stream:
+                try:
+                    for number, raw in enumerate(read(stream, fmt), start=1):
+                        try:
+                            record = to_record(raw, model)
+                            if only is None or record.model is only:
+                                self.add(record)
+                        except InvalidRecord as error:
+                            msg = f"Record {number}: {error}"
+                            raise InvalidRecord(msg) from error
+                except InvalidRecord as error:
+                    msg = f"{path}: {error}"
+                    raise InvalidRecord(msg) from error
+            self.flush(Color)
+
+    def build(self, record: Record) -> Model:
+        """Return the unsaved instance for ``record``."""
+        fields = dict(record.fields)
+        if record.pk is not None:
+            fields["pk"] = record.pk
+            self._explicit_pks.add(record.model)
+        if record.model is Fruit:
+            fields["color_id"] = self.color_pk(fields.pop("color", None))
+        return record.model(**fields)
+
+    def color_pk(self, value: Any) -> int | None:
+        """Resolve ``value``, creating a missing named color if allowed."""
+        try:
+            return self.colors.resolve(value)
+        except InvalidRecord:
+            if Color in self._pending:
+                # The color may be waiting in the current batch.
+                self.flush(Color)
+                return self.color_pk(value)
+            if not self.create_colors or not isinstance(value, str):
+                raise
+        color = Color.objects.create(name=value)
+        self.colors.add(color.pk, color.name)
+        self.counts[Color] = self.counts.get(Color, 0) + 1
+        return color.pk
+
+    def flush(self, model: type[Model]) -> None:
+        """Write the queued instances of ``model`` in one transaction."""
+        pending = self._pending.pop(model, [])
+        if not pending:
+            return
+        with transaction.atomic():
+            created = model._default_manager.bulk_create(pending)
+        if model is Color:
+            if any(color.pk is None for color in created):
+                # The backend cannot return primary keys from bulk inserts.
+                self.colors = ColorMap()
+            for color in created:
+                if color.pk is not None:
+                    self.colors.add(color.pk, color.name)  # type: ignore[attr-defined]
+        self.counts[model] = self.counts.get(model, 0) + len(pending)
+        if self.on_batch is not None:
+            self.on_batch(model, self.counts[model])
+
+    def finish(self) -> dict[type[Model], int]:
+        """Write what is left, fix sequences and drop stale responses."""
+        for model in [Color, Fruit]:
+            self.flush(model)
+        if self._explicit_pks:
+            statements = connection.ops.sequence_reset_sql(
+                no_style(),
+                list(self._explicit_pks),
+            )
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+        # bulk_create sends no post_save signals.
+        for model in self.counts:
+            response_cache.invalidate(model)
+        return self.counts
@@ -0,0 +1,343 @@
+"""Per-request batch loading of model relations.
+
+Resolving ``Fruit.color`` or ``Color.fruits`` one parent at a time costs a
+query per row.  :class:`RelationLoader` instead gathers the keys of every
+parent resolved at the same depth and fetches them with a single
+``IN (...)`` query.
+
+Async execution batches through :class:`strawberry.dataloader.DataLoader`,
+since graphql-core resolves the items of a list concurrently and every key
+requested in the same tick ends up in one batch.  Sync execution is
+depth-first, so there the keys are taken from the *peers* of the instance
+being resolved: the other rows returned by the same list field, registered
+with :meth:`Loaders.add_peers` as lists are resolved.
+
+:class:`CountLoader` batches counts of a reverse relation the same way, and
+:class:`HeadLoader` the first rows of relation lists marked ``@stream``.
+"""
+
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import models
+from django.db.models import Count, F, Window
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor,
+    ReverseManyToOneDescriptor,
+)
+from django.db.models.functions import RowNumber
+from strawberry.dataloader import DataLoader
+
+from .metrics import registry
+
+
+class RelationLoader:
+    """Batch loader for one forward or reverse foreign key of a model.
+
+    Parameters
+    ----------
+    model : type[models.Model]
+        Model declaring the relation, e.g. ``Fruit``.
+    name : str
+        Name of the relation on ``model``, e.g. ``"color"``.
+    loaders : Loaders
+        Request-scoped registry, used to look up peers of an instance.
+    """
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        name: str,
+        loaders: "Loaders",
+    ) -> None:
+        descriptor = getattr(model, name)
+        if isinstance(descriptor, ReverseManyToOneDescriptor):
+            self.many = True
+            self.fk = descriptor.field
+            self.source_attname = self.fk.target_field.attname
+            self.target_attname = self.fk.attname
+            self.manager = self.fk.model._default_manager
+        elif isinstance(descriptor, ForwardManyToOneDescriptor):
+            self.many = False
+            self.fk = descriptor.field
+            self.source_attname = self.fk.attname
+            self.target_attname = self.fk.target_field.attname
+            related_model = self.fk.related_model
+            assert related_model is not None
+            assert not isinstance(related_model, str)
+            self.manager = related_model._base_manager
+        else:
+            msg = f"{model.__name__}.{name} is not a foreign key relation"
+            raise TypeError(msg)
+
+        self.name = name
+        self.labels = (("relation", f"{model.__name__}.{name}"),)
+        self.loaders = loaders
+        self.cache: dict[Hashable, Any] = {}
+        self._dataloader: DataLoader[Hashable, Any] | None = None
+
+    def is_cached(self, instance: models.Model) -> bool:
+        """Return whether Django already holds the relation for ``instance``.
+
+        This is the case after ``select_related``/``prefetch_related`` or when
+        the instance was reached through the reverse side of the relation.
+        """
+        if self.many:
+            prefetched = getattr(instance, "_prefetched_objects_cache", {})
+            return self.name in prefetched
+        return bool(self.fk.is_cached(instance))
+
+    def fetch(self, keys: Iterable[Hashable]) -> None:
+        """Load every key not cached yet with one query."""
+        missing = {key for key in keys if key is not None} - self.cache.keys()
+        if not missing:
+            return
+
+        registry.inc("graphql_loader_batches_total", self.labels)
+        rows = list(
+            self.manager.filter(**{f"{self.target_attname}__in": missing}),
+        )
+        if self.many:
+            grouped: dict[Hashable, Any] = {key: [] for key in missing}
+            for row in rows:
+                grouped[getattr(row, self.target_attname)].append(row)
+        else:
+            grouped = dict.fromkeys(missing)
+            for row in rows:
+                grouped[getattr(row, self.target_attname)] = row
+
+        self.cache.update(grouped)
+        self.loaders.add_peers(rows)
+
+    def load(self, instance: models.Model) -> Any:
+        """Return the related object(s) of ``instance``, batching its peers."""
+        key = getattr(instance, self.source_attname)
+        registry.inc("graphql_loader_loads_total", self.labels)
+        if key in self.cache:
+            registry.inc("graphql_loader_hits_total", self.labels)
+        else:
+            peers = self.loaders.peers_of(instance)
+            self.fetch(getattr(peer, self.source_attname) for peer in peers)
+        return self._finish(instance, self.cache.get(key))
+
+    async def aload(self, instance: models.Model) -> Any:
+        """Async variant of :meth:`load`, batching keys per event loop tick."""
+        key = getattr(instance, self.source_attname)
+        registry.inc("graphql_loader_loads_total", self.labels)
+        if key in self.cache:
+            registry.inc("graphql_loader_hits_total", self.labels)
+            value = self.cache[key]
+        elif key is None:
+            value = None
+        else:
+            if self._dataloader is None:
+                self._dataloader = DataLoader(load_fn=self._batch_load)
+            value = await self._dataloader.load(key)
+        return self._finish(instance, value)
+
+    async def _batch_load(self, keys: list[Hashable]) -> list[Any]:
+        await sync_to_async(self.fetch)(keys)
+        return [self.cache[key] for key in keys]
+
+    def _finish(self, instance: models.Model, value: Any) -> Any:
+        if not self.many:
+            return value
+        if value is None:
+            return []
+        # Mirror Django's reverse managers, which point each child back to
+        # its parent so that ``fruits { color }`` costs no extra query.
+        for child in value:
+            self.fk.set_cached_value(child, instance)
+        return value
+
+
+class CountLoader(RelationLoader):
+    """Batch loader counting the rows of one reverse foreign key.
+
+    The counts of every peer are read with one ``GROUP BY`` query, so
+    ``fruitCount`` on colors the optimizer did not annotate, such as those
+    reached through ``Fruit.color``, costs one query per request.
+    """
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        name: str,
+        loaders: "Loaders",
+    ) -> None:
+        super().__init__(model, name, loaders)
+        if not self.many:
+            msg = f"{model.__name__}.{name} is not a reverse foreign key"
+            raise TypeError(msg)
+        self.labels = (("relation", f"{model.__name__}.{name}.count"),)
+
+    def is_cached(self, instance: models.Model) -> bool:
+        """Return ``False``; counts are never cached on the instance."""
+        return False
+
+    def fetch(self, keys: Iterable[Hashable]) -> None:
+        """Count the rows of every key not cached yet with one query."""
+        missing = {key for key in keys if key is not None} - self.cache.keys()
+        if not missing:
+            return
+
+        registry.inc("graphql_loader_batches_total", self.labels)
+        counts = (
+            self.manager.filter(**{f"{self.target_attname}__in": missing})
+            .order_by()
+            .values_list(self.target_attname)
+            .annotate(count=Count("*"))
+        )
+        self.cache.update(dict.fromkeys(missing, 0))
+        self.cache.update(counts)
+
+    def _finish(self, instance: models.Model, value: Any) -> Any:
+        return value or 0
+
+
+class HeadLoader(RelationLoader):
+    """Batch loader for the first rows of one reverse foreign key.
+
+    ``@stream`` on a relation list sends the first ``count`` rows of every
+    parent in the initial payload, which are read with one window query
+    over ``queryset``; :meth:`rest` reads the remaining rows of one parent
+    when its stream is sent.  Rows come in ``queryset``'s order, then by
+    primary key.
+    """
+
+    def __init__(
+        self,
+        model: type[models.Model],
+        name: str,
+        loaders: "Loaders",
+        queryset: models.QuerySet[Any],
+        count: int,
+    ) -> None:
+        super().__init__(model, name, loaders)
+        if not self.many:
+            msg = f"{model.__name__}.{name} is not a reverse foreign key"
+            raise TypeError(msg)
+        self.labels = (("relation", f"{model.__name__}.{name}.head"),)
+        self.queryset = queryset.order_by(*queryset.query.order_by, "pk")
+        self.count = count
+
+    def is_cached(self, instance: models.Model) -> bool:
+        """Return ``False``; streamed rows are never prefetched."""
+        return False
+
+    def fetch(self, keys: Iterable[Hashable]) -> None:
+        """Read the first rows of every key not cached yet with one query."""
+        missing = {key for key in keys if key is not None} - self.cache.keys()
+        if not missing:
+            return
+
+        registry.inc("graphql_loader_batches_total", self.labels)
+        # The optimizer may have deferred the foreign key, so it is
+        # selected under another name to group the rows.
+        rows = self.queryset.annotate(
+            _stream_key=F(self.target_attname),
+            _stream_row=Window(
+                RowNumber(),
+                partition_by=F(self.target_attname),
+                order_by=self.queryset.query.order_by,  # type: ignore[arg-type]
+            ),
+        ).filter(
+            **{f"{self.target_attname}__in": missing, "_stream_row__lte": self.count}
+        )
+        grouped: dict[Hashable, Any] = {key: [] for key in missing}
+        for row in rows:
+            grouped[row._stream_key].append(row)
+        self.cache.update(grouped)
+
+    async def rest(
+        self,
+        instance: models.Model,
+        chunk_size: int,
+    ) -> AsyncIterator[models.Model]:
+        """Yield the rows of ``instance`` after the first ``count``."""
+        key = getattr(instance, self.source_attname)
+        rows = self.queryset.filter(**{self.target_attname: key})[self.count :]
+        async for row in rows.aiterator(chunk_size=chunk_size):
+            self.fk.set_cached_value(row, instance)
+            yield row
+
+
+@dataclass
+class Loaders:
+    """Request-scoped registry of :class:`RelationLoader` instances."""
+
+    relations: dict[tuple[type[models.Model], str], RelationLoader] = field(
+        default_factory=dict,
+    )
+    counts: dict[tuple[type[models.Model], str], CountLoader] = field(
+        default_factory=dict,
+    )
+    heads: dict[tuple[type[models.Model], str, Hashable], HeadLoader] = field(
+        default_factory=dict,
+    )
+    peers: dict[int, Sequence[models.Model]] = field(default_factory=dict)
+
+    def relation(self, model: type[models.Model], name: str) -> RelationLoader:
+        """Return the loader for ``model.name``, creating it on first use."""
+        key = (model, name)
+        if key not in self.relations:
+            self.relations[key] = RelationLoader(model, name, self)
+        return self.relations[key]
+
+    def count(self, model: type[models.Model], name: str) -> CountLoader:
+        """Return the counting loader for ``model.name``."""
+        key = (model, name)
+        if key not in self.counts:
+            self.counts[key] = CountLoader(model, name, self)
+        return self.counts[key]
+
+    def head(
+        self,
+        model: type[models.Model],
+        name: str,
+        selection: Hashable,
+        queryset: Callable[[], models.QuerySet[Any]],
+        count: int,
+    ) -> HeadLoader:
+        """Return the loader of the first rows of ``model.name``.
+
+        Every selection of the relation gets its own loader, which reads
+        the rows of ``queryset()`` built on first use.
+        """
+        key = (model, name, selection)
+        if key not in self.heads:
+            self.heads[key] = HeadLoader(model, name, self, queryset(), count)
+        return self.heads[key]
+
+    def add_peers(self, instances: Sequence[models.Model]) -> None:
+        """Record ``instances`` as resolved together by one list field."""
+        if len(instances) < 2:
+            return
+        for instance in instances:
+            self.peers[id(instance)] = instances
+
+    def add_cached_peers(
+        self,
+        loader: RelationLoader,
+        instance: models.Model,
+    ) -> None:
+        """Record the objects cached on ``instance``'s peers as peers.
+
+        Objects fetched with ``select_related`` are not returned by a list
+        field, so this lets their own relations batch across the parents.
+        """
+        related = loader.fk.get_cached_value(instance)
+        if related is None or id(related) in self.peers:
+            return
+        cached = (
+            loader.fk.get_cached_value(peer)
+            for peer in self.peers_of(instance)
+            if loader.is_cached(peer)
+        )
+        self.add_peers([obj for obj in cached if obj is not None])
+
+    def peers_of(self, instance: models.Model) -> Sequence[models.Model]:
+        """Return the instances resolved alongside ``instance``."""
+        return self.peers.get(id(instance), (instance,))
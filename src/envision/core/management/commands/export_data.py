@@ -0,0 +1,53 @@
+"""Stream fruits or colors as NDJSON or CSV."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from envision.core.exporter import BATCH_SIZE, FORMATS, MODELS, batches, export
+
+
+class Command(BaseCommand):
+    """Export every row in constant memory, for syncs and backups."""
+
+    help = "Write all fruits or colors, optionally filtered, as NDJSON or CSV."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Accept the model, format, filters and destination."""
+        parser.add_argument("name", choices=list(MODELS))
+        parser.add_argument("--format", choices=list(FORMATS), default="ndjson")
+        parser.add_argument(
+            "--filters",
+            type=json.loads,
+            help="FruitFilter or ColorFilter value as JSON.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="File to write; standard output by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Write the export to ``--output`` or standard output."""
+        try:
+            lines = export(
+                options["name"],
+                options["format"],
+                options["filters"],
+                options["chunk_size"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+
+        if options["output"] is None:
+            for batch in batches(lines, BATCH_SIZE):
+                self.stdout.write(batch, ending="")
+            return
+        try:
+            with options["output"].open("w", newline="", encoding="utf-8") as file:
+                file.writelines(batches(lines, BATCH_SIZE))
+        except OSError as error:
+            raise CommandError(str(error)) from error
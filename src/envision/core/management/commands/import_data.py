@@ -0,0 +1,104 @@
+"""Stream fruits and colors from JSON, NDJSON or CSV files."""
+
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db.models import Model
+
+from envision.core.importer import (
+    FORMATS,
+    MODELS,
+    Importer,
+    InvalidRecord,
+    detect_format,
+    synthetic,
+)
+
+
+class Command(BaseCommand):
+    """Import large datasets in batches, a scalable ``loaddata``."""
+
+    help = (
+        "Import fruits and colors from JSON arrays, NDJSON or CSV files in "
+        "batched bulk inserts, or generate a synthetic dataset."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Accept the input files, or the size of a synthetic dataset."""
+        parser.add_argument("files", nargs="*", type=Path)
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format; guessed from the file suffix by default.",
+        )
+        parser.add_argument(
+            "--model",
+            choices=["fruit", "color"],
+            help="Model of records that are not fixture objects.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--create-colors",
+            action="store_true",
+            help="Create colors named by fruits but missing from the database.",
+        )
+        parser.add_argument(
+            "--generate",
+            type=int,
+            metavar="FRUITS",
+            help="Insert FRUITS synthetic fruits instead of reading files.",
+        )
+        parser.add_argument(
+            "--colors",
+            type=int,
+            default=100,
+            help="Number of synthetic colors to spread the fruits over.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Import every file, or the synthetic dataset, and report counts."""
+        if bool(options["files"]) == (options["generate"] is not None):
+            msg = "Pass either input files or --generate"
+            raise CommandError(msg)
+        if options["colors"] < 1:
+            msg = "--colors must be at least 1"
+            raise CommandError(msg)
+
+        start = time.perf_counter()
+        verbosity = options["verbosity"]
+
+        def progress(model: type[Model], count: int) -> None:
+            if verbosity >= 2:
+                rate = count / (time.perf_counter() - start)
+                self.stderr.write(
+                    f"{model._meta.verbose_name_plural}: {count} ({rate:.0f}/s)",
+                )
+
+        importer = Importer(
+            batch_size=options["batch_size"],
+            create_colors=options["create_colors"],
+            on_batch=progress,
+        )
+        model = MODELS[options["model"]] if options["model"] else None
+        try:
+            if options["generate"] is not None:
+                importer.add_all(synthetic(options["generate"], options["colors"]))
+            for path in options["files"]:
+                importer.add_file(path, options["format"] or detect_format(path), model)
+            counts = importer.finish()
+        except (InvalidRecord, OSError) as error:
+            raise CommandError(str(error)) from error
+
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        rate = total / elapsed if elapsed else 0
+        if verbosity >= 1:
+            for counted, count in counts.items():
+                self.stdout.write(
+                    f"Imported {count} {counted._meta.verbose_name_plural}"
+                )
+            self.stdout.write(
+                f"{total} rows in {elapsed:.2f}s ({rate:.0f} rows/s)",
+            )
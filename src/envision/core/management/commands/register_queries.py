@@ -0,0 +1,29 @@
+"""Register GraphQL documents as persisted queries."""
+
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from envision.core.persisted_queries import persisted_query_store
+
+
+class Command(BaseCommand):
+    """Add documents to the persisted query store, e.g. to fill the allow-list."""
+
+    help = "Register each file as one persisted GraphQL document."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Accept the document files to register."""
+        parser.add_argument("files", nargs="+", type=Path)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Register every file and print its hash."""
+        for path in options["files"]:
+            try:
+                query = path.read_text()
+            except OSError as error:
+                msg = f"Cannot read {path}: {error}"
+                raise CommandError(msg) from error
+            sha256 = persisted_query_store.add(query)
+            self.stdout.write(f"{sha256}  {path}")
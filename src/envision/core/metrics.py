@@ -0,0 +1,480 @@
+"""Prometheus metrics for GraphQL operations and database usage.
+
+:class:`MetricsExtension` counts every operation by name and type, with
+its errors, duration and SQL statements.  Database statements are counted
+per connection alias by the ``execute_wrapper`` of :mod:`.tracing`, which
+also feeds per-resolver histograms for sampled traces.  Relation loaders,
+the document cache and the response cache report their hit counts.
+
+Counters live in per-thread shards, so recording is a dictionary update
+without locking; :meth:`Registry.snapshot` sums the shards when scraped.
+
+With ``GRAPHQL_METRICS_DIR`` set, every process also writes its snapshot
+to ``<pid>.json`` in that directory, at most every
+``GRAPHQL_METRICS_FLUSH_INTERVAL`` seconds and on exit.  A scrape of any
+process then adds up the files, so counters of every worker are reported,
+while gauges only count processes that are still running.  Empty the
+directory before starting the server.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from strawberry.extensions import SchemaExtension
+
+from .documents import document_cache
+from .response_cache import response_cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds, as used by Prometheus client libraries.
+BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+# Name, type and help text of every metric.
+METRICS = {
+    "graphql_operations_total": (
+        "counter",
+        "GraphQL operations executed.",
+    ),
+    "graphql_operation_errors_total": (
+        "counter",
+        "GraphQL operations answered with errors.",
+    ),
+    "graphql_operation_duration_seconds": (
+        "histogram",
+        "Time taken by GraphQL operations.",
+    ),
+    "graphql_operation_sql_queries_total": (
+        "counter",
+        "SQL statements run by GraphQL operations.",
+    ),
+    "graphql_phase_duration_seconds": (
+        "histogram",
+        "Time taken by each phase of sampled operations.",
+    ),
+    "graphql_resolver_duration_seconds": (
+        "histogram",
+        "Time taken by the resolvers of sampled operations.",
+    ),
+    "graphql_resolver_sql_queries_total": (
+        "counter",
+        "SQL statements run by the resolvers of sampled operations.",
+    ),
+    "graphql_loader_loads_total": (
+        "counter",
+        "Relations requested from relation loaders.",
+    ),
+    "graphql_loader_hits_total": (
+        "counter",
+        "Relations answered from the cache of a relation loader.",
+    ),
+    "graphql_loader_batches_total": (
+        "counter",
+        "Queries run by relation loaders.",
+    ),
+    "graphql_document_cache_hits_total": (
+        "counter",
+        "Documents found in the document cache.",
+    ),
+    "graphql_document_cache_misses_total": (
+        "counter",
+        "Documents parsed and validated.",
+    ),
+    "graphql_document_cache_entries": (
+        "gauge",
+        "Documents held by the document cache.",
+    ),
+    "graphql_response_cache_hits_total": (
+        "counter",
+        "Responses served from the response cache.",
+    ),
+    "graphql_response_cache_misses_total": (
+        "counter",
+        "Cacheable responses not found in the response cache.",
+    ),
+    "graphql_response_cache_invalidations_total": (
+        "counter",
+        "Response cache invalidations.",
+    ),
+    "django_db_queries_total": (
+        "counter",
+        "SQL statements executed.",
+    ),
+    "django_db_query_duration_seconds_total": (
+        "counter",
+        "Time spent executing SQL statements.",
+    ),
+    "django_db_connections_created_total": (
+        "counter",
+        "Database connections opened.",
+    ),
+    "django_db_connections_open": (
+        "gauge",
+        "Database connections currently open.",
+    ),
+}
+
+Labels = tuple[tuple[str, str], ...]
+Key = tuple[str, Labels]
+Sample = tuple[str, Labels, float]
+
+
+class Histogram:
+    """Counts of observed durations per bucket, with their sum."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        """Return the number of observations."""
+        return sum(self.counts)
+
+    def observe(self, seconds: float) -> None:
+        """Add one observation."""
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def add(self, counts: Iterable[int], total: float) -> None:
+        """Add the observations of another histogram."""
+        self.counts = [a + b for a, b in zip(self.counts, counts, strict=True)]
+        self.sum += total
+
+
+@dataclass
+class Snapshot:
+    """Metric values at one point in time."""
+
+    counters: dict[Key, float] = field(default_factory=dict)
+    gauges: dict[Key, float] = field(default_factory=dict)
+    histograms: dict[Key, Histogram] = field(default_factory=dict)
+
+    def add(self, other: "Snapshot", *, gauges: bool = True) -> None:
+        """Add the values of ``other``, leaving out its gauges if asked."""
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0.0) + value
+        if gauges:
+            for key, value in other.gauges.items():
+                self.gauges[key] = self.gauges.get(key, 0.0) + value
+        for key, histogram in other.histograms.items():
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].add(histogram.counts, histogram.sum)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot as JSON-compatible data."""
+        return {
+            "counters": [[*key, value] for key, value in self.counters.items()],
+            "gauges": [[*key, value] for key, value in self.gauges.items()],
+            "histograms": [
+                [*key, histogram.counts, histogram.sum]
+                for key, histogram in self.histograms.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Snapshot":
+        """Return the snapshot written by :meth:`as_dict`."""
+        snapshot = cls()
+        for name, labels, value in data["counters"]:
+            snapshot.counters[name, _labels(labels)] = value
+        for name, labels, value in data["gauges"]:
+            snapshot.gauges[name, _labels(labels)] = value
+        for name, labels, counts, total in data["histograms"]:
+            histogram = snapshot.histograms[name, _labels(labels)] = Histogram()
+            histogram.add(counts, total)
+        return snapshot
+
+
+def _labels(pairs: Iterable[Iterable[str]]) -> Labels:
+    return tuple((name, value) for name, value in pairs)
+
+
+class _Shard:
+    """Values recorded by one thread; only that thread writes to it."""
+
+    def __init__(self) -> None:
+        self.counters: dict[Key, float] = {}
+        self.histograms: dict[Key, Histogram] = {}
+
+
+class Registry:
+    """In-process metrics, recorded into per-thread shards."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._lock = threading.Lock()
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+        self._operations: set[str] = set()
+        self._flushed = 0.0
+
+    def _shard(self) -> _Shard:
+        shard: _Shard | None = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1) -> None:
+        """Add ``value`` to the counter ``name``."""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Labels, seconds: float) -> None:
+        """Add one observation to the histogram ``name``."""
+        histograms = self._shard().histograms
+        histogram = histograms.get((name, labels))
+        if histogram is None:
+            histogram = histograms[name, labels] = Histogram()
+        histogram.observe(seconds)
+
+    def operation(self, name: str | None) -> str:
+        """Return the label for operation ``name``, bounding their number."""
+        name = name or "anonymous"
+        if name in self._operations:
+            return name
+        if len(self._operations) >= getattr(
+            settings, "GRAPHQL_METRICS_MAX_OPERATIONS", 100
+        ):
+            return "other"
+        self._operations.add(name)
+        return name
+
+    def collector(
+        self, func: Callable[[], Iterable[Sample]]
+    ) -> Callable[[], Iterable[Sample]]:
+        """Register ``func`` to report values kept elsewhere at scrape time."""
+        self._collectors.append(func)
+        return func
+
+    def snapshot(self) -> Snapshot:
+        """Return the values of this process."""
+        snapshot = Snapshot()
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # Copying a dict is atomic, so the owning thread may keep writing.
+            for key, value in shard.counters.copy().items():
+                snapshot.counters[key] = snapshot.counters.get(key, 0.0) + value
+            for key, histogram in shard.histograms.copy().items():
+                if key not in snapshot.histograms:
+                    snapshot.histograms[key] = Histogram()
+                snapshot.histograms[key].add(list(histogram.counts), histogram.sum)
+        for collect in self._collectors:
+            for name, labels, value in collect():
+                kind = METRICS[name][0]
+                values = snapshot.gauges if kind == "gauge" else snapshot.counters
+                values[name, labels] = values.get((name, labels), 0.0) + value
+        return snapshot
+
+    def reset(self) -> None:
+        """Drop every recorded value."""
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+            self._operations.clear()
+
+    def flush(self) -> None:
+        """Write the snapshot of this process to ``GRAPHQL_METRICS_DIR``."""
+        path = directory()
+        if path is None:
+            return
+        self._flushed = time.monotonic()
+        data = json.dumps(self.snapshot().as_dict())
+        target = path / f"{os.getpid()}.json"
+        temporary = target.with_suffix(".tmp")
+        temporary.write_text(data)
+        temporary.replace(target)
+
+    def maybe_flush(self) -> None:
+        """Call :meth:`flush` unless it ran within the flush interval."""
+        interval = getattr(settings, "GRAPHQL_METRICS_FLUSH_INTERVAL", 1.0)
+        if time.monotonic() - self._flushed >= interval:
+            self.flush()
+
+    def collect(self) -> Snapshot:
+        """Return the values of every process sharing the metrics directory."""
+        path = directory()
+        if path is None:
+            return self.snapshot()
+        self.flush()
+        total = Snapshot()
+        for file in path.glob("*.json"):
+            try:
+                snapshot = Snapshot.from_dict(json.loads(file.read_text()))
+            except (OSError, ValueError):
+                continue
+            total.add(snapshot, gauges=is_running(int(file.stem)))
+        return total
+
+
+def directory() -> Path | None:
+    """Return the directory shared by worker processes, if any."""
+    path = getattr(settings, "GRAPHQL_METRICS_DIR", None)
+    return None if path is None else Path(path)
+
+
+def is_running(pid: int) -> bool:
+    """Return whether process ``pid`` exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format(name: str, labels: Labels, value: float) -> str:
+    number = str(int(value)) if value == int(value) else repr(value)
+    if not labels:
+        return f"{name} {number}"
+    pairs = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+    return f"{name}{{{pairs}}} {number}"
+
+
+def render(snapshot: Snapshot) -> str:
+    """Return ``snapshot`` in the Prometheus text exposition format."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if kind == "histogram":
+            for (_, labels), histogram in sorted(
+                (key, histogram)
+                for key, histogram in snapshot.histograms.items()
+                if key[0] == name
+            ):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts, strict=True):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        _format(f"{name}_bucket", (*labels, ("le", le)), cumulative)
+                    )
+                lines.append(_format(f"{name}_sum", labels, histogram.sum))
+                lines.append(_format(f"{name}_count", labels, histogram.count))
+        else:
+            values = snapshot.gauges if kind == "gauge" else snapshot.counters
+            for (_, labels), value in sorted(
+                (key, value) for key, value in values.items() if key[0] == name
+            ):
+                lines.append(_format(name, labels, value))
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.flush)
+
+_sql_queries: ContextVar[list[int] | None] = ContextVar(
+    "graphql_metrics_sql_queries", default=None
+)
+_connections: "weakref.WeakSet[BaseDatabaseWrapper]" = weakref.WeakSet()
+_connections_lock = threading.Lock()
+
+
+def record_query(connection: BaseDatabaseWrapper, seconds: float) -> None:
+    """Count one SQL statement run on ``connection``."""
+    labels = (("alias", connection.alias),)
+    registry.inc("django_db_queries_total", labels)
+    registry.inc("django_db_query_duration_seconds_total", labels, seconds)
+    queries = _sql_queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+
+def track(connection: BaseDatabaseWrapper) -> None:
+    """Count ``connection`` as opened and report it while it stays open."""
+    registry.inc("django_db_connections_created_total", (("alias", connection.alias),))
+    with _connections_lock:
+        _connections.add(connection)
+
+
+@registry.collector
+def _open_connections() -> Iterator[Sample]:
+    with _connections_lock:
+        connections = list(_connections)
+    counts = Counter(c.alias for c in connections if c.connection is not None)
+    for alias in settings.DATABASES:
+        yield "django_db_connections_open", (("alias", alias),), counts[alias]
+
+
+@registry.collector
+def _caches() -> Iterator[Sample]:
+    documents = document_cache.info()
+    yield "graphql_document_cache_hits_total", (), documents.hits
+    yield "graphql_document_cache_misses_total", (), documents.misses
+    yield "graphql_document_cache_entries", (), documents.size
+    responses = response_cache.info()
+    yield "graphql_response_cache_hits_total", (), responses.hits
+    yield "graphql_response_cache_misses_total", (), responses.misses
+    yield "graphql_response_cache_invalidations_total", (), responses.invalidations
+
+
+class MetricsExtension(SchemaExtension):
+    """Count operations with their errors, duration and SQL statements."""
+
+    def on_operation(self) -> Iterator[None]:
+        """Time the operation and record it once it is answered."""
+        start = time.perf_counter()
+        queries = [0]
+        token = _sql_queries.set(queries)
+        try:
+            yield
+        finally:
+            _sql_queries.reset(token)
+        elapsed = time.perf_counter() - start
+
+        ec = self.execution_context
+        try:
+            operation_type = ec.operation_type.value
+        except RuntimeError:
+            operation_type = "unknown"
+        labels = (
+            ("operation_name", registry.operation(ec.operation_name)),
+            ("operation_type", operation_type),
+        )
+        registry.inc("graphql_operations_total", labels)
+        registry.observe("graphql_operation_duration_seconds", labels, elapsed)
+        registry.inc("graphql_operation_sql_queries_total", labels, queries[0])
+        if ec.pre_execution_errors or (ec.result is not None and ec.result.errors):
+            registry.inc("graphql_operation_errors_total", labels)
+        registry.maybe_flush()
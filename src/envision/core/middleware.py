@@ -0,0 +1,32 @@
+"""Middleware for API-only GraphQL traffic (see ``envision.settings.api``)."""
+
+from functools import partial
+from typing import Any
+
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware, get_user
+from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+
+async def auser(request: HttpRequest) -> Any:
+    """Return the user of ``request``, sharing the lookup of ``request.user``."""
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = await auth.aget_user(request)  # type: ignore[attr-defined]
+    return request._cached_user  # type: ignore[attr-defined]
+
+
+class LazyUserMiddleware(AuthenticationMiddleware):
+    """Load the user when it is first asked for, once per request.
+
+    Django's middleware keeps separate results for ``request.user`` and
+    ``await request.auser()``, so a request using both looks the user up
+    twice; here both read one cache.  Requests that never ask for the user,
+    anonymous reads included, run no session or user query.
+    """
+
+    def process_request(self, request: HttpRequest) -> None:
+        """Attach the lazy ``user`` and ``auser`` to ``request``."""
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))  # type: ignore[assignment]
+        request.auser = partial(auser, request)
@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="color",
+            name="fruit_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="fruit",
+            name="color",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="fruits",
+                to="core.color",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="color",
+            index=models.Index(fields=["name"], name="core_color_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="fruit",
+            index=models.Index(fields=["name"], name="core_fruit_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="fruit",
+            index=models.Index(
+                fields=["color", "name"], name="core_fruit_color_name_idx"
+            ),
+        ),
+    ]
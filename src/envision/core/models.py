@@ -1,5 +1,7 @@
 """Kudos: https://github.com/strawberry-graphql/strawberry-django/blob/b8fa1c1/examples/django/app/models.py"""
 
+from typing import ClassVar
+
 from django.db import models
 
 
@@ -11,8 +13,27 @@ class Fruit(models.Model):
         null=True,
         related_name="fruits",
         on_delete=models.CASCADE,
+        # Covered by the (color, name) index below.
+        db_index=False,
     )
 
+    class Meta:
+        """Indexes of name lookups and of fruits by color."""
+
+        indexes: ClassVar[list[models.Index]] = [
+            models.Index(fields=["name"], name="core_fruit_name_idx"),
+            models.Index(fields=["color", "name"], name="core_fruit_color_name_idx"),
+        ]
+
 
 class Color(models.Model):
     name = models.CharField(max_length=20)
+    # Number of fruits, kept up to date by ``counters.install``'s triggers.
+    fruit_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        """Index of name lookups."""
+
+        indexes: ClassVar[list[models.Index]] = [
+            models.Index(fields=["name"], name="core_color_name_idx"),
+        ]
@@ -0,0 +1,207 @@
+"""Password validation and hashing for ``register``, on a dedicated pool.
+
+Hashing a password costs hundreds of milliseconds of CPU by design.  The
+async view runs every ORM call on one shared thread (``sync_to_async``
+is thread sensitive), so a registration hashing there holds up the
+database access of every concurrent request.  :class:`RegisterMutation`
+validates and hashes the password on :class:`HashingPool` first, and
+only then enters that thread to save the user.
+
+The pool runs ``GRAPHQL_PASSWORD_WORKERS`` threads; Django's hashers
+(PBKDF2 through ``hashlib``, bcrypt, argon2) release the GIL while they
+compute.  At most ``GRAPHQL_PASSWORD_QUEUE`` passwords wait for a
+worker: registrations beyond that fail right away with a
+``SERVICE_UNAVAILABLE`` error instead of piling up.
+
+:func:`preload` builds the password validators when the app is ready,
+keeping the common-password list as a sorted tuple instead of a set.
+"""
+
+import asyncio
+import bisect
+import dataclasses
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import (
+    CommonPasswordValidator,
+    get_default_password_validators,
+    validate_password,
+)
+from graphql import GraphQLError
+from strawberry.types import Info
+from strawberry.utils.inspect import in_async_context
+from strawberry_django.auth.mutations import DjangoRegisterMutation
+from strawberry_django.mutations import resolvers
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+
+class Words:
+    """Sorted, immutable word list supporting ``in``.
+
+    Takes a third of the memory of the set it replaces, in every worker.
+    """
+
+    __slots__ = ("words",)
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self.words = tuple(sorted(words))
+
+    def __contains__(self, word: object) -> bool:
+        """Return whether ``word`` is in the list."""
+        if not isinstance(word, str):
+            return False
+        index = bisect.bisect_left(self.words, word)
+        return index < len(self.words) and self.words[index] == word
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the words in order."""
+        return iter(self.words)
+
+    def __len__(self) -> int:
+        """Return the number of words."""
+        return len(self.words)
+
+
+def preload() -> None:
+    """Build the password validators, compacting the common-password list."""
+    for validator in get_default_password_validators():
+        if isinstance(validator, CommonPasswordValidator) and not isinstance(
+            validator.passwords, Words
+        ):
+            validator.passwords = Words(validator.passwords)  # type: ignore[assignment]
+
+
+def encode(password: str) -> str:
+    """Validate ``password`` and return its hash."""
+    validate_password(password)
+    return make_password(password)
+
+
+class HashingPool:
+    """Bounded thread pool running :func:`encode`.
+
+    Parameters
+    ----------
+    workers : int
+        Number of hashing threads.
+    queue : int
+        Number of passwords allowed to wait for a thread.
+    """
+
+    def __init__(self, workers: int, queue: int) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="password",
+        )
+        self.slots = threading.BoundedSemaphore(workers + queue)
+
+    def submit(self, password: str) -> Future[str]:
+        """Schedule hashing ``password``.
+
+        Raises
+        ------
+        GraphQLError
+            If every worker is busy and the queue is full.
+        """
+        if not self.slots.acquire(blocking=False):
+            msg = "Too many registrations in progress; retry shortly"
+            raise GraphQLError(msg, extensions={"code": "SERVICE_UNAVAILABLE"})
+        future = self.executor.submit(encode, password)
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+
+_pool: HashingPool | None = None
+_pool_lock = threading.Lock()
+
+
+def pool() -> HashingPool | None:
+    """Return the process's pool, or ``None`` to hash inline."""
+    global _pool
+    workers: int = getattr(settings, "GRAPHQL_PASSWORD_WORKERS", 2)
+    if not workers:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = HashingPool(workers, getattr(settings, "GRAPHQL_PASSWORD_QUEUE", 8))
+        return _pool
+
+
+def _reset() -> None:
+    global _pool
+    _pool = None
+
+
+# Threads do not survive a fork; children start their own pool.
+os.register_at_fork(after_in_child=_reset)
+
+
+class RegisterMutation(DjangoRegisterMutation):
+    """``register`` hashing the password on :func:`pool` before saving."""
+
+    def resolver(
+        self,
+        source: Any,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Hash the password off the database thread, then create the user."""
+        hashing = pool()
+        if hashing is None:
+            return super().resolver(source, info, args, kwargs)
+
+        data = kwargs[self.argument_name]
+        future = hashing.submit(data.password)
+        if in_async_context():
+            return self.aresolve(future, source, info, args, kwargs)
+        return super().resolver(
+            source, info, args, self.with_password(kwargs, future.result())
+        )
+
+    async def aresolve(
+        self,
+        future: Future[str],
+        source: Any,
+        info: Info | None,
+        args: list[Any],
+        kwargs: dict[str, Any],
+    ) -> Any:
+        """Await the hash without blocking the event loop, then save."""
+        encoded = await asyncio.wrap_future(future)
+        return await super().resolver(
+            source, info, args, self.with_password(kwargs, encoded)
+        )
+
+    def with_password(self, kwargs: dict[str, Any], encoded: str) -> dict[str, Any]:
+        """Return ``kwargs`` with the input's password replaced by ``encoded``."""
+        data = dataclasses.replace(kwargs[self.argument_name], password=encoded)
+        return {**kwargs, self.argument_name: data}
+
+    def create(self, data: dict[str, Any], *, info: Info) -> Any:
+        """Create the user with the hashed password, if it is one."""
+        if pool() is None:
+            return super().create(data, info=info)
+        encoded = data.pop("password")
+        model = self.django_model
+        assert model is not None
+        with DjangoOptimizerExtension.disabled():
+            return resolvers.create(
+                info,
+                model,
+                data,
+                key_attr=self.key_attr,
+                full_clean=self.full_clean,
+                pre_save_hook=lambda user: setattr(user, "password", encoded),
+            )
+
+
+def register(input_type: type) -> Any:
+    """Return a ``register`` mutation creating users from ``input_type``."""
+    return RegisterMutation(input_type)
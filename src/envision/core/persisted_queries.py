@@ -0,0 +1,171 @@
+"""Apollo-compatible automatic persisted queries (APQ).
+
+A client may send only ``extensions.persistedQuery.sha256Hash`` instead of
+the document.  On a miss the server answers ``PersistedQueryNotFound`` and
+the client retries with both the hash and the document, which is then
+registered for later requests.
+
+Documents are kept in one of Django's caches, selected with the
+``GRAPHQL_PERSISTED_QUERIES_CACHE`` setting; a file-based cache shares them
+between worker processes.  With ``GRAPHQL_PERSISTED_QUERIES_ALLOWLIST``
+enabled, only documents registered ahead of time (see the
+``register_queries`` management command) are executed and nothing is
+registered at runtime.
+"""
+
+import dataclasses
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from lia import HTTPException
+from strawberry.exceptions import StrawberryGraphQLError
+from strawberry.http import GraphQLRequestData
+from strawberry.types import ExecutionResult
+
+from .documents import document_hash
+
+PERSISTED_QUERY_VERSION = 1
+
+
+class PersistedQueryError(StrawberryGraphQLError):
+    """A persisted query that cannot be executed, reported as a GraphQL error."""
+
+    def __init__(self, message: str, code: str) -> None:
+        super().__init__(message, extensions={"code": code})
+
+    def as_result(self) -> ExecutionResult:
+        """Return an execution result carrying only this error."""
+        return ExecutionResult(data=None, errors=[self])
+
+
+class PersistedQueryNotFound(PersistedQueryError):
+    """The hash is unknown; the client should retry with the document."""
+
+    def __init__(self) -> None:
+        super().__init__("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+
+
+class PersistedQueryNotAllowed(PersistedQueryError):
+    """The document is not on the allow-list."""
+
+    def __init__(self) -> None:
+        super().__init__("PersistedQueryNotAllowed", "PERSISTED_QUERY_NOT_ALLOWED")
+
+
+class PersistedQueryStore:
+    """Documents keyed by their SHA-256 hash in a Django cache.
+
+    Parameters
+    ----------
+    alias : str
+        Name of the cache in ``CACHES``.
+    timeout : int | None
+        Seconds a document is kept; ``None`` keeps it until evicted.
+    """
+
+    key_prefix = "graphql:apq:"
+
+    def __init__(self, alias: str, timeout: int | None = None) -> None:
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self) -> BaseCache:
+        """Return the backing cache for the current thread."""
+        return caches[self.alias]
+
+    def get(self, sha256: str) -> str | None:
+        """Return the document registered under ``sha256``, if any."""
+        query: str | None = self.cache.get(self.key_prefix + sha256)
+        return query
+
+    def add(self, query: str) -> str:
+        """Register ``query`` and return its hash."""
+        sha256 = document_hash(query)
+        self.cache.set(self.key_prefix + sha256, query, timeout=self.timeout)
+        return sha256
+
+    def delete(self, sha256: str) -> None:
+        """Forget the document registered under ``sha256``."""
+        self.cache.delete(self.key_prefix + sha256)
+
+
+persisted_query_store = PersistedQueryStore(
+    alias=getattr(settings, "GRAPHQL_PERSISTED_QUERIES_CACHE", "default"),
+    timeout=getattr(settings, "GRAPHQL_PERSISTED_QUERIES_TIMEOUT", None),
+)
+
+
+def is_allowlist() -> bool:
+    """Return whether only pre-registered documents may be executed."""
+    return bool(getattr(settings, "GRAPHQL_PERSISTED_QUERIES_ALLOWLIST", False))
+
+
+def requested_hash(request_data: GraphQLRequestData) -> str | None:
+    """Return the ``sha256Hash`` of the ``persistedQuery`` extension, if sent.
+
+    Raises
+    ------
+    HTTPException
+        If the extension is malformed or uses an unsupported version.
+    """
+    extension: Any = (request_data.extensions or {}).get("persistedQuery")
+    if extension is None:
+        return None
+    if not isinstance(extension, dict) or not isinstance(
+        extension.get("sha256Hash"), str
+    ):
+        raise HTTPException(400, "Invalid persistedQuery extension")
+    if extension.get("version") != PERSISTED_QUERY_VERSION:
+        raise HTTPException(400, "Unsupported persisted query version")
+    sha256: str = extension["sha256Hash"]
+    return sha256
+
+
+def resolve(
+    request_data: GraphQLRequestData,
+    store: PersistedQueryStore = persisted_query_store,
+) -> GraphQLRequestData:
+    """Return ``request_data`` with the persisted document filled in.
+
+    Hash-only requests are looked up in ``store``; requests carrying both
+    the hash and the document register it, unless in allow-list mode.
+
+    Raises
+    ------
+    PersistedQueryError
+        If the document is unknown or not on the allow-list.
+    HTTPException
+        If the hash is malformed or does not match the document.
+    """
+    sha256 = requested_hash(request_data)
+    allowlist = is_allowlist()
+    if sha256 is None:
+        query = request_data.query
+        if allowlist and query is not None and store.get(document_hash(query)) is None:
+            raise PersistedQueryNotAllowed()
+        return request_data
+
+    if request_data.query is None:
+        query = store.get(sha256)
+        if query is None and allowlist:
+            raise PersistedQueryNotAllowed()
+        if query is None:
+            raise PersistedQueryNotFound()
+        return dataclasses.replace(request_data, query=query)
+
+    if document_hash(request_data.query) != sha256:
+        raise HTTPException(400, "provided sha does not match query")
+    if not allowlist:
+        store.add(request_data.query)
+    elif store.get(sha256) is None:
+        raise PersistedQueryNotAllowed()
+    return request_data
+
+
+def uses_store(request_data: GraphQLRequestData) -> bool:
+    """Return whether :func:`resolve` has to consult the store at all."""
+    return is_allowlist() or bool(
+        request_data.extensions and "persistedQuery" in request_data.extensions
+    )
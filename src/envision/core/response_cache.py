@@ -0,0 +1,398 @@
+"""Opt-in cache of query responses, invalidated by model tags.
+
+Set ``GRAPHQL_RESPONSE_CACHE`` to the alias of one of Django's caches to
+enable it.  Successful query results are stored for
+``GRAPHQL_RESPONSE_CACHE_TIMEOUT`` seconds, keyed on the normalized
+document, the operation name, the variables and the requesting user.
+
+Every response is tagged with the models its selection can return.  A tag
+is a version number kept in the same cache and part of the response key;
+saving or deleting a ``Fruit`` or ``Color`` bumps the version of its tag
+(see :mod:`.signals`), so responses that include the model are no longer
+found.  Writes inside :meth:`ResponseCache.batch` bump each tag once, when
+the block ends, however many rows they signal.  Hit, miss and invalidation
+counts are available from :meth:`ResponseCache.info`.
+"""
+
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model
+from graphql import (
+    ArgumentNode,
+    DocumentNode,
+    ExecutionResult,
+    FieldNode,
+    GraphQLInputField,
+    GraphQLInputObjectType,
+    GraphQLInputType,
+    GraphQLNamedType,
+    ObjectFieldNode,
+    TypeInfo,
+    TypeInfoVisitor,
+    VariableNode,
+    Visitor,
+    get_named_type,
+    parse,
+    print_ast,
+    visit,
+)
+from strawberry import Schema
+from strawberry.extensions import SchemaExtension
+from strawberry.schema.schema_converter import GraphQLCoreConverter
+from strawberry.types.base import StrawberryObjectDefinition
+from strawberry.types.graphql import OperationType
+from strawberry_django.utils.typing import get_django_definition
+
+from .documents import document_hash
+
+# Models written inside the running ResponseCache.batch() block, if any.
+_batched: ContextVar[set[type[Model]] | None] = ContextVar(
+    "response_cache_batched",
+    default=None,
+)
+
+
+@dataclass(frozen=True)
+class ResponseCacheInfo:
+    """Snapshot of :class:`ResponseCache` counters."""
+
+    hits: int
+    misses: int
+    invalidations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _TagCollector(Visitor):
+    """Collect the models a document's response depends on.
+
+    These are the models of every object type selected, and those reached
+    by the filter and ordering inputs in its arguments:
+    ``colors(filters: {fruits: ...})`` also depends on ``Fruit``.  Inputs
+    are walked down their relations field by field; an input passed as a
+    variable is tagged with every model its type can reach.  Fields
+    computed from another model's rows, such as ``Color.fruitCount``,
+    report it as ``counted_model`` (see :class:`~.fields.CountField`).
+    """
+
+    def __init__(self, schema: Schema, type_info: TypeInfo) -> None:
+        super().__init__()
+        self.schema = schema
+        self.type_info = type_info
+        self.tags: set[str] = set()
+        # Model of each input value being visited, innermost last.
+        self.inputs: list[type[Model] | None] = []
+
+    def enter_field(self, node: FieldNode, *args: Any) -> None:
+        field_def = self.type_info.get_field_def()
+        if field_def is not None:
+            field = field_def.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF)
+            counted_model = getattr(field, "counted_model", None)
+            if counted_model is not None:
+                self.tags.add(model_tag(counted_model))
+        self.add(self.model(get_named_type(self.type_info.get_type())))
+
+    def enter_argument(self, node: ArgumentNode, *args: Any) -> None:
+        # Filters and ordering describe rows of the field's own type.
+        model = self.model(get_named_type(self.type_info.get_type()))
+        self.inputs.append(self.input_model(self.type_info.get_input_type(), model))
+        self.add(self.inputs[-1])
+
+    def leave_argument(self, node: ArgumentNode, *args: Any) -> None:
+        self.inputs.pop()
+
+    def enter_object_field(self, node: ObjectFieldNode, *args: Any) -> None:
+        parent = self.inputs[-1] if self.inputs else None
+        parent_type = get_named_type(self.type_info.get_parent_input_type())
+        input_field = (
+            parent_type.fields.get(node.name.value)
+            if isinstance(parent_type, GraphQLInputObjectType)
+            else None
+        )
+        model = self.related_model(parent, input_field)
+        self.inputs.append(self.input_model(self.type_info.get_input_type(), model))
+        self.add(self.inputs[-1])
+
+    def leave_object_field(self, node: ObjectFieldNode, *args: Any) -> None:
+        self.inputs.pop()
+
+    def enter_variable(self, node: VariableNode, *args: Any) -> None:
+        model = self.inputs[-1] if self.inputs else None
+        input_type = self.type_info.get_input_type()
+        self.add_reachable(
+            get_named_type(input_type), self.input_model(input_type, model), set()
+        )
+
+    def add_reachable(
+        self,
+        named: GraphQLNamedType | None,
+        model: type[Model] | None,
+        seen: set[tuple[str, type[Model] | None]],
+    ) -> None:
+        """Add ``model`` and every model the input type ``named`` reaches."""
+        if named is None or (named.name, model) in seen:
+            return
+        seen.add((named.name, model))
+        self.add(model)
+        if isinstance(named, GraphQLInputObjectType):
+            for input_field in named.fields.values():
+                related = self.related_model(model, input_field)
+                self.add_reachable(
+                    get_named_type(input_field.type),
+                    self.input_model(input_field.type, related),
+                    seen,
+                )
+
+    def add(self, model: type[Model] | None) -> None:
+        """Add the tag of ``model``, if any."""
+        if model is not None:
+            self.tags.add(model_tag(model))
+
+    def model(self, named: GraphQLNamedType | None) -> type[Model] | None:
+        """Return the model declared by the strawberry type ``named``."""
+        if named is None:
+            return None
+        definition = self.schema.get_type_by_name(named.name)
+        if isinstance(definition, StrawberryObjectDefinition):
+            django_definition = get_django_definition(definition.origin)
+            if django_definition is not None and django_definition.model:
+                return django_definition.model
+        return None
+
+    def input_model(
+        self,
+        input_type: GraphQLInputType | None,
+        model: type[Model] | None,
+    ) -> type[Model] | None:
+        """Return the model of an input value, ``model`` unless it declares one.
+
+        Filter types declare their model; ordering types do not, and
+        inherit the one reached through the enclosing relation.
+        """
+        named = get_named_type(input_type)
+        if not isinstance(named, GraphQLInputObjectType):
+            return None
+        return self.model(named) or model
+
+    def related_model(
+        self,
+        model: type[Model] | None,
+        input_field: GraphQLInputField | None,
+    ) -> type[Model] | None:
+        """Return the model reached from ``model`` through ``input_field``."""
+        if model is None or input_field is None:
+            return model
+        field = input_field.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF)
+        # Strawberry fields are dataclass fields named after the attribute.
+        name = getattr(field, "name", None)
+        if name is None:
+            return model
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # ``AND``/``OR``/``NOT`` and lookups stay on ``model``.
+            return model
+        related_model = model_field.related_model
+        if related_model is None or isinstance(related_model, str):
+            return model
+        return related_model
+
+
+def model_tag(model: type[Model]) -> str:
+    """Return the invalidation tag of ``model``."""
+    return model._meta.label_lower
+
+
+@functools.lru_cache(maxsize=256)
+def document_key(schema: Schema, query: str) -> tuple[str, frozenset[str]]:
+    """Return the normalized hash and the model tags of ``query``."""
+    document: DocumentNode = parse(query)
+    type_info = TypeInfo(schema._schema)
+    collector = _TagCollector(schema, type_info)
+    visit(document, TypeInfoVisitor(type_info, collector))
+    return document_hash(print_ast(document)), frozenset(collector.tags)
+
+
+def user_key(context: Any) -> str:
+    """Return the part of the cache key identifying the requesting user."""
+    user = getattr(getattr(context, "request", None), "user", None)
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    return str(user.pk)
+
+
+class ResponseCache:
+    """Responses stored in a Django cache, with tag versions beside them."""
+
+    key_prefix = "graphql:response:"
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def alias(self) -> str | None:
+        """Return the cache alias, or ``None`` while caching is disabled."""
+        alias: str | None = getattr(settings, "GRAPHQL_RESPONSE_CACHE", None)
+        return alias
+
+    @property
+    def cache(self) -> BaseCache:
+        """Return the backing cache for the current thread."""
+        assert self.alias is not None
+        return caches[self.alias]
+
+    def key(
+        self,
+        normalized: str,
+        tags: frozenset[str],
+        operation_name: str | None,
+        variables: dict[str, Any] | None,
+        user: str,
+    ) -> str:
+        """Return the cache key of a response under the current tag versions."""
+        tag_keys = [f"{self.key_prefix}tag:{tag}" for tag in sorted(tags)]
+        versions = self.cache.get_many(tag_keys)
+        for tag_key in tag_keys:
+            if tag_key not in versions:
+                # Start at the clock rather than 0, so a tag evicted from the
+                # cache cannot resurrect responses stored under older versions.
+                self.cache.add(tag_key, time.time_ns(), timeout=None)
+                versions[tag_key] = self.cache.get(tag_key)
+        payload = json.dumps(
+            [normalized, operation_name, variables, user, versions],
+            sort_keys=True,
+            default=str,
+        )
+        return self.key_prefix + hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached ``data`` for ``key`` and count the lookup."""
+        data: dict[str, Any] | None = self.cache.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key: str, data: dict[str, Any]) -> None:
+        """Store ``data`` under ``key``."""
+        timeout = getattr(settings, "GRAPHQL_RESPONSE_CACHE_TIMEOUT", 300)
+        self.cache.set(key, data, timeout=timeout)
+
+    def invalidate(self, model: type[Model]) -> None:
+        """Drop every cached response tagged with ``model``."""
+        if self.alias is None:
+            return
+        batched = _batched.get()
+        if batched is not None:
+            batched.add(model)
+            return
+        tag_key = f"{self.key_prefix}tag:{model_tag(model)}"
+        try:
+            self.cache.incr(tag_key)
+        except ValueError:
+            self.cache.add(tag_key, time.time_ns(), timeout=None)
+        with self._lock:
+            self.invalidations += 1
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Invalidate the models written in the block once, when it ends.
+
+        Queryset deletes send ``post_delete`` for every row; inside a batch
+        the receivers only record the model.
+        """
+        if _batched.get() is not None:
+            yield
+            return
+        batched: set[type[Model]] = set()
+        token = _batched.set(batched)
+        try:
+            yield
+        finally:
+            _batched.reset(token)
+            for model in batched:
+                self.invalidate(model)
+
+    def info(self) -> ResponseCacheInfo:
+        """Return the current hit, miss and invalidation counters."""
+        with self._lock:
+            return ResponseCacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                invalidations=self.invalidations,
+            )
+
+    def reset(self) -> None:
+        """Reset the counters."""
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+response_cache = ResponseCache()
+
+
+class ResponseCacheExtension(SchemaExtension):
+    """Answer repeated queries from :data:`response_cache`.
+
+    Only queries that completed without errors are stored.  Mutations and
+    operations already answered by an earlier extension are left alone.
+    """
+
+    cache = response_cache
+
+    def on_execute(self) -> Iterator[None]:
+        """Return a cached result, or cache the result once executed."""
+        ec = self.execution_context
+        if (
+            self.cache.alias is None
+            or ec.query is None
+            or ec.result is not None
+            or ec.operation_type is not OperationType.QUERY
+        ):
+            yield
+            return
+
+        normalized, tags = document_key(ec.schema, ec.query)
+        key = self.cache.key(
+            normalized,
+            tags,
+            ec.operation_name,
+            ec.variables,
+            user_key(ec.context),
+        )
+        data = self.cache.get(key)
+        if data is not None:
+            ec.result = ExecutionResult(data=data)
+        yield
+        result = ec.result
+        # A streamed result holds only the rows of the initial payload.
+        streamed = getattr(ec.context, "streams", None)
+        if (
+            data is None
+            and result is not None
+            and result.data
+            and not result.errors
+            and not streamed
+        ):
+            self.cache.set(key, result.data)
@@ -0,0 +1,96 @@
+"""Send the reads of GraphQL queries to replica databases.
+
+``GRAPHQL_READ_DATABASES`` lists the aliases of replicas of ``default``.
+While it is empty every statement goes to ``default``.  Otherwise
+:class:`ReadReplicaExtension` picks one of them at random for each query
+operation, and :class:`ReplicaRouter` sends the reads of that operation
+there.  Writes, mutations and everything outside a GraphQL query keep
+using the primary.
+
+A replica may lag behind the primary, so once a mutation has run the
+remaining operations of its request read from the primary too.  A cookie
+named by ``GRAPHQL_PIN_PRIMARY_COOKIE`` extends this for
+``GRAPHQL_PIN_PRIMARY_SECONDS`` to the client's next requests, so it
+reads its own writes; ``0`` pins the rest of the request only.
+"""
+
+import random
+from collections.abc import Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+# Alias the reads of the running query operation go to, if not the primary.
+_reading: ContextVar[str | None] = ContextVar("reading", default=None)
+
+
+def read_databases() -> list[str]:
+    """Return the aliases of the replicas serving query operations."""
+    aliases: list[str] = getattr(settings, "GRAPHQL_READ_DATABASES", [])
+    return aliases
+
+
+class ReplicaRouter:
+    """Route reads to the replica chosen for the running query operation."""
+
+    def db_for_read(self, model: type[Model], **hints: Any) -> str | None:
+        """Return the replica of the current query operation, if any."""
+        return _reading.get()
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str:
+        """Return the primary."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool | None:
+        """Allow relations between rows of the primary and its replicas."""
+        aliases = {DEFAULT_DB_ALIAS, *read_databases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReadReplicaExtension(SchemaExtension):
+    """Read from a replica while executing queries not pinned to the primary."""
+
+    def on_execute(self) -> Iterator[None]:
+        """Route the reads of a query, or pin the primary after a mutation."""
+        ec = self.execution_context
+        aliases = read_databases()
+        if not aliases:
+            yield
+            return
+        context = ec.context
+        if ec.operation_type is OperationType.MUTATION:
+            context.primary = True
+            yield
+            self.pin(context)
+            return
+        if ec.operation_type is not OperationType.QUERY or self.pinned(context):
+            yield
+            return
+        token = _reading.set(random.choice(aliases))
+        try:
+            yield
+        finally:
+            _reading.reset(token)
+
+    @staticmethod
+    def pinned(context: Any) -> bool:
+        """Return whether the reads of ``context`` must use the primary."""
+        cookie = getattr(settings, "GRAPHQL_PIN_PRIMARY_COOKIE", "pin-primary")
+        return bool(context.primary or cookie in context.request.COOKIES)
+
+    @staticmethod
+    def pin(context: Any) -> None:
+        """Ask the client to read from the primary for a while."""
+        seconds = getattr(settings, "GRAPHQL_PIN_PRIMARY_SECONDS", 0)
+        if seconds:
+            cookie = getattr(settings, "GRAPHQL_PIN_PRIMARY_COOKIE", "pin-primary")
+            context.response.set_cookie(
+                cookie, "1", max_age=seconds, httponly=True, samesite="Lax"
+            )
@@ -1,13 +1,26 @@
 """Kudos: https://github.com/strawberry-graphql/strawberry-django/blob/b8fa1c1/examples/django/app/schema.py"""
 
+from collections.abc import Iterable
 from typing import List
 
 import strawberry
+from strawberry.extensions import AddValidationRules
 
 import strawberry_django
-import strawberry_django.auth as auth
 from strawberry_django import mutations
+from strawberry_django.optimizer import DjangoOptimizerExtension
+from strawberry_django.pagination import OffsetPaginated
+from strawberry_django.relay import DjangoCursorConnection
 
+from . import models, passwords, streams
+from .bulk import bulk_create, bulk_delete, bulk_update
+from .cost import QueryCostExtension
+from .documents import DocumentCacheExtension
+from .fields import LoaderField
+from .metrics import MetricsExtension
+from .response_cache import ResponseCacheExtension
+from .routers import ReadReplicaExtension
+from .tracing import TracingExtension
 from .types import (
     Color,
     ColorInput,
@@ -24,26 +37,77 @@ from .types import (
 
 @strawberry.type
 class Query:
-    fruit: Fruit = strawberry_django.field()
-    fruits: List[Fruit] = strawberry_django.field(ordering=FruitOrder)
+    fruit: Fruit = strawberry_django.field(field_cls=LoaderField)
+    fruits: List[Fruit] = strawberry_django.field(
+        ordering=FruitOrder, field_cls=LoaderField
+    )
 
-    color: Color = strawberry_django.field()
-    colors: List[Color] = strawberry_django.field(ordering=ColorOrder)
+    color: Color = strawberry_django.field(field_cls=LoaderField)
+    colors: List[Color] = strawberry_django.field(
+        ordering=ColorOrder, field_cls=LoaderField
+    )
+
+    # Offset pages whose ``totalCount`` is only counted when selected.
+    fruitsPage: OffsetPaginated[Fruit] = strawberry_django.offset_paginated(
+        ordering=FruitOrder,
+    )
+    colorsPage: OffsetPaginated[Color] = strawberry_django.offset_paginated(
+        ordering=ColorOrder,
+    )
+
+    # Keyset cursors are built from the ordering, so the node types do not
+    # need to implement relay.Node.
+    @strawberry_django.connection(  # type: ignore[type-var,misc]
+        DjangoCursorConnection[Fruit],  # type: ignore[type-var]
+        ordering=FruitOrder,
+    )
+    def fruitsConnection(self) -> Iterable[models.Fruit]:
+        """Fruits paginated by keyset cursors over the active ordering."""
+        return models.Fruit.objects.all()
+
+    @strawberry_django.connection(  # type: ignore[type-var,misc]
+        DjangoCursorConnection[Color],  # type: ignore[type-var]
+        ordering=ColorOrder,
+    )
+    def colorsConnection(self) -> Iterable[models.Color]:
+        """Colors paginated by keyset cursors over the active ordering."""
+        return models.Color.objects.all()
 
 
 @strawberry.type
 class Mutation:
     createFruit: Fruit = mutations.create(FruitInput)
-    createFruits: List[Fruit] = mutations.create(FruitInput)
+    createFruits: List[Fruit] = mutations.create(List[FruitInput])
     updateFruits: List[Fruit] = mutations.update(FruitPartialInput)
     deleteFruits: List[Fruit] = mutations.delete()
+    bulkCreateFruits: List[Fruit] = bulk_create(FruitInput)
+    bulkUpdateFruits: List[Fruit] = bulk_update(FruitPartialInput)
+    bulkDeleteFruits: List[Fruit] = bulk_delete()
 
     createColor: Color = mutations.create(ColorInput)
-    createColors: List[Color] = mutations.create(ColorInput)
+    createColors: List[Color] = mutations.create(List[ColorInput])
     updateColors: List[Color] = mutations.update(ColorPartialInput)
     deleteColors: List[Color] = mutations.delete()
+    bulkCreateColors: List[Color] = bulk_create(ColorInput)
+    bulkUpdateColors: List[Color] = bulk_update(ColorPartialInput)
+    bulkDeleteColors: List[Color] = bulk_delete()
 
-    register: User = auth.register(UserInput)
+    register: User = passwords.register(UserInput)
 
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    execution_context_class=streams.ExecutionContext,
+    extensions=[
+        MetricsExtension,
+        TracingExtension,
+        DocumentCacheExtension,
+        QueryCostExtension,
+        ResponseCacheExtension,
+        ReadReplicaExtension,
+        DjangoOptimizerExtension,
+        AddValidationRules([streams.StreamableFieldsRule]),
+    ],
+)
+streams.install(schema)
@@ -0,0 +1,50 @@
+"""Signal receivers keeping caches and instrumentation in step."""
+
+from typing import Any
+
+from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import counters, fulltext, metrics
+from .models import Color, Fruit
+from .response_cache import response_cache
+from .tracing import instrument
+
+
+@receiver(post_save, sender=Fruit)
+@receiver(post_delete, sender=Fruit)
+@receiver(post_save, sender=Color)
+@receiver(post_delete, sender=Color)
+def invalidate_responses(sender: type[Model], **kwargs: Any) -> None:
+    """Drop cached responses that may include the changed model."""
+    response_cache.invalidate(sender)
+
+
+@receiver(connection_created)
+def instrument_connection(
+    sender: type[BaseDatabaseWrapper],
+    connection: BaseDatabaseWrapper,
+    **kwargs: Any,
+) -> None:
+    """Count SQL run on ``connection`` and let traces attribute it."""
+    instrument(connection)
+    metrics.track(connection)
+
+
+@receiver(post_migrate)
+def install_fulltext(sender: AppConfig, using: str, **kwargs: Any) -> None:
+    """Create the full-text tables once the core tables exist."""
+    if sender.name == "envision.core":
+        fulltext.install(connections[using])
+
+
+@receiver(post_migrate)
+def install_counters(sender: AppConfig, using: str, **kwargs: Any) -> None:
+    """Create the counter triggers once the core tables exist."""
+    if sender.name == "envision.core":
+        counters.install(connections[using])
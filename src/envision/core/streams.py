@@ -0,0 +1,603 @@
+"""Incremental delivery of lists marked ``@stream`` and fragments marked ``@defer``.
+
+graphql-core 3.2 predates ``@defer`` and ``@stream``, so both are
+declared here.  When the client accepts ``multipart/mixed`` on the async
+endpoint, a list of rows marked ``@stream(initialCount: n)`` returns its
+first ``n`` rows in the initial payload; the rest are read with
+``QuerySet.aiterator()`` and completed ``GRAPHQL_STREAM_CHUNK_SIZE``
+rows at a time, each chunk sent as soon as it is fetched::
+
+    { colors { name fruits @stream(initialCount: 10) { name } } }
+
+Root lists stream the rows of their queryset.  Relation lists such as
+``Color.fruits`` read the first rows of every parent with one query
+(see :class:`~.loaders.HeadLoader`) and stream the rest parent by parent;
+the optimizer does not prefetch them.  :class:`StreamableFieldsRule`
+rejects ``@stream`` on other fields, such as mutation results.
+
+Fragments marked ``@defer`` are left out of the payload that holds their
+object and sent in a later one, once every earlier stream and fragment
+was sent.  Their fields are still planned by the optimizer with the rest
+of the query, so deferring trims the early payloads rather than queries.
+
+Payloads follow the incremental delivery RFC: ``pending`` announces
+streams and fragments, later payloads carry their ``incremental`` items
+or data and mark them ``completed``.  Without ``multipart/mixed``, in
+batches and on the sync endpoint, both directives are ignored and the
+response is sent whole.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import strawberry
+from django.conf import settings
+from django.db.models import QuerySet
+from graphql import (
+    DirectiveLocation,
+    ExecutionContext as GraphQLExecutionContext,
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLArgument,
+    GraphQLBoolean,
+    GraphQLDirective,
+    GraphQLError,
+    GraphQLInt,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLOutputType,
+    GraphQLResolveInfo,
+    GraphQLString,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    ValidationRule,
+    get_named_type,
+    located_error,
+)
+from graphql.execution.collect_fields import (
+    collect_sub_fields,
+    does_fragment_condition_match,
+    get_field_entry_key,
+    should_include_node,
+)
+from graphql.execution.values import get_directive_values
+from graphql.pyutils import AwaitableOrValue, Path
+from strawberry.schema.schema import StrawberryGraphQLCoreExecutionContext
+from strawberry.schema.schema_converter import GraphQLCoreConverter
+from strawberry.types import Info
+
+BACKREF = GraphQLCoreConverter.DEFINITION_BACKREF
+
+# Fields marked ``@stream`` below the root field being planned, by id.
+_streamed: ContextVar[frozenset[int]] = ContextVar(
+    "streamed_fields", default=frozenset()
+)
+
+# As defined by graphql-core 3.3.
+STREAM = GraphQLDirective(
+    name="stream",
+    locations=[DirectiveLocation.FIELD],
+    args={
+        "initialCount": GraphQLArgument(
+            GraphQLNonNull(GraphQLInt),
+            default_value=0,
+            description="Number of items to return immediately",
+        ),
+        "label": GraphQLArgument(GraphQLString, description="Unique name"),
+        "if": GraphQLArgument(
+            GraphQLNonNull(GraphQLBoolean),
+            default_value=True,
+            description="Stream when true or undefined.",
+        ),
+    },
+    description="Directs the executor to stream plural fields.",
+)
+
+DEFER = GraphQLDirective(
+    name="defer",
+    locations=[DirectiveLocation.FRAGMENT_SPREAD, DirectiveLocation.INLINE_FRAGMENT],
+    args={
+        "label": GraphQLArgument(GraphQLString, description="Unique name"),
+        "if": GraphQLArgument(
+            GraphQLNonNull(GraphQLBoolean),
+            default_value=True,
+            description="Deferred when true or undefined.",
+        ),
+    },
+    description="Directs the executor to defer this fragment when the `if`"
+    " argument is true or undefined.",
+)
+
+
+def install(schema: strawberry.Schema) -> None:
+    """Declare ``@stream`` and ``@defer`` in ``schema``.
+
+    They are added to the graphql-core schema: operation directives given
+    to strawberry are applied to every resolved value by an extension.
+    """
+    schema._schema.directives = (*schema._schema.directives, STREAM, DEFER)
+
+
+class StreamableFieldsRule(ValidationRule):
+    """Reject ``@stream`` on fields other than lists of rows.
+
+    Root lists and relation lists are resolved by fields marked
+    ``streamable``, such as :class:`~.fields.LoaderField`.
+    """
+
+    def enter_field(self, node: FieldNode, *args: Any) -> None:
+        """Report ``node`` if it is marked ``@stream`` but cannot stream."""
+        if not any(d.name.value == STREAM.name for d in node.directives or ()):
+            return
+        parent = self.context.get_parent_type()
+        field_def = self.context.get_field_def()
+        field_type = field_def.type if field_def else None
+        if isinstance(field_type, GraphQLNonNull):
+            field_type = field_type.of_type
+        definition = field_def.extensions.get(BACKREF) if field_def else None
+        if (
+            parent is not None
+            and parent is not self.context.schema.mutation_type
+            and isinstance(field_type, GraphQLList)
+            and getattr(definition, "streamable", False)
+        ):
+            return
+        name = f"{parent.name}.{node.name.value}" if parent else node.name.value
+        msg = f"@stream is only supported on lists of rows, not on '{name}'."
+        self.report_error(GraphQLError(msg, node))
+
+
+def accepted(headers: Mapping[str, str]) -> bool:
+    """Return whether the ``Accept`` header allows multipart responses."""
+    return any(
+        media_type.split(";")[0].strip().lower() == "multipart/mixed"
+        for media_type in headers.get("accept", "").split(",")
+    )
+
+
+def requested(info: Info) -> dict[str, Any] | None:
+    """Return the ``@stream`` arguments to apply to the current field."""
+    if not getattr(info.context, "incremental", False):
+        return None
+    # ``selected_fields`` keeps literal arguments as strings; coerce them.
+    raw_info = info._raw_info
+    arguments = get_directive_values(
+        STREAM, raw_info.field_nodes[0], raw_info.variable_values
+    )
+    if arguments is None or not arguments["if"]:
+        return None
+    return arguments
+
+
+def nested(info: Info) -> set[int]:
+    """Return the ids of the fields marked ``@stream`` below the current one."""
+    raw_info = info._raw_info
+    found: set[int] = set()
+
+    def visit(field_type: GraphQLOutputType, field_nodes: list[FieldNode]) -> None:
+        named = get_named_type(field_type)
+        if not isinstance(named, GraphQLObjectType):
+            return
+        selections = collect_sub_fields(
+            raw_info.schema,
+            raw_info.fragments,
+            raw_info.variable_values,
+            named,
+            field_nodes,
+        )
+        for nodes in selections.values():
+            field_def = named.fields.get(nodes[0].name.value)
+            if field_def is None:
+                continue
+            arguments = get_directive_values(STREAM, nodes[0], raw_info.variable_values)
+            if arguments is not None and arguments["if"]:
+                found.add(id(field_def.extensions.get(BACKREF)))
+            visit(field_def.type, nodes)
+
+    visit(raw_info.return_type, raw_info.field_nodes)
+    return found
+
+
+@contextmanager
+def planning(info: Info) -> Iterator[None]:
+    """Let :func:`is_streamed` report the fields streamed below ``info``.
+
+    Used while the optimizer plans a root queryset, which must not
+    prefetch the rows of streamed relation lists.
+    """
+    if not getattr(info.context, "incremental", False):
+        yield
+        return
+    token = _streamed.set(frozenset(nested(info)))
+    try:
+        yield
+    finally:
+        _streamed.reset(token)
+
+
+def is_streamed(definition: object) -> bool:
+    """Return whether ``definition`` is streamed below the planned field."""
+    return id(definition) in _streamed.get()
+
+
+class StreamedList(list[Any]):
+    """Rows of the initial payload, followed by the rows still to fetch."""
+
+    def __init__(
+        self,
+        initial: list[Any],
+        rows: AsyncIterator[Any],
+        label: str | None,
+    ) -> None:
+        super().__init__(initial)
+        self.rows = rows
+        self.label = label
+
+
+async def take(rows: AsyncIterator[Any], count: int) -> list[Any]:
+    """Return up to ``count`` rows from ``rows``."""
+    taken: list[Any] = []
+    while len(taken) < count:
+        try:
+            taken.append(await anext(rows))
+        except StopAsyncIteration:
+            break
+    return taken
+
+
+def chunk_size() -> int:
+    """Return the number of rows fetched and sent at a time."""
+    size: int = getattr(settings, "GRAPHQL_STREAM_CHUNK_SIZE", 100)
+    return size
+
+
+def initial_count(arguments: dict[str, Any]) -> int:
+    """Return the ``initialCount`` of ``@stream`` ``arguments``.
+
+    Raises
+    ------
+    GraphQLError
+        If ``initialCount`` is negative.
+    """
+    count: int = arguments["initialCount"]
+    if count < 0:
+        msg = "initialCount must be a positive integer"
+        raise GraphQLError(msg)
+    return count
+
+
+async def start(queryset: QuerySet[Any], arguments: dict[str, Any]) -> list[Any]:
+    """Fetch the first rows of ``queryset``, leaving the rest unread.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Rows of a root list field.
+    arguments : dict
+        The field's ``@stream`` arguments, as returned by :func:`requested`.
+    """
+    count = initial_count(arguments)
+    rows = aiter(queryset.aiterator(chunk_size=chunk_size()))
+    initial = await take(rows, count)
+    return StreamedList(initial, rows, arguments.get("label"))
+
+
+# Fields by response key.
+Fields = dict[str, list[FieldNode]]
+
+# A selection's fields sent now, then the label and fields of every
+# fragment sent later.
+Split = tuple[Fields, list[tuple[str | None, Fields]]]
+
+
+@dataclass(kw_only=True)
+class Incremental:
+    """Part of a response sent after the initial payload."""
+
+    id: str
+    execution: GraphQLExecutionContext
+    path: Path | None
+    label: str | None = None
+    errors: list[GraphQLError] = field(default_factory=list)
+
+    @property
+    def pending(self) -> dict[str, Any]:
+        """Return the entry announcing this part in a ``pending`` list."""
+        path = self.path.as_list() if self.path else []
+        pending: dict[str, Any] = {"id": self.id, "path": path}
+        if self.label is not None:
+            pending["label"] = self.label
+        return pending
+
+    def payloads(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield the payloads sending this part, without ``hasNext``."""
+        raise NotImplementedError
+
+
+@dataclass(kw_only=True)
+class Stream(Incremental):
+    """A list field whose remaining rows are sent in later payloads."""
+
+    item_type: GraphQLOutputType
+    field_nodes: list[FieldNode]
+    info: GraphQLResolveInfo
+    rows: AsyncIterator[Any]
+    index: int = 0
+
+    async def complete_item(self, item: Any, index: int) -> Any:
+        """Complete one row the way ``complete_list_value`` does."""
+        path = Path(self.path, index, None)
+        try:
+            completed = self.execution.complete_value(
+                self.item_type, self.field_nodes, self.info, path, item
+            )
+            if self.execution.is_awaitable(completed):
+                completed = await completed
+        except Exception as raw_error:
+            error = located_error(raw_error, self.field_nodes, path.as_list())
+            return self.execution.handle_field_error(error, self.item_type)
+        else:
+            return completed
+
+    async def complete(self, rows: list[Any]) -> list[Any]:
+        """Complete ``rows`` together, so their relations load in batches.
+
+        Errors of nullable items are collected in :attr:`errors`.
+        """
+        self.execution.errors = self.errors = []
+        items = await asyncio.gather(
+            *(self.complete_item(row, self.index + i) for i, row in enumerate(rows))
+        )
+        self.index += len(rows)
+        return items
+
+    async def payloads(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield the remaining rows, a chunk per payload."""
+        size = chunk_size()
+        done = False
+        while not done:
+            rows = await take(self.rows, size)
+            done = len(rows) < size
+            payload: dict[str, Any] = {}
+            if rows:
+                try:
+                    items = await self.complete(rows)
+                except GraphQLError as error:
+                    # A null item of a non-null type ends the stream.
+                    payload["completed"] = [
+                        {"id": self.id, "errors": [error.formatted]}
+                    ]
+                    done = True
+                else:
+                    incremental: dict[str, Any] = {"id": self.id, "items": items}
+                    if self.errors:
+                        incremental["errors"] = [e.formatted for e in self.errors]
+                    payload["incremental"] = [incremental]
+            if done and "completed" not in payload:
+                payload["completed"] = [{"id": self.id}]
+            yield payload
+
+
+@dataclass(kw_only=True)
+class Deferred(Incremental):
+    """A fragment marked ``@defer`` whose fields are sent in a later payload."""
+
+    parent_type: GraphQLObjectType
+    source: Any
+    fields: Fields
+
+    async def payloads(self) -> AsyncIterator[dict[str, Any]]:
+        """Yield the fragment's data, completing it."""
+        self.execution.errors = self.errors = []
+        try:
+            data: Any = self.execution.execute_fields(
+                self.parent_type, self.source, self.path, self.fields
+            )
+            if self.execution.is_awaitable(data):
+                data = await data
+        except GraphQLError as error:
+            # A null field of a non-null type drops the fragment.
+            yield {"completed": [{"id": self.id, "errors": [error.formatted]}]}
+            return
+        incremental: dict[str, Any] = {"id": self.id, "data": data}
+        if self.errors:
+            incremental["errors"] = [e.formatted for e in self.errors]
+        yield {"incremental": [incremental], "completed": [{"id": self.id}]}
+
+
+class ExecutionContext(StrawberryGraphQLCoreExecutionContext):
+    """Execution context recording the parts sent after the initial payload.
+
+    Lists that :func:`start` streams and fragments marked ``@defer`` are
+    appended to the context's ``streams``.
+    """
+
+    @property
+    def incremental(self) -> bool:
+        """Return whether the response may be sent in parts."""
+        return bool(getattr(self.context_value, "incremental", False))
+
+    def execute_operation(
+        self,
+        operation: OperationDefinitionNode,
+        root_value: Any,
+    ) -> AwaitableOrValue[Any] | None:
+        """Execute ``operation``, deferring its root fragments marked ``@defer``."""
+        root_type = self.schema.query_type
+        if (
+            not self.incremental
+            or operation.operation != OperationType.QUERY
+            or root_type is None
+        ):
+            return super().execute_operation(operation, root_value)
+        fields, deferred = self.split([operation.selection_set], root_type)
+        self.defer(root_type, root_value, None, deferred)
+        return self.execute_fields(root_type, root_value, None, fields)
+
+    def collect_subfields(
+        self,
+        return_type: GraphQLObjectType,
+        field_nodes: list[FieldNode],
+    ) -> Fields:
+        """Collect the subfields sent now, leaving out deferred fragments."""
+        if not self.incremental:
+            return super().collect_subfields(return_type, field_nodes)
+        return self.split_subfields(return_type, field_nodes)[0]
+
+    def complete_object_value(
+        self,
+        return_type: GraphQLObjectType,
+        field_nodes: list[FieldNode],
+        info: GraphQLResolveInfo,
+        path: Path,
+        result: Any,
+    ) -> AwaitableOrValue[dict[str, Any]]:
+        """Complete an object, recording its deferred fragments."""
+        if self.incremental:
+            deferred = self.split_subfields(return_type, field_nodes)[1]
+            self.defer(return_type, result, path, deferred)
+        return super().complete_object_value(
+            return_type, field_nodes, info, path, result
+        )
+
+    def complete_list_value(
+        self,
+        return_type: GraphQLList[GraphQLOutputType],
+        field_nodes: list[FieldNode],
+        info: GraphQLResolveInfo,
+        path: Path,
+        result: Any,
+    ) -> AwaitableOrValue[list[Any]]:
+        """Complete the initial rows, keeping the rest for later payloads."""
+        if isinstance(result, StreamedList):
+            records: list[Incremental] = self.context_value.streams
+            records.append(
+                Stream(
+                    id=str(len(records)),
+                    execution=self,
+                    item_type=return_type.of_type,
+                    field_nodes=field_nodes,
+                    info=info,
+                    path=path,
+                    rows=result.rows,
+                    label=result.label,
+                    index=len(result),
+                )
+            )
+        return super().complete_list_value(return_type, field_nodes, info, path, result)
+
+    def defer(
+        self,
+        parent_type: GraphQLObjectType,
+        source: Any,
+        path: Path | None,
+        deferred: Iterable[tuple[str | None, Fields]],
+    ) -> None:
+        """Record the ``deferred`` fragments of ``source`` at ``path``."""
+        records: list[Incremental] = self.context_value.streams
+        for label, fields in deferred:
+            records.append(
+                Deferred(
+                    id=str(len(records)),
+                    execution=self,
+                    path=path,
+                    label=label,
+                    parent_type=parent_type,
+                    source=source,
+                    fields=fields,
+                )
+            )
+
+    def split_subfields(
+        self,
+        return_type: GraphQLObjectType,
+        field_nodes: list[FieldNode],
+    ) -> Split:
+        """Return :meth:`split` of the selections of ``field_nodes``, cached."""
+        cache: dict[tuple[Any, ...], Split] = self.__dict__.setdefault(
+            "_split_cache", {}
+        )
+        key = (return_type, *map(id, field_nodes))
+        if key not in cache:
+            cache[key] = self.split(
+                [node.selection_set for node in field_nodes if node.selection_set],
+                return_type,
+            )
+        return cache[key]
+
+    def split(
+        self,
+        selection_sets: Iterable[SelectionSetNode],
+        runtime_type: GraphQLObjectType,
+    ) -> Split:
+        """Collect fields like graphql-core, apart from deferred fragments.
+
+        Fragments marked ``@defer`` inside a deferred fragment are split
+        off as well, and sent after it.
+        """
+        fields: Fields = {}
+        deferred: list[tuple[str | None, Fields]] = []
+        visited: set[str] = set()
+
+        def collect(
+            selection_set: SelectionSetNode,
+            into: Fields,
+        ) -> None:
+            for selection in selection_set.selections:
+                assert isinstance(
+                    selection, FieldNode | InlineFragmentNode | FragmentSpreadNode
+                )
+                if not should_include_node(self.variable_values, selection):
+                    continue
+                if isinstance(selection, FieldNode):
+                    key = get_field_entry_key(selection)
+                    into.setdefault(key, []).append(selection)
+                    continue
+                fragment: Any = selection
+                if isinstance(selection, FragmentSpreadNode):
+                    if selection.name.value in visited:
+                        continue
+                    visited.add(selection.name.value)
+                    fragment = self.fragments.get(selection.name.value)
+                if fragment is None or not does_fragment_condition_match(
+                    self.schema, fragment, runtime_type
+                ):
+                    continue
+                arguments = get_directive_values(DEFER, selection, self.variable_values)
+                if arguments is None or not arguments["if"]:
+                    collect(fragment.selection_set, into)
+                    continue
+                group: Fields = {}
+                deferred.append((arguments.get("label"), group))
+                collect(fragment.selection_set, group)
+
+        for selection_set in selection_sets:
+            collect(selection_set, fields)
+        return fields, [(label, group) for label, group in deferred if group]
+
+
+async def subsequent(
+    records: Sequence[Incremental],
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield the payloads sending ``records``, in order.
+
+    Parts found while sending earlier ones, such as the streams of items
+    in a streamed list, are appended to ``records`` and announced in the
+    ``pending`` list of the next payload.
+    """
+    announced = len(records)
+    for number, record in enumerate(records):
+        async for payload in record.payloads():
+            if len(records) > announced:
+                payload["pending"] = [r.pending for r in records[announced:]]
+                announced = len(records)
+            last = number == len(records) - 1
+            payload["hasNext"] = not (last and "completed" in payload)
+            yield payload
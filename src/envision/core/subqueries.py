@@ -0,0 +1,67 @@
+"""Filters across to-many relations as correlated ``EXISTS`` subqueries.
+
+Filtering colors by ``fruits`` through a lookup like ``fruits__name``
+joins every fruit of every color, returning a color once per matching
+fruit unless the query also pays for ``DISTINCT``.  :func:`exists`
+instead keeps one row per color and asks the database whether any
+related row matches, which it can answer from the ``(color_id, name)``
+index and stop at the first hit.
+
+:func:`count` counts the related rows of each row the same way, without
+a ``GROUP BY`` over the outer query.
+"""
+
+import functools
+from typing import Any
+
+from django.db import models
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from strawberry_django.filters import process_filters
+
+
+@functools.cache
+def relation(
+    model: type[models.Model], name: str
+) -> tuple[type[models.Model], str, str]:
+    """Return the related model, its foreign key and the key it targets."""
+    field = model._meta.get_field(name)
+    if not isinstance(field, models.ManyToOneRel):
+        msg = f"{model.__name__}.{name} is not a reverse foreign key"
+        raise TypeError(msg)
+    fk = field.field
+    return fk.model, fk.name, fk.target_field.attname
+
+
+def exists(
+    model: type[models.Model],
+    name: str,
+    filters: Any,
+    prefix: str,
+) -> Q:
+    """Match ``model`` rows, reached through ``prefix``, with a related match.
+
+    ``filters`` is the filter input of the related type; it is applied to
+    the subquery with the same rules as a top-level filter.  Filters are
+    also applied outside GraphQL (see :mod:`.exporter`), so no ``info`` is
+    passed on.
+    """
+    related, fk, target = relation(model, name)
+    subquery = related._default_manager.filter(
+        **{fk: OuterRef(f"{prefix}{target}")},
+    )
+    subquery, q = process_filters(filters, subquery, None)
+    return Q(Exists(subquery.filter(q)))
+
+
+def count(model: type[models.Model], name: str) -> Coalesce:
+    """Return an expression counting the related rows of each ``model`` row."""
+    related, fk, target = relation(model, name)
+    subquery = (
+        related._default_manager.filter(**{fk: OuterRef(target)})
+        .order_by()
+        .values(fk)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(subquery), 0)
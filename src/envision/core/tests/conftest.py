@@ -1,8 +1,12 @@
 """Pytest configuration and fixtures for core app tests."""
 
+from collections.abc import Callable
+
 import pytest
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractBaseUser
+from django.db import connections
 from django.test import Client
 
 from envision.core.models import Color, Fruit
@@ -52,4 +56,22 @@ def blueberry(db: None, blue_color: Color) -> Fruit:
 @pytest.fixture
 def raspberry(db: None, red_color: Color) -> Fruit:
     """Create and return a raspberry fruit."""
-    return Fruit.objects.create(name="raspberry", color=red_color)
\ No newline at end of file
+    return Fruit.objects.create(name="raspberry", color=red_color)
+
+
+@pytest.fixture
+def sync_replica(db: None) -> Callable[[], None]:
+    """Return a function copying every row of ``default`` to ``replica``.
+
+    Tests using it need ``@pytest.mark.django_db(databases=["default",
+    "replica"])``.
+    """
+
+    def sync() -> None:
+        with connections["replica"].constraint_checks_disabled():
+            for model in apps.get_models(include_auto_created=True):
+                model._base_manager.using("replica").all()._raw_delete("replica")
+                rows = list(model._base_manager.using("default").all())
+                model._base_manager.using("replica").bulk_create(rows)
+
+    return sync
@@ -0,0 +1,302 @@
+"""Pytest plugin snapshotting the SQL issued by GraphQL operations.
+
+Every operation a test executes through a :class:`strawberry.Schema` is
+recorded with its SQL statements, normalized so that parameters, ``IN``
+lists, bulk ``VALUES`` rows and savepoint names do not matter.  The
+statements are compared with ``snapshots/query_counts.json``: a test
+fails when an operation runs more statements than its snapshot allows.
+Tests without a snapshot fail, so CI catches them; run
+``pytest --query-counts=record`` to add only the missing snapshots, or
+``pytest --update-query-snapshots`` to rewrite the snapshots of the tests
+that run.
+
+The :func:`query_scaling` fixture runs operations at several dataset
+sizes and fails when their statement count grows with the row count.
+"""
+
+import functools
+import inspect
+import json
+import re
+from collections.abc import Callable, Generator, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+import strawberry
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+
+SNAPSHOTS = Path(__file__).parent / "snapshots" / "query_counts.json"
+
+# Row counts used by :func:`query_scaling` unless told otherwise.
+SIZES = (1, 5, 25)
+
+NORMALIZE = [
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"IN \(%s(?:, %s)*\)"), "IN (...)"),
+    (re.compile(r"(\((?:%s, )*%s\))(?:, \1)+"), r"\1, ..."),
+    (re.compile(r'"s\d+_x\d+"'), '"savepoint"'),
+    (re.compile(r"\b\d+\b"), "N"),
+]
+
+OPERATION_NAME = re.compile(r"\b(?:query|mutation|subscription)\s+([_A-Za-z]\w*)")
+
+
+def normalize(sql: str) -> str:
+    """Return ``sql`` without the details varying between runs."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+@dataclass
+class Operation:
+    """SQL statements run by one GraphQL operation."""
+
+    name: str
+    statements: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the operation as stored in the snapshot file."""
+        return {
+            "operation": self.name,
+            "count": len(self.statements),
+            "sql": self.statements,
+        }
+
+
+_operation: ContextVar[Operation | None] = ContextVar(
+    "query_counts_operation", default=None
+)
+
+
+def record_sql(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    """Execute wrapper adding the statement to the running operation."""
+    operation = _operation.get()
+    if operation is not None:
+        operation.statements.append(normalize(sql))
+    return execute(sql, params, many, context)
+
+
+def instrument(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """Install :func:`record_sql` on ``connection``."""
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+class QueryCounts:
+    """Record operations per test and check them against the snapshots."""
+
+    def __init__(self, path: Path, *, update: bool, strict: bool = True) -> None:
+        self.path = path
+        self.update = update
+        self.strict = strict
+        self.snapshots: dict[str, list[dict[str, Any]]] = (
+            json.loads(path.read_text()) if path.exists() else {}
+        )
+        self.changed = False
+        self.lowered: list[str] = []
+        self.recorded: list[str] = []
+        self.operations: list[Operation] | None = None
+
+    def start(self, query: str | None, operation_name: str | None) -> Operation:
+        """Return the recorder of an operation about to be executed."""
+        if operation_name is None and query is not None:
+            match = OPERATION_NAME.search(query)
+            operation_name = match.group(1) if match else None
+        operation = Operation(operation_name or "anonymous")
+        if self.operations is not None:
+            self.operations.append(operation)
+        return operation
+
+    def check(self, nodeid: str, operations: list[Operation]) -> None:
+        """Compare ``operations`` with the snapshot of test ``nodeid``."""
+        recorded = [operation.as_dict() for operation in operations]
+        if self.update:
+            if not recorded:
+                self.changed |= self.snapshots.pop(nodeid, None) is not None
+            elif self.snapshots.get(nodeid) != recorded:
+                self.snapshots[nodeid] = recorded
+                self.changed = True
+            return
+        if not operations:
+            return
+
+        baseline = self.snapshots.get(nodeid)
+        if baseline is None:
+            if self.strict:
+                pytest.fail(
+                    f"No query count snapshot for {nodeid}; "
+                    "run pytest --query-counts=record to add it",
+                    pytrace=False,
+                )
+            self.snapshots[nodeid] = recorded
+            self.recorded.append(nodeid)
+            self.changed = True
+            return
+        problems = []
+        for index, operation in enumerate(operations):
+            label = f"Operation {index} ({operation.name})"
+            if index >= len(baseline):
+                problems.append(f"{label} has no snapshot")
+                continue
+            count, expected = len(operation.statements), baseline[index]["count"]
+            if count > expected:
+                statements = "\n".join(f"    {sql}" for sql in operation.statements)
+                problems.append(
+                    f"{label} ran {count} SQL statements, "
+                    f"its snapshot allows {expected}:\n{statements}"
+                )
+            elif count < expected:
+                self.lowered.append(nodeid)
+        if problems:
+            hint = "run pytest --update-query-snapshots if this is intended"
+            pytest.fail("\n".join([*problems, hint]), pytrace=False)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Generator[None, Any, Any]:
+        """Record the operations of ``item`` and check them if it passed."""
+        self.operations = []
+        try:
+            result = yield
+        finally:
+            operations, self.operations = self.operations, None
+        self.check(item.nodeid, operations)
+        return result
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        """Report written snapshots and counts that could be lowered."""
+        if self.changed and not self.update:
+            terminalreporter.write_line(
+                f"Recorded query count snapshots of {len(self.recorded)} new "
+                f"tests in {self.path}"
+            )
+        elif self.changed:
+            terminalreporter.write_line(f"Updated query count snapshots in {self.path}")
+        elif self.lowered:
+            terminalreporter.write_line(
+                f"{len(set(self.lowered))} tests ran fewer SQL statements than "
+                "their snapshot; run pytest --update-query-snapshots to lower it"
+            )
+
+    def pytest_sessionfinish(self) -> None:
+        """Write the snapshots when they were updated."""
+        if self.changed:
+            self.path.parent.mkdir(exist_ok=True)
+            text = json.dumps(self.snapshots, indent=2, sort_keys=True)
+            self.path.write_text(text + "\n")
+
+
+def _recording(plugin: QueryCounts, method: Callable[..., Any]) -> Any:
+    if inspect.iscoroutinefunction(method):
+
+        @functools.wraps(method)
+        async def execute(
+            self: strawberry.Schema,
+            query: str | None,
+            *args: Any,
+            **kwargs: Any,
+        ) -> Any:
+            token = _operation.set(plugin.start(query, kwargs.get("operation_name")))
+            try:
+                return await method(self, query, *args, **kwargs)
+            finally:
+                _operation.reset(token)
+
+        return execute
+
+    @functools.wraps(method)
+    def execute_sync(
+        self: strawberry.Schema,
+        query: str | None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        token = _operation.set(plugin.start(query, kwargs.get("operation_name")))
+        try:
+            return method(self, query, *args, **kwargs)
+        finally:
+            _operation.reset(token)
+
+    return execute_sync
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add ``--update-query-snapshots`` and ``--query-counts``."""
+    parser.addoption(
+        "--update-query-snapshots",
+        action="store_true",
+        help="Record the SQL run by GraphQL operations as the new snapshots.",
+    )
+    parser.addoption(
+        "--query-counts",
+        choices=["record", "strict"],
+        default="strict",
+        help=(
+            "What to do with tests that have no query count snapshot: "
+            "fail (default) or record one."
+        ),
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the recorder and wrap schema execution."""
+    update = config.getoption("--update-query-snapshots")
+    strict = config.getoption("--query-counts") == "strict"
+    plugin = QueryCounts(SNAPSHOTS, update=update, strict=strict)
+    config.pluginmanager.register(plugin, "query_counts")
+    connection_created.connect(instrument, weak=False)
+    originals = {
+        name: getattr(strawberry.Schema, name) for name in ["execute", "execute_sync"]
+    }
+    for name, method in originals.items():
+        setattr(strawberry.Schema, name, _recording(plugin, method))
+    config.add_cleanup(lambda: _restore(originals))
+
+
+def _restore(originals: dict[str, Any]) -> None:
+    for name, method in originals.items():
+        setattr(strawberry.Schema, name, method)
+    connection_created.disconnect(instrument)
+
+
+@pytest.fixture
+def query_scaling(
+    pytestconfig: pytest.Config,
+) -> Callable[..., dict[int, list[int]]]:
+    """Return a check that operations cost as many statements at any size.
+
+    The check calls ``seed(size)`` then ``run()`` for every size in
+    ``sizes``, and returns the statement counts of the operations ``run``
+    executed, by size.
+    """
+    plugin = pytestconfig.pluginmanager.get_plugin("query_counts")
+    assert isinstance(plugin, QueryCounts)
+
+    def check(
+        run: Callable[[], object],
+        seed: Callable[[int], object],
+        sizes: Iterable[int] = SIZES,
+    ) -> dict[int, list[int]]:
+        assert plugin.operations is not None
+        counts = {}
+        for size in sizes:
+            seed(size)
+            start = len(plugin.operations)
+            run()
+            counts[size] = [len(op.statements) for op in plugin.operations[start:]]
+        if len({tuple(count) for count in counts.values()}) > 1:
+            table = ", ".join(f"{size} rows: {count}" for size, count in counts.items())
+            pytest.fail(f"SQL statements grow with row count: {table}", pytrace=False)
+        return counts
+
+    return check
@@ -0,0 +1,98 @@
+"""Tests for root fields resolved through the async ORM."""
+
+import json
+from typing import Any
+
+import pytest
+from django.test import Client
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.fields import LoaderField
+from envision.core.models import Color, Fruit
+
+
+@pytest.mark.django_db
+class TestAsyncRootFields:
+    """Test cases for ``LoaderField.aresolve_root`` under ``/graphql``."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Set up test client and count calls to the async resolver."""
+        self.client = Client()
+        self.calls: list[str] = []
+        aresolve_root = LoaderField.aresolve_root
+
+        async def spy(field: LoaderField, *args: Any) -> Any:
+            self.calls.append(field.python_name)
+            return await aresolve_root(field, *args)
+
+        monkeypatch.setattr(LoaderField, "aresolve_root", spy)
+
+    def execute_query(
+        self,
+        query: str,
+        graphql_url: str = "/graphql",
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def test_fruits(
+        self,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        blueberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test filters, ordering, pagination and the optimizer still apply."""
+        query = """
+            {
+                fruits(
+                    filters: {color: {name: {exact: "red"}}}
+                    ordering: {name: ASC}
+                    pagination: {limit: 1}
+                ) { name color { name } }
+            }
+        """
+        with django_assert_num_queries(1):
+            result = self.execute_query(query)
+
+        assert result["data"] == {
+            "fruits": [{"name": "raspberry", "color": {"name": "red"}}],
+        }
+        assert self.calls == ["fruits"]
+
+    def test_color(self, red_color: Color) -> None:
+        """Test a single row is fetched by ``pk``."""
+        result = self.execute_query(
+            f"{{ color(pk: {red_color.pk}) {{ name fruits {{ name }} }} }}",
+        )
+
+        assert result["data"] == {"color": {"name": "red", "fruits": []}}
+        assert self.calls == ["color"]
+
+    def test_missing_row(self) -> None:
+        """Test an unknown ``pk`` is reported like the sync resolver does."""
+        async_result = self.execute_query("{ fruit(pk: 0) { name } }")
+        sync_result = self.execute_query("{ fruit(pk: 0) { name } }", "/graphql/sync")
+
+        message = sync_result["errors"][0]["message"]
+        assert async_result["errors"][0]["message"] == message
+
+    def test_sync_view(self, strawberry: Fruit) -> None:
+        """Test ``/graphql/sync`` keeps the sync resolvers."""
+        result = self.execute_query("{ fruits { name } }", "/graphql/sync")
+
+        assert result["data"] == {"fruits": [{"name": "strawberry"}]}
+        assert self.calls == []
+
+
+def test_asgi_application() -> None:
+    """Test the ASGI entry point loads."""
+    from envision.asgi import application
+
+    assert callable(application)
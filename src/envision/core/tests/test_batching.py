@@ -0,0 +1,147 @@
+"""Tests for batched requests holding several operations."""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.test import Client, override_settings
+from pytest_django import DjangoAssertNumQueries
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+from envision.core.models import Fruit
+
+FRUIT_COLORS = "{ fruits(filters: {color: {}}) { name color { name } } }"
+BERRY_COLORS = """
+    query Berries {
+        fruits(filters: {name: {endsWith: "berry"}, color: {}}) { color { name } }
+    }
+"""
+
+
+@pytest.mark.django_db
+class TestBatching:
+    """Test cases for JSON arrays of operations."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(
+        self,
+        request: pytest.FixtureRequest,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        blueberry: Fruit,
+    ) -> Iterator[None]:
+        """Set up test client, GraphQL endpoint and fruits, unoptimized."""
+        self.client = Client()
+        self.graphql_url = request.param
+        # Without the optimizer every ``color`` goes through the loaders.
+        with DjangoOptimizerExtension.disabled():
+            yield
+
+    def post(self, operations: list[dict[str, Any]]) -> Any:
+        """Post ``operations`` as one batch and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps(operations),
+            content_type="application/json",
+        )
+        assert response.status_code == 200, response.content
+        return response.json()
+
+    def test_results_in_order(self) -> None:
+        """Test every operation gets its own result, in request order."""
+        results = self.post(
+            [
+                {"query": "{ colors { name } }"},
+                {"query": BERRY_COLORS, "operationName": "Berries"},
+                {"query": "{ nope }"},
+            ]
+        )
+
+        assert [result["data"] for result in results[:2]] == [
+            {"colors": [{"name": "red"}, {"name": "blue"}]},
+            {
+                "fruits": [
+                    {"color": {"name": "red"}},
+                    {"color": {"name": "red"}},
+                    {"color": {"name": "blue"}},
+                ]
+            },
+        ]
+        assert "errors" not in results[0]
+        assert results[2]["errors"][0]["message"].startswith("Cannot query field")
+
+    def test_shared_loaders(
+        self,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test colors loaded by one operation are reused by the others."""
+        with django_assert_num_queries(3):
+            results = self.post([{"query": FRUIT_COLORS}, {"query": BERRY_COLORS}])
+
+        assert len(results[0]["data"]["fruits"]) == 3
+        assert len(results[1]["data"]["fruits"]) == 3
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=None, GRAPHQL_MAX_BATCH_COST=45)
+    def test_batch_cost(self) -> None:
+        """Test operations over the batch budget are rejected, not the batch."""
+        # Each operation costs 20 fruits with a color: 40.
+        results = self.post([{"query": FRUIT_COLORS}] * 2)
+
+        assert "errors" not in results[0]
+        assert results[1]["data"] is None
+        assert results[1]["errors"][0]["message"] == (
+            "Batch cost 80 exceeds the maximum of 45"
+        )
+        assert results[1]["errors"][0]["extensions"]["code"] == "QUERY_TOO_COMPLEX"
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=100, GRAPHQL_MAX_BATCH_COST=30)
+    def test_single_cost(self) -> None:
+        """Test single operations are not held to the batch budget."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": FRUIT_COLORS}),
+            content_type="application/json",
+        )
+
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        assert result["extensions"]["cost"]["requestedQueryCost"] == 40
+        assert len(result["data"]["fruits"]) == 3
+
+    def test_too_many_operations(self) -> None:
+        """Test batches over ``GRAPHQL_MAX_BATCH_OPERATIONS`` are refused."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps([{"query": "{ colors { name } }"}] * 11),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert b"Too many operations" in response.content
+
+    @override_settings(GRAPHQL_MAX_BATCH_OPERATIONS=2)
+    def test_configured_operations(self) -> None:
+        """Test the limit is read from the settings of each request."""
+        assert len(self.post([{"query": "{ colors { name } }"}] * 2)) == 2
+
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps([{"query": "{ colors { name } }"}] * 3),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert b"Too many operations" in response.content
+
+    @override_settings(GRAPHQL_MAX_BATCH_OPERATIONS=None)
+    def test_disabled(self) -> None:
+        """Test batches are refused when the limit is ``None``."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps([{"query": "{ colors { name } }"}]),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert b"Batching is not enabled" in response.content
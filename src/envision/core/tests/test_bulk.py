@@ -0,0 +1,189 @@
+"""Tests for the bulk list mutations."""
+
+import json
+from typing import Any
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.models import Color, Fruit
+from envision.core.response_cache import response_cache
+
+CREATE_FRUITS = """
+    mutation CreateFruits($data: [FruitInput!]!) {
+        bulkCreateFruits(data: $data) { id name color { name } }
+    }
+"""
+
+
+@pytest.mark.django_db
+class TestBulkMutations:
+    """Test cases for the bulkCreate/bulkUpdate/bulkDelete mutations."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client and GraphQL endpoint."""
+        self.client = Client()
+        self.graphql_url = request.param
+
+    def execute_query(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def create_fruits(self, count: int, color: Color) -> dict[str, Any]:
+        """Create ``count`` fruits of ``color`` through ``bulkCreateFruits``."""
+        data = [{"name": f"fruit{i}", "color": {"set": color.pk}} for i in range(count)]
+        return self.execute_query(CREATE_FRUITS, {"data": data})
+
+    def test_create_fruits(self, red_color: Color) -> None:
+        """Test every input is created and returned in order."""
+        result = self.create_fruits(3, red_color)
+
+        assert "errors" not in result
+        fruits = result["data"]["bulkCreateFruits"]
+        assert [f["name"] for f in fruits] == ["fruit0", "fruit1", "fruit2"]
+        assert {f["color"]["name"] for f in fruits} == {"red"}
+        assert Fruit.objects.filter(color=red_color).count() == 3
+
+    def test_create_query_count_is_constant(
+        self,
+        red_color: Color,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test 1 and 50 inputs cost the same number of queries."""
+        with CaptureQueriesContext(connection) as small:
+            self.create_fruits(1, red_color)
+        with django_assert_num_queries(len(small.captured_queries)):
+            self.create_fruits(50, red_color)
+
+    @override_settings(GRAPHQL_BULK_BATCH_SIZE=2)
+    def test_batch_size(self, red_color: Color) -> None:
+        """Test inserts are split into batches of the configured size."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.create_fruits(5, red_color)
+
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 3
+
+    def test_invalid_input_creates_nothing(self, red_color: Color) -> None:
+        """Test all rows are validated before any is written."""
+        data = [
+            {"name": "apple", "color": {"set": red_color.pk}},
+            {"name": "x" * 21, "color": {"set": red_color.pk}},
+            {"name": "cherry", "color": {"set": 999}},
+        ]
+        result = self.execute_query(CREATE_FRUITS, {"data": data})
+
+        message = result["errors"][0]["message"]
+        assert "1.name" in message
+        assert "2.color" in message
+        assert not Fruit.objects.exists()
+
+    def test_create_colors_with_fruits(self, strawberry: Fruit) -> None:
+        """Test reverse relations in the input are applied."""
+        query = """
+            mutation CreateColors($data: [ColorInput!]!) {
+                bulkCreateColors(data: $data) { name fruits { name } }
+            }
+        """
+        result = self.execute_query(
+            query,
+            {"data": [{"name": "crimson", "fruits": {"set": [strawberry.pk]}}]},
+        )
+
+        assert result["data"]["bulkCreateColors"] == [
+            {"name": "crimson", "fruits": [{"name": "strawberry"}]},
+        ]
+        strawberry.refresh_from_db()
+        assert strawberry.color is not None
+        assert strawberry.color.name == "crimson"
+
+    def test_update_fruits(
+        self,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        blueberry: Fruit,
+        blue_color: Color,
+    ) -> None:
+        """Test the input is applied to every filtered row."""
+        query = """
+            mutation {
+                bulkUpdateFruits(
+                    filters: {color: {name: {exact: "red"}}}
+                    data: {color: {set: %d}}
+                ) { name color { name } }
+            }
+        """
+        result = self.execute_query(query % blue_color.pk)
+
+        assert sorted(f["name"] for f in result["data"]["bulkUpdateFruits"]) == [
+            "raspberry",
+            "strawberry",
+        ]
+        assert Fruit.objects.filter(color=blue_color).count() == 3
+
+    def test_delete_colors(self, strawberry: Fruit, blueberry: Fruit) -> None:
+        """Test filtered rows and their cascades are deleted."""
+        query = """
+            mutation {
+                bulkDeleteColors(filters: {name: {exact: "red"}}) { id name }
+            }
+        """
+        result = self.execute_query(query)
+
+        assert [c["name"] for c in result["data"]["bulkDeleteColors"]] == ["red"]
+        assert list(Color.objects.values_list("name", flat=True)) == ["blue"]
+        assert list(Fruit.objects.values_list("name", flat=True)) == ["blueberry"]
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE="default")
+    def test_response_cache_is_invalidated(self, red_color: Color) -> None:
+        """Test bulk writes drop cached responses despite sending no signals."""
+        cache.clear()
+        response_cache.reset()
+        assert self.execute_query("{ fruits { name } }")["data"] == {"fruits": []}
+
+        self.create_fruits(2, red_color)
+        result = self.execute_query("{ fruits { name } }")
+
+        assert len(result["data"]["fruits"]) == 2
+        assert response_cache.info().hits == 0
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE="default")
+    def test_delete_invalidates_once(self, red_color: Color) -> None:
+        """Test a bulk delete invalidates each model once, not once per row."""
+        self.create_fruits(20, red_color)
+        response_cache.reset()
+
+        query = 'mutation { bulkDeleteColors(filters: {name: {exact: "red"}}) { id } }'
+        self.execute_query(query)
+
+        assert not Fruit.objects.exists()
+        assert response_cache.info().invalidations == 2
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE="default")
+    def test_stock_mutations_signal_each_row(self, red_color: Color) -> None:
+        """Test the stock list mutations still save and signal row by row."""
+        response_cache.reset()
+        query = """
+            mutation CreateFruits($data: [FruitInput!]!) {
+                createFruits(data: $data) { name }
+            }
+        """
+        data = [{"name": f"fruit{i}", "color": {"set": red_color.pk}} for i in range(3)]
+        result = self.execute_query(query, {"data": data})
+
+        assert len(result["data"]["createFruits"]) == 3
+        assert response_cache.info().invalidations == 3
@@ -0,0 +1,155 @@
+"""Tests for static query cost and depth analysis."""
+
+import json
+from typing import Any
+
+import pytest
+from django.test import Client, override_settings
+from graphql import parse
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.cost import CostAnalyzer, OperationCost
+from envision.core.models import Fruit
+from envision.core.schema import schema
+
+RECURSIVE_QUERY = "{ colors { fruits { color { fruits { color { name } } } } } }"
+
+
+def analyze(query: str, variables: dict[str, Any] | None = None) -> OperationCost:
+    """Return the cost of ``query`` with a default list size of 10."""
+    return CostAnalyzer(
+        schema._schema,
+        parse(query),
+        variables,
+        default_list_size=10,
+    ).analyze()
+
+
+class TestCostAnalyzer:
+    """Test cases for CostAnalyzer."""
+
+    @pytest.mark.parametrize(
+        ("query", "cost", "depth"),
+        [
+            ("{ fruits { name } }", 10, 2),
+            ("{ fruit(pk: 1) { name color { name } } }", 2, 3),
+            ("{ colors { fruits { name } } }", 110, 3),
+            ("{ fruits(pagination: {limit: 3}) { name } }", 3, 2),
+            ("{ fruitsConnection(first: 3) { edges { node { name } } } }", 7, 4),
+            ("{ fruitsConnection { totalCount edges { cursor } } }", 11, 3),
+            ("{ __schema { types { name } } }", 0, 0),
+        ],
+    )
+    def test_cost(self, query: str, cost: int, depth: int) -> None:
+        """Test lists are weighed by their page size."""
+        assert analyze(query) == OperationCost(cost=cost, depth=depth)
+
+    def test_nesting_multiplies_cost(self) -> None:
+        """Test each level of ``Color.fruits`` multiplies the cost."""
+        assert analyze(RECURSIVE_QUERY) == OperationCost(cost=2210, depth=6)
+
+    def test_variables(self) -> None:
+        """Test page sizes given as variables and defaults are used."""
+        query = """
+            query Fruits($limit: Int = 4) {
+                fruits(pagination: {limit: $limit}) { name }
+            }
+        """
+        assert analyze(query).cost == 4
+        assert analyze(query, {"limit": 2}).cost == 2
+
+    def test_fragments(self) -> None:
+        """Test fragment spreads cost the same as inline selections."""
+        query = """
+            query { colors { ...ColorFruits } }
+            fragment ColorFruits on Color { fruits { ... on Fruit { name } } }
+        """
+        assert analyze(query) == analyze("{ colors { fruits { name } } }")
+
+
+@pytest.mark.django_db
+class TestQueryCostExtension:
+    """Budgets are enforced before any resolver runs."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client and GraphQL endpoint."""
+        self.client = Client()
+        self.graphql_url = request.param
+
+    def execute_query(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    @override_settings(
+        GRAPHQL_MAX_QUERY_DEPTH=10,
+        GRAPHQL_MAX_QUERY_COST=1000,
+        GRAPHQL_DEFAULT_LIST_SIZE=20,
+    )
+    def test_cost_is_reported(self, strawberry: Fruit) -> None:
+        """Test the computed cost is returned in ``extensions``."""
+        result = self.execute_query("{ fruits { name color { name } } }")
+
+        assert result["data"]["fruits"] == [
+            {"name": "strawberry", "color": {"name": "red"}},
+        ]
+        assert result["extensions"]["cost"] == {
+            "requestedQueryCost": 40,
+            "maximumAvailable": 1000,
+            "depth": 3,
+            "maximumDepth": 10,
+        }
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=1000, GRAPHQL_DEFAULT_LIST_SIZE=20)
+    def test_cost_over_budget(
+        self,
+        strawberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test an expensive operation is rejected without touching the DB."""
+        with django_assert_num_queries(0):
+            result = self.execute_query(RECURSIVE_QUERY)
+
+        assert result["data"] is None
+        assert result["errors"][0]["extensions"] == {"code": "QUERY_TOO_COMPLEX"}
+        assert result["extensions"]["cost"]["requestedQueryCost"] > 1000
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=1000, GRAPHQL_DEFAULT_LIST_SIZE=20)
+    def test_limit_lowers_cost(self, strawberry: Fruit) -> None:
+        """Test the same shape is admitted with small page sizes."""
+        query = """
+            query Recursive($limit: Int!) {
+                colors(pagination: {limit: $limit}) {
+                    fruits(pagination: {limit: $limit}) {
+                        color { fruits(pagination: {limit: $limit}) { name } }
+                    }
+                }
+            }
+        """
+        result = self.execute_query(query, {"limit": 5})
+
+        assert "errors" not in result
+        assert result["extensions"]["cost"]["requestedQueryCost"] == 180
+
+    @override_settings(GRAPHQL_MAX_QUERY_DEPTH=3, GRAPHQL_MAX_QUERY_COST=None)
+    def test_depth_over_budget(
+        self,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test an operation nested too deeply is rejected."""
+        with django_assert_num_queries(0):
+            result = self.execute_query(RECURSIVE_QUERY)
+
+        assert result["data"] is None
+        assert result["errors"][0]["message"] == (
+            "Query depth 6 exceeds the maximum of 3"
+        )
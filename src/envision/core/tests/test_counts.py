@@ -0,0 +1,196 @@
+"""Tests for aggregate fields and the denormalized fruit counter."""
+
+import json
+from typing import Any
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from envision.core.models import Color, Fruit
+
+
+@pytest.mark.django_db
+class TestFruitCount:
+    """Test cases for ``Color.fruitCount`` and ``totalCount``."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client, GraphQL endpoint and colors with fruits."""
+        self.client = Client()
+        self.graphql_url = request.param
+        red, green, _ = Color.objects.bulk_create(
+            Color(name=name) for name in ["red", "green", "blue"]
+        )
+        Fruit.objects.bulk_create(
+            [
+                *(Fruit(name=f"berry{i}", color=red) for i in range(3)),
+                Fruit(name="lime", color=green),
+            ]
+        )
+
+    def execute_query(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> tuple[dict[str, Any], list[str]]:
+        """Execute ``query`` and return the response data and its SQL."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                self.graphql_url,
+                data=json.dumps({"query": query, "variables": variables or {}}),
+                content_type="application/json",
+            )
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        return result["data"], [query["sql"] for query in ctx.captured_queries]
+
+    def test_annotated(self) -> None:
+        """Test top-level colors count their fruits in the same query."""
+        data, statements = self.execute_query("{ colors { name fruitCount } }")
+
+        assert data["colors"] == [
+            {"name": "red", "fruitCount": 3},
+            {"name": "green", "fruitCount": 1},
+            {"name": "blue", "fruitCount": 0},
+        ]
+        assert len(statements) == 1
+        assert "COUNT(*)" in statements[0]
+        assert "core_fruit" not in self.execute_query("{ colors { name } }")[1][0]
+
+    def test_batched(self) -> None:
+        """Test colors reached through fruits are counted in one query."""
+        data, statements = self.execute_query(
+            "{ fruits(filters: {color: {}}) { color { fruitCount } } }"
+        )
+
+        counts = [fruit["color"]["fruitCount"] for fruit in data["fruits"]]
+        assert counts == [3, 3, 3, 1]
+        assert len(statements) == 2
+        assert "GROUP BY" in statements[1]
+        assert "COUNT(*)" not in statements[0]
+
+    @override_settings(GRAPHQL_COUNTER_COLUMNS=True)
+    def test_counter_column(self) -> None:
+        """Test the counter column replaces the count when enabled."""
+        query = """{
+            colors { fruitCount }
+            fruits(filters: {color: {}}) { color { fruitCount } }
+        }"""
+        data, statements = self.execute_query(query)
+
+        assert [color["fruitCount"] for color in data["colors"]] == [3, 1, 0]
+        assert [fruit["color"]["fruitCount"] for fruit in data["fruits"]] == [
+            3,
+            3,
+            3,
+            1,
+        ]
+        assert not any("COUNT(" in sql for sql in statements)
+
+    def test_total_count(self) -> None:
+        """Test ``totalCount`` counts every matching row, only when selected."""
+        query = """
+            query ($limit: Int!) {
+                colorsPage(
+                    pagination: {limit: $limit}
+                    filters: {fruits: {name: {startsWith: "berry"}, color: {}}}
+                ) {
+                    totalCount
+                    results { name fruitCount }
+                }
+            }
+        """
+        data, statements = self.execute_query(query, {"limit": 1})
+
+        assert data["colorsPage"] == {
+            "totalCount": 1,
+            "results": [{"name": "red", "fruitCount": 3}],
+        }
+        assert len(statements) == 2
+
+        _, statements = self.execute_query(
+            "{ colorsPage(pagination: {limit: 2}) { results { name } } }"
+        )
+        assert len(statements) == 1
+
+
+@pytest.mark.django_db
+class TestCounterColumn:
+    """Test cases for the triggers maintaining ``Color.fruit_count``."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self) -> None:
+        """Set up test client."""
+        self.client = Client()
+
+    def execute_query(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the response data."""
+        response = self.client.post(
+            "/graphql/sync",
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        return result["data"]  # type: ignore[no-any-return]
+
+    def assert_counts(self) -> None:
+        """Assert every counter equals the number of fruits of its color."""
+        for color in Color.objects.all():
+            assert color.fruit_count == color.fruits.count(), color.name
+
+    def test_mutations(self, red_color: Color, blue_color: Color) -> None:
+        """Test creating, moving and deleting fruits keep the counters exact."""
+        self.execute_query(
+            """
+            mutation ($red: ID!) {
+                bulkCreateFruits(data: [
+                    {name: "cherry", color: {set: $red}},
+                    {name: "plum", color: {set: $red}},
+                ]) { id }
+            }
+            """,
+            {"red": red_color.pk},
+        )
+        self.assert_counts()
+
+        self.execute_query(
+            """
+            mutation ($blue: ID!) {
+                bulkUpdateFruits(
+                    data: {color: {set: $blue}}
+                    filters: {name: {exact: "plum"}, color: {}}
+                ) { id }
+            }
+            """,
+            {"blue": blue_color.pk},
+        )
+        self.assert_counts()
+        assert Color.objects.get(pk=blue_color.pk).fruit_count == 1
+
+        self.execute_query(
+            "mutation { bulkDeleteFruits("
+            'filters: {name: {exact: "cherry"}, color: {}}) { id } }'
+        )
+        self.assert_counts()
+
+        self.execute_query(
+            """
+            mutation ($plum: ID!) {
+                createColor(data: {name: "purple", fruits: {set: [$plum]}}) { id }
+            }
+            """,
+            {"plum": Fruit.objects.get(name="plum").pk},
+        )
+        self.assert_counts()
+        assert Color.objects.get(name="purple").fruit_count == 1
+
+    def test_fixture(self) -> None:
+        """Test fruits loaded before their color are counted."""
+        call_command("loaddata", "berries", verbosity=0)
+
+        self.assert_counts()
+        assert Color.objects.get(name="red").fruit_count == 2
@@ -0,0 +1,119 @@
+"""Tests for the parsed/validated document cache."""
+
+import json
+from typing import Any
+
+import pytest
+from django.test import Client
+from graphql import parse
+
+from envision.core.documents import (
+    CachedDocument,
+    DocumentCache,
+    document_cache,
+    document_hash,
+)
+from envision.core.models import Fruit
+
+
+class TestDocumentCache:
+    """Test cases for DocumentCache."""
+
+    def test_counters(self) -> None:
+        """Test hits and misses are counted."""
+        cache = DocumentCache(maxsize=2)
+        entry = CachedDocument(document=parse("{ a }"))
+
+        assert cache.get("a") is None
+        cache.set("a", entry)
+        assert cache.get("a") is entry
+
+        info = cache.info()
+        assert (info.hits, info.misses, info.size, info.maxsize) == (1, 1, 1, 2)
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """Test the entry not read for the longest is dropped first."""
+        cache = DocumentCache(maxsize=2)
+        entry = CachedDocument(document=parse("{ a }"))
+        cache.set("a", entry)
+        cache.set("b", entry)
+        cache.get("a")
+        cache.set("c", entry)
+
+        assert cache.peek("a") is entry
+        assert cache.peek("b") is None
+        assert cache.peek("c") is entry
+
+    def test_zero_capacity_disables_cache(self) -> None:
+        """Test a cache of size 0 stores nothing."""
+        cache = DocumentCache(maxsize=0)
+        cache.set("a", CachedDocument(document=parse("{ a }")))
+
+        assert cache.info().size == 0
+
+
+@pytest.mark.django_db
+class TestDocumentCacheExtension:
+    """Repeated documents skip parsing and validation."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(
+        self,
+        request: pytest.FixtureRequest,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Set up test client, a clean cache and a counting parser."""
+        self.client = Client()
+        self.graphql_url = request.param
+        document_cache.clear()
+
+        self.parses = 0
+
+        def counting_parse(*args: Any, **kwargs: Any) -> Any:
+            self.parses += 1
+            return parse(*args, **kwargs)
+
+        monkeypatch.setattr("strawberry.schema.schema.parse", counting_parse)
+
+    def execute_query(self, query: str) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def test_repeated_query_is_parsed_once(self, strawberry: Fruit) -> None:
+        """Test the second request reuses the cached document."""
+        query = "{ fruits { name color { name } } }"
+        first = self.execute_query(query)
+        second = self.execute_query(query)
+
+        assert first == second
+        assert first["data"]["fruits"] == [
+            {"name": "strawberry", "color": {"name": "red"}},
+        ]
+        assert self.parses == 1
+        info = document_cache.info()
+        assert (info.hits, info.misses) == (1, 1)
+        assert document_cache.peek(document_hash(query)) is not None
+
+    def test_invalid_query_errors_are_cached(self) -> None:
+        """Test validation errors are replayed identically."""
+        query = "{ fruits { doesNotExist } }"
+        first = self.execute_query(query)
+        second = self.execute_query(query)
+
+        assert "errors" in first
+        assert first == second
+        assert document_cache.info().hits == 1
+
+    def test_syntax_error_is_not_cached(self) -> None:
+        """Test documents that fail to parse are not stored."""
+        first = self.execute_query("{ fruits {")
+        second = self.execute_query("{ fruits {")
+
+        assert "errors" in first
+        assert first == second
+        assert document_cache.info().size == 0
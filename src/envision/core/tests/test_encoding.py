@@ -0,0 +1,151 @@
+"""Tests for the JSON codecs of the GraphQL views."""
+
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient, Client, override_settings
+from django.utils.functional import lazy
+
+from envision.core import encoding
+from envision.core.models import Color, Fruit
+
+requires_orjson = pytest.mark.skipif(
+    "orjson" not in encoding.CODECS, reason="orjson is not installed"
+)
+
+VALUES: list[Any] = [
+    {"data": {"fruits": [{"id": "1", "name": "strawberry", "color": None}]}},
+    ["açaí", "\u2028", "\x00\x1f\x7f", '"quoted" \\ /', "🍓"],
+    [0, -1, 2**53, True, False, None, 0.5, 123.25],
+    datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.UTC),
+    datetime.date(2024, 5, 1),
+    decimal.Decimal("1.10"),
+    uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    lazy(lambda: "lazy", str)(),
+]
+
+
+class TestCodecs:
+    """Test cases for :data:`~envision.core.encoding.CODECS`."""
+
+    @pytest.mark.parametrize("value", VALUES)
+    def test_json_output(self, value: Any) -> None:
+        """Test the json codec writes what strawberry's Django views did."""
+        expected = json.dumps(value, cls=DjangoJSONEncoder).encode()
+
+        assert encoding.CODECS["json"].dumps(value) == expected
+
+    @requires_orjson
+    @pytest.mark.parametrize("value", VALUES)
+    def test_equivalent(self, value: Any) -> None:
+        """Test both codecs write the same values and read them back alike."""
+        encoded = encoding.CODECS["json"].dumps(value)
+        compact = encoding.CODECS["orjson"].dumps(value)
+
+        assert json.loads(compact) == json.loads(encoded)
+        assert encoding.CODECS["orjson"].loads(encoded) == json.loads(encoded)
+
+    def test_default(self) -> None:
+        """Test orjson is used when installed."""
+        expected = "orjson" if "orjson" in encoding.CODECS else "json"
+
+        assert encoding.codec() is encoding.CODECS[expected]
+
+    @override_settings(GRAPHQL_JSON_CODEC="simdjson")
+    def test_unknown(self) -> None:
+        """Test an unknown codec name is reported."""
+        with pytest.raises(ImproperlyConfigured, match="'simdjson'"):
+            encoding.codec()
+
+
+@pytest.mark.django_db
+class TestViews:
+    """Test cases for requests and responses encoded by the views."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client, GraphQL endpoint and fruits with accents."""
+        self.client = Client()
+        self.graphql_url = request.param
+        color = Color.objects.create(name="púrpura")
+        Fruit.objects.create(name="açaí", color=color)
+        Fruit.objects.create(name="jabuticaba", color=color)
+
+    def post(self, body: str) -> tuple[int, bytes]:
+        """Post ``body`` and return the status code and response body."""
+        response = self.client.post(
+            self.graphql_url, data=body, content_type="application/json"
+        )
+        assert response["Content-Type"] == "application/json"
+        return response.status_code, response.content
+
+    @requires_orjson
+    def test_equivalent(self) -> None:
+        """Test responses decode alike whichever codec encodes them."""
+        body = json.dumps(
+            {
+                "query": "query ($n: String!) { fruits(filters: "
+                "{name: {exact: $n}, color: {}}) { name color { name } } }",
+                "variables": {"n": "açaí"},
+            },
+            ensure_ascii=False,
+        )
+        responses = {}
+        for name in ["json", "orjson"]:
+            with override_settings(GRAPHQL_JSON_CODEC=name):
+                responses[name] = self.post(body)
+
+        assert responses["json"][0] == responses["orjson"][0] == 200
+        assert json.loads(responses["json"][1]) == json.loads(responses["orjson"][1])
+        assert responses["json"][1].startswith(
+            b'{"data": {"fruits": [{"name": "a\\u00e7a\\u00ed", "color": '
+        )
+        assert responses["orjson"][1].startswith(
+            '{"data":{"fruits":[{"name":"açaí","color":{"name":"púrpura"}}]}'.encode()
+        )
+
+    @pytest.mark.parametrize("name", encoding.CODECS)
+    def test_invalid_json(self, name: str) -> None:
+        """Test malformed request bodies are rejected by either codec."""
+        with override_settings(GRAPHQL_JSON_CODEC=name):
+            response = self.client.post(
+                self.graphql_url, data="{nope", content_type="application/json"
+            )
+
+        assert response.status_code == 400
+        assert b"Unable to parse request body as JSON" in response.content
+
+
+@pytest.mark.django_db
+def test_multipart_content_length() -> None:
+    """Test multipart parts declare their length in bytes."""
+    color = Color.objects.create(name="púrpura")
+    Fruit.objects.bulk_create(Fruit(name=name, color=color) for name in ["açaí", "uva"])
+    query = "{ fruits(filters: {color: {}}) @stream(initialCount: 1) { name } }"
+
+    async def fetch() -> bytes:
+        response = await AsyncClient().post(
+            "/graphql",
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+            headers={"accept": "multipart/mixed"},
+        )
+        assert isinstance(response, StreamingHttpResponse)
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    body = async_to_sync(fetch)()
+
+    parts = body.split(b"\r\n---")[1:-1]
+    assert parts
+    for part in parts:
+        headers, _, content = part.partition(b"\r\n\r\n")
+        assert f"Content-Length: {len(content)}".encode() in headers
+        json.loads(content)
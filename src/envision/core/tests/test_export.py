@@ -0,0 +1,130 @@
+"""Tests for the streaming NDJSON/CSV exports."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+
+from envision.core.models import Color, Fruit
+
+
+def export_data(*args: str) -> str:
+    """Run ``export_data`` with ``args`` and return its output."""
+    stdout = io.StringIO()
+    call_command("export_data", *args, stdout=stdout)
+    return stdout.getvalue()
+
+
+@pytest.mark.django_db
+class TestExportCommand:
+    """Test cases for the ``export_data`` management command."""
+
+    def test_ndjson(self, strawberry: Fruit, blueberry: Fruit) -> None:
+        """Test every fruit is written with its color name, in pk order."""
+        lines = export_data("fruits").splitlines()
+
+        assert [json.loads(line) for line in lines] == [
+            {
+                "id": strawberry.pk,
+                "name": "strawberry",
+                "color": strawberry.color_id,
+                "color_name": "red",
+            },
+            {
+                "id": blueberry.pk,
+                "name": "blueberry",
+                "color": blueberry.color_id,
+                "color_name": "blue",
+            },
+        ]
+
+    def test_csv(self, red_color: Color, blue_color: Color) -> None:
+        """Test CSV output starts with a header row."""
+        assert export_data("colors", "--format", "csv") == (
+            f"id,name\n{red_color.pk},red\n{blue_color.pk},blue\n"
+        )
+
+    def test_filters(
+        self,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        blueberry: Fruit,
+    ) -> None:
+        """Test filters take the ``FruitFilter`` GraphQL shape."""
+        filters = {"color": {"name": {"iExact": "RED"}}, "name": {"startsWith": "r"}}
+        lines = export_data("fruits", "--filters", json.dumps(filters)).splitlines()
+
+        assert [json.loads(line)["name"] for line in lines] == ["raspberry"]
+
+    def test_invalid_filters(self) -> None:
+        """Test filters are validated against the schema."""
+        with pytest.raises(CommandError, match="colour"):
+            export_data("colors", "--filters", '{"colour": {}}')
+
+    def test_chunked_iteration(self, red_color: Color, tmp_path: Path) -> None:
+        """Test rows are fetched in one query and written to ``--output``."""
+        Fruit.objects.bulk_create(
+            Fruit(name=f"fruit{i}", color=red_color) for i in range(25)
+        )
+        path = tmp_path / "fruits.ndjson"
+        with CaptureQueriesContext(connection) as ctx:
+            export_data("fruits", "--output", str(path), "--chunk-size", "10")
+
+        assert len(ctx.captured_queries) == 1
+        assert len(path.read_text().splitlines()) == 25
+
+
+@pytest.mark.django_db
+class TestExportView:
+    """Test cases for ``/export/<name>.<format>``."""
+
+    def test_sync(self, client: Client, strawberry: Fruit) -> None:
+        """Test the response streams CSV with a download filename."""
+        response = client.get("/export/fruits.csv")
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert response["Content-Type"] == "text/csv"
+        assert response["Content-Disposition"] == 'attachment; filename="fruits.csv"'
+        body = b"".join(response.streaming_content).decode()
+        assert body.splitlines()[1] == (
+            f"{strawberry.pk},strawberry,{strawberry.color_id},red"
+        )
+
+    def test_async(self, strawberry: Fruit) -> None:
+        """Test ASGI requests stream through an async iterator."""
+        filters = json.dumps({"color": {"name": {"exact": "red"}}})
+
+        async def fetch() -> tuple[bool, bytes]:
+            response = await AsyncClient().get(
+                "/export/fruits.ndjson",
+                {"filters": filters},
+            )
+            assert isinstance(response, StreamingHttpResponse)
+            content = response.streaming_content
+            chunks = [chunk async for chunk in content]
+            return response.is_async, b"".join(chunks)
+
+        is_async, body = async_to_sync(fetch)()
+
+        assert is_async
+        assert json.loads(body)["name"] == "strawberry"
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/export/users.ndjson",
+            "/export/fruits.xml",
+            "/export/fruits.csv?filters={",
+            '/export/fruits.csv?filters={"name":1}',
+        ],
+    )
+    def test_bad_request(self, client: Client, url: str) -> None:
+        """Test invalid names, formats and filters are rejected up front."""
+        assert client.get(url).status_code == 400
@@ -0,0 +1,119 @@
+"""Tests for the streaming ``import_data`` command."""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from envision.core.importer import InvalidRecord, iter_json_array
+from envision.core.models import Color, Fruit
+
+BERRIES = Path(__file__).parent.parent / "fixtures" / "berries.json"
+
+
+def import_data(*args: str) -> str:
+    """Run ``import_data`` with ``args`` and return its output."""
+    stdout = io.StringIO()
+    call_command("import_data", *args, stdout=stdout, stderr=io.StringIO())
+    return stdout.getvalue()
+
+
+class TestJsonArray:
+    """Test cases for the incremental JSON array reader."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+    def test_items(self, chunk_size: int) -> None:
+        """Test items are decoded whatever the read size."""
+        items = [{"name": "a]b,[c", "color": 12}, 1234, "x", [1, [2]], None]
+        stream = io.StringIO(json.dumps(items, indent=2))
+
+        assert list(iter_json_array(stream, chunk_size)) == items
+
+    @pytest.mark.parametrize("text", ["{}", "[1, 2", "[{]"])
+    def test_invalid(self, text: str) -> None:
+        """Test malformed input is reported."""
+        with pytest.raises(InvalidRecord):
+            list(iter_json_array(io.StringIO(text), 2))
+
+
+@pytest.mark.django_db
+class TestImportData:
+    """Test cases for the ``import_data`` management command."""
+
+    def test_fixture(self) -> None:
+        """Test ``berries.json`` loads although fruits precede their colors."""
+        output = import_data(str(BERRIES))
+
+        assert "Imported 3 fruits" in output
+        assert "Imported 2 colors" in output
+        assert dict(Fruit.objects.values_list("name", "color__name")) == {
+            "strawberry": "red",
+            "raspberry": "red",
+            "blueberry": "blue",
+        }
+        assert Fruit.objects.create(name="cherry").pk == 4
+
+    def test_ndjson_by_color_name(self, red_color: Color, tmp_path: Path) -> None:
+        """Test flat records resolve colors by name or pk."""
+        path = tmp_path / "fruits.ndjson"
+        path.write_text(
+            '{"name": "cherry", "color": "red"}\n'
+            "\n"
+            f'{{"name": "apple", "color": {red_color.pk}}}\n'
+            '{"name": "lime", "color": null}\n',
+        )
+        import_data(str(path), "--model", "fruit")
+
+        assert dict(Fruit.objects.values_list("name", "color")) == {
+            "cherry": red_color.pk,
+            "apple": red_color.pk,
+            "lime": None,
+        }
+
+    def test_csv(self, tmp_path: Path) -> None:
+        """Test CSV rows are read by header and colors can be created."""
+        path = tmp_path / "fruits.csv"
+        path.write_text("name,color\ncherry,red\nlemon,yellow\napple,red\n")
+        import_data(str(path), "--model", "fruit", "--create-colors")
+
+        assert sorted(Color.objects.values_list("name", flat=True)) == [
+            "red",
+            "yellow",
+        ]
+        assert Fruit.objects.filter(color__name="red").count() == 2
+
+    def test_unknown_color(self, tmp_path: Path) -> None:
+        """Test an unresolvable color names the offending record."""
+        path = tmp_path / "fruits.csv"
+        path.write_text("name,color\ncherry,red\n")
+
+        with pytest.raises(CommandError, match="Record 1: Unknown color 'red'"):
+            import_data(str(path), "--model", "fruit")
+
+    def test_batches(self, tmp_path: Path) -> None:
+        """Test rows are inserted in batches of ``--batch-size``."""
+        path = tmp_path / "colors.json"
+        path.write_text(json.dumps([{"name": f"color{i}"} for i in range(5)]))
+        with CaptureQueriesContext(connection) as ctx:
+            import_data(str(path), "--model", "color", "--batch-size", "2")
+
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 3
+        assert Color.objects.count() == 5
+
+    def test_generate(self) -> None:
+        """Test the synthetic dataset spreads fruits over the colors."""
+        import_data("--generate", "10", "--colors", "3", "--batch-size", "4")
+
+        assert Color.objects.count() == 3
+        assert Fruit.objects.count() == 10
+        assert Fruit.objects.filter(color__name="color0").count() == 4
+
+    def test_needs_input(self) -> None:
+        """Test files and ``--generate`` are mutually exclusive."""
+        with pytest.raises(CommandError):
+            import_data()
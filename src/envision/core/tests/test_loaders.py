@@ -0,0 +1,142 @@
+"""Tests for per-request relation loaders."""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.test import Client
+from pytest_django import DjangoAssertNumQueries
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+from envision.core.loaders import Loaders
+from envision.core.models import Color, Fruit
+
+
+def seed(colors: int, fruits_per_color: int) -> None:
+    """Create ``colors`` colors with ``fruits_per_color`` fruits each."""
+    for i in range(colors):
+        color = Color.objects.create(name=f"color{i}")
+        Fruit.objects.bulk_create(
+            Fruit(name=f"fruit{i}-{j}", color=color) for j in range(fruits_per_color)
+        )
+
+
+@pytest.mark.django_db
+class TestRelationBatching:
+    """Query counts must not depend on the number of rows."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> Iterator[None]:
+        """Set up test client and GraphQL endpoint, without the optimizer."""
+        self.client = Client()
+        self.graphql_url = request.param
+        with DjangoOptimizerExtension.disabled():
+            yield
+
+    def execute_query(self, query: str) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    @pytest.mark.parametrize("size", [1, 5, 25])
+    def test_colors_fruits_color(
+        self,
+        size: int,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test colors, their fruits and their color cost two queries."""
+        seed(size, 3)
+        query = "{ colors { name fruits { name color { name } } } }"
+        with django_assert_num_queries(2):
+            result = self.execute_query(query)
+
+        assert "errors" not in result
+        colors = result["data"]["colors"]
+        assert len(colors) == size
+        for color in colors:
+            assert len(color["fruits"]) == 3
+            assert {fruit["color"]["name"] for fruit in color["fruits"]} == {
+                color["name"],
+            }
+
+    @pytest.mark.parametrize("size", [1, 5, 25])
+    def test_fruits_color_fruits(
+        self,
+        size: int,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test one query per relation and depth when walking from fruits."""
+        seed(size, 2)
+        query = "{ fruits { name color { name fruits { name } } } }"
+        with django_assert_num_queries(3):
+            result = self.execute_query(query)
+
+        assert "errors" not in result
+        fruits = result["data"]["fruits"]
+        assert len(fruits) == size * 2
+        for fruit in fruits:
+            assert fruit["name"] in {f["name"] for f in fruit["color"]["fruits"]}
+
+    def test_filtered_relation_bypasses_loader(
+        self,
+        strawberry: Fruit,
+        raspberry: Fruit,
+    ) -> None:
+        """Test nested filters still apply to the relation."""
+        query = """
+            query {
+                colors {
+                    name
+                    fruits(
+                        filters: {
+                            name: {exact: "raspberry"}
+                            color: {name: {exact: "red"}}
+                        }
+                    ) {
+                        name
+                    }
+                }
+            }
+        """
+        result = self.execute_query(query)
+
+        assert "errors" not in result
+        assert result["data"]["colors"] == [
+            {"name": "red", "fruits": [{"name": "raspberry"}]},
+        ]
+
+
+@pytest.mark.django_db
+class TestRelationLoader:
+    """Test cases for RelationLoader."""
+
+    def test_load_batches_peers(
+        self,
+        strawberry: Fruit,
+        blueberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test loading one fruit's color fetches the colors of its peers."""
+        fruits = list(Fruit.objects.order_by("pk"))
+        loaders = Loaders()
+        loaders.add_peers(fruits)
+        loader = loaders.relation(Fruit, "color")
+
+        with django_assert_num_queries(1):
+            assert loader.load(fruits[0]).name == "red"
+            assert loader.load(fruits[1]).name == "blue"
+
+    def test_reverse_relation_without_children(self, red_color: Color) -> None:
+        """Test a color without fruits loads an empty list."""
+        loader = Loaders().relation(Color, "fruits")
+        assert loader.load(red_color) == []
+
+    def test_non_relation_is_rejected(self) -> None:
+        """Test only foreign keys are accepted."""
+        with pytest.raises(TypeError):
+            Loaders().relation(Fruit, "name")
@@ -0,0 +1,165 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+import json
+import os
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from django.test import Client, override_settings
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+from envision.core.metrics import (
+    CONTENT_TYPE,
+    Histogram,
+    Snapshot,
+    registry,
+    render,
+)
+from envision.core.models import Fruit
+
+QUERY = "query Colors { colors { name fruits { name } } }"
+COLORS = 'operation_name="Colors",operation_type="query"'
+
+
+def scrape(client: Client) -> dict[str, float]:
+    """Return the samples served at ``/metrics`` by name and labels."""
+    response = client.get("/metrics")
+    assert response["Content-Type"] == CONTENT_TYPE
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return samples
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Test cases for ``/metrics``."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client, GraphQL endpoint and empty metrics."""
+        self.client = Client()
+        self.graphql_url = request.param
+        registry.reset()
+
+    def execute_query(self, query: str) -> None:
+        """Execute ``query``."""
+        self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+
+    def test_operations(self, strawberry: Fruit) -> None:
+        """Test operations are counted by name with their duration and SQL."""
+        for _ in range(2):
+            self.execute_query(QUERY)
+        self.execute_query("{ colours { name } }")
+
+        samples = scrape(self.client)
+        assert samples[f"graphql_operations_total{{{COLORS}}}"] == 2
+        assert samples[f"graphql_operation_sql_queries_total{{{COLORS}}}"] == 4
+        assert samples[f"graphql_operation_duration_seconds_count{{{COLORS}}}"] == 2
+        assert (
+            samples[f'graphql_operation_duration_seconds_bucket{{{COLORS},le="+Inf"}}']
+            == 2
+        )
+        assert f"graphql_operation_errors_total{{{COLORS}}}" not in samples
+        anonymous = 'operation_name="anonymous",operation_type="query"'
+        assert samples[f"graphql_operation_errors_total{{{anonymous}}}"] == 1
+        assert samples["graphql_document_cache_misses_total"] >= 2
+        assert samples['django_db_queries_total{alias="default"}'] >= 4
+        assert samples['django_db_connections_open{alias="default"}'] >= 1
+
+    def test_loader_hits(self, strawberry: Fruit, blueberry: Fruit) -> None:
+        """Test relation loaders report their batches and cache hits."""
+        with DjangoOptimizerExtension.disabled():
+            self.execute_query("{ fruits { color { name } } }")
+
+        samples = scrape(self.client)
+        relation = 'relation="Fruit.color"'
+        assert samples[f"graphql_loader_loads_total{{{relation}}}"] == 2
+        assert samples[f"graphql_loader_batches_total{{{relation}}}"] == 1
+        if self.graphql_url == "/graphql/sync":
+            # Peers are fetched together, so the second fruit is a hit.
+            assert samples[f"graphql_loader_hits_total{{{relation}}}"] == 1
+
+    @override_settings(GRAPHQL_METRICS_MAX_OPERATIONS=1)
+    def test_operation_names_are_bounded(self) -> None:
+        """Test names beyond the limit are counted as ``other``."""
+        for name in ["A", "B", "C"]:
+            self.execute_query(f"query {name} {{ colors {{ name }} }}")
+
+        samples = scrape(self.client)
+        assert (
+            samples[
+                'graphql_operations_total{operation_name="A",operation_type="query"}'
+            ]
+            == 1
+        )
+        assert (
+            samples[
+                'graphql_operations_total{operation_name="other",operation_type="query"}'
+            ]
+            == 2
+        )
+
+
+@pytest.mark.django_db
+class TestMultiProcess:
+    """Test cases for aggregating the metrics of several processes."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path: Path) -> Iterator[None]:
+        """Set up an empty metrics directory shared with other processes."""
+        self.client = Client()
+        self.directory = tmp_path
+        registry.reset()
+        with override_settings(GRAPHQL_METRICS_DIR=str(tmp_path)):
+            yield
+
+    def write(self, pid: int) -> None:
+        """Write the snapshot of a worker process ``pid``."""
+        snapshot = Snapshot()
+        key = ("django_db_queries_total", (("alias", "default"),))
+        snapshot.counters[key] = 10
+        key = ("django_db_connections_open", (("alias", "default"),))
+        snapshot.gauges[key] = 1
+        path = self.directory / f"{pid}.json"
+        path.write_text(json.dumps(snapshot.as_dict()))
+
+    def test_aggregation(self) -> None:
+        """Test counters of every process add up, gauges of live ones only."""
+        finished = subprocess.Popen(["true"])
+        finished.wait()
+        self.write(finished.pid)
+        self.write(os.getppid())
+        registry.inc("django_db_queries_total", (("alias", "default"),), 5)
+
+        samples = scrape(self.client)
+        assert samples['django_db_queries_total{alias="default"}'] >= 25
+        # This process reports its own open connections alongside the parent.
+        assert samples['django_db_connections_open{alias="default"}'] == 2
+        assert (self.directory / f"{os.getpid()}.json").exists()
+
+
+def test_render() -> None:
+    """Test label values are escaped and histograms are cumulative."""
+    snapshot = Snapshot()
+    snapshot.counters["graphql_operations_total", (("operation_name", 'a"\\'),)] = 1
+    key = ("graphql_phase_duration_seconds", (("phase", "parsing"),))
+    histogram = snapshot.histograms[key] = Histogram()
+    histogram.observe(0.0001)
+    histogram.observe(0.3)
+
+    lines = render(snapshot).splitlines()
+    assert 'graphql_operations_total{operation_name="a\\"\\\\"} 1' in lines
+    assert (
+        'graphql_phase_duration_seconds_bucket{phase="parsing",le="0.0005"} 1' in lines
+    )
+    assert 'graphql_phase_duration_seconds_bucket{phase="parsing",le="0.5"} 2' in lines
+    assert 'graphql_phase_duration_seconds_count{phase="parsing"} 2' in lines
@@ -3,6 +3,7 @@
 from typing import Any
 
 import pytest
+from django.core.management import call_command
 from django.db import IntegrityError
 
 from envision.core.models import Color, Fruit
@@ -69,4 +70,10 @@ class TestFruitModel:
         assert strawberry in red_fruits
         assert blueberry not in red_fruits
         assert blueberry in blue_fruits
-        assert strawberry not in blue_fruits
\ No newline at end of file
+        assert strawberry not in blue_fruits
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+def test_migrations_up_to_date() -> None:
+    """Test the migrations create every field and index of the models."""
+    call_command("makemigrations", "core", check=True, dry_run=True, verbosity=0)
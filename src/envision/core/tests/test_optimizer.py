@@ -0,0 +1,155 @@
+"""Tests for selection-set driven queryset optimization."""
+
+import json
+from typing import Any
+
+import pytest
+from django.test import Client
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.models import Color, Fruit
+
+
+@pytest.mark.django_db
+class TestQueryOptimizer:
+    """Root querysets are planned from the GraphQL selection set."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client and GraphQL endpoint."""
+        self.client = Client()
+        self.graphql_url = request.param
+
+    def execute_query(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def test_only_selected_columns(
+        self,
+        strawberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test unselected columns are left out of the SELECT."""
+        with django_assert_num_queries(1) as ctx:
+            result = self.execute_query("{ fruits { name } }")
+
+        assert result["data"]["fruits"] == [{"name": "strawberry"}]
+        assert "color_id" not in ctx.captured_queries[0]["sql"]
+
+    def test_fruit_color_is_joined(
+        self,
+        strawberry: Fruit,
+        blueberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test ``Fruit.color`` is fetched with ``select_related``."""
+        with django_assert_num_queries(1) as ctx:
+            result = self.execute_query("{ fruits { name color { name } } }")
+
+        assert "errors" not in result
+        assert "JOIN" in ctx.captured_queries[0]["sql"]
+        assert {(f["name"], f["color"]["name"]) for f in result["data"]["fruits"]} == {
+            ("strawberry", "red"),
+            ("blueberry", "blue"),
+        }
+
+    def test_single_fruit_color_is_joined(
+        self,
+        strawberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test ``Query.fruit`` is optimized like the list field."""
+        query = """
+            query GetFruit($pk: ID!) {
+                fruit(pk: $pk) { name color { name } }
+            }
+        """
+        with django_assert_num_queries(1):
+            result = self.execute_query(query, {"pk": strawberry.pk})
+
+        assert result["data"]["fruit"] == {
+            "name": "strawberry",
+            "color": {"name": "red"},
+        }
+
+    @pytest.mark.parametrize("size", [1, 10])
+    def test_color_fruits_are_prefetched(
+        self,
+        size: int,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test ``Color.fruits`` is one prefetch query for any row count."""
+        for i in range(size):
+            color = Color.objects.create(name=f"color{i}")
+            Fruit.objects.create(name=f"fruit{i}", color=color)
+
+        with django_assert_num_queries(2):
+            result = self.execute_query("{ colors { name fruits { name } } }")
+
+        assert len(result["data"]["colors"]) == size
+
+    def test_nested_filter_is_pushed_into_prefetch(
+        self,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        blueberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test ``FruitFilter`` on ``Color.fruits`` filters the prefetch."""
+        query = """
+            query {
+                colors {
+                    name
+                    fruits(
+                        filters: {
+                            name: {startsWith: "r"}
+                            color: {name: {exact: "red"}}
+                        }
+                    ) {
+                        name
+                    }
+                }
+            }
+        """
+        with django_assert_num_queries(2) as ctx:
+            result = self.execute_query(query)
+
+        assert "errors" not in result
+        assert "LIKE" in ctx.captured_queries[1]["sql"]
+        assert result["data"]["colors"] == [
+            {"name": "red", "fruits": [{"name": "raspberry"}]},
+            {"name": "blue", "fruits": []},
+        ]
+
+    def test_nested_ordering_is_pushed_into_prefetch(
+        self,
+        red_color: Color,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test ``FruitOrder`` on ``Color.fruits`` orders the prefetch."""
+        query = """
+            query GetColor($pk: ID!) {
+                color(pk: $pk) {
+                    fruits(ordering: [{name: DESC}]) { name }
+                }
+            }
+        """
+        with django_assert_num_queries(2) as ctx:
+            result = self.execute_query(query, {"pk": red_color.pk})
+
+        assert "DESC" in ctx.captured_queries[1]["sql"]
+        assert result["data"]["color"]["fruits"] == [
+            {"name": "strawberry"},
+            {"name": "raspberry"},
+        ]
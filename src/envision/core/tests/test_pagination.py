@@ -0,0 +1,191 @@
+"""Tests for keyset (cursor) pagination connections."""
+
+import json
+from typing import Any
+
+import pytest
+from django.test import Client
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.models import Color, Fruit
+
+FRUITS_PAGE = """
+    query FruitsPage($first: Int, $after: String, $ordering: [FruitOrder!]!) {
+        fruitsConnection(first: $first, after: $after, ordering: $ordering) {
+            edges { cursor node { name } }
+            pageInfo { hasNextPage endCursor }
+        }
+    }
+"""
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cases for ``fruitsConnection`` and ``colorsConnection``."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client, GraphQL endpoint and a few rows."""
+        self.client = Client()
+        self.graphql_url = request.param
+        red = Color.objects.create(name="red")
+        blue = Color.objects.create(name="blue")
+        for name, color in [
+            ("strawberry", red),
+            ("raspberry", red),
+            ("cherry", red),
+            ("blueberry", blue),
+            ("plum", blue),
+        ]:
+            Fruit.objects.create(name=name, color=color)
+
+    def execute_query(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def fetch_page(
+        self,
+        first: int,
+        after: str | None,
+        ordering: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Fetch one page of ``fruitsConnection``."""
+        result = self.execute_query(
+            FRUITS_PAGE,
+            {"first": first, "after": after, "ordering": ordering},
+        )
+        assert "errors" not in result
+        return result["data"]["fruitsConnection"]  # type: ignore[no-any-return]
+
+    def walk(self, first: int, ordering: list[dict[str, Any]]) -> list[str]:
+        """Return fruit names from following ``endCursor`` to the last page."""
+        names: list[str] = []
+        after = None
+        while True:
+            page = self.fetch_page(first, after, ordering)
+            names.extend(edge["node"]["name"] for edge in page["edges"])
+            if not page["pageInfo"]["hasNextPage"]:
+                return names
+            after = page["pageInfo"]["endCursor"]
+
+    @pytest.mark.parametrize(
+        ("ordering", "expected"),
+        [
+            (
+                [{"name": "ASC"}],
+                ["blueberry", "cherry", "plum", "raspberry", "strawberry"],
+            ),
+            (
+                [{"name": "DESC"}],
+                ["strawberry", "raspberry", "plum", "cherry", "blueberry"],
+            ),
+            (
+                [{"color": {"name": "ASC"}}],
+                ["blueberry", "plum", "strawberry", "raspberry", "cherry"],
+            ),
+        ],
+    )
+    def test_walk_all_pages(
+        self,
+        ordering: list[dict[str, Any]],
+        expected: list[str],
+    ) -> None:
+        """Test every row is returned once, in order, across pages."""
+        assert self.walk(2, ordering) == expected
+
+    def test_page_seeks_instead_of_offset(
+        self,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test later pages filter on the cursor key rather than OFFSET."""
+        first = self.fetch_page(2, None, [{"name": "ASC"}])
+        with django_assert_num_queries(1) as ctx:
+            self.fetch_page(2, first["pageInfo"]["endCursor"], [{"name": "ASC"}])
+
+        sql = ctx.captured_queries[0]["sql"]
+        assert "OFFSET" not in sql
+        assert '"core_fruit"."name" >' in sql
+
+    def test_concurrent_insert_does_not_repeat_rows(self) -> None:
+        """Test rows inserted before the cursor do not shift the next page."""
+        first = self.fetch_page(2, None, [{"name": "ASC"}])
+        assert [e["node"]["name"] for e in first["edges"]] == ["blueberry", "cherry"]
+
+        Fruit.objects.create(name="apple")
+        second = self.fetch_page(2, first["pageInfo"]["endCursor"], [{"name": "ASC"}])
+
+        assert [e["node"]["name"] for e in second["edges"]] == ["plum", "raspberry"]
+
+    def test_backwards_pagination(self) -> None:
+        """Test ``last``/``before`` walk towards the start of the list."""
+        query = """
+            query LastPage($before: String) {
+                fruitsConnection(last: 2, before: $before, ordering: [{name: ASC}]) {
+                    edges { node { name } }
+                    pageInfo { hasPreviousPage startCursor }
+                }
+            }
+        """
+        result = self.execute_query(query)
+        page = result["data"]["fruitsConnection"]
+        assert [e["node"]["name"] for e in page["edges"]] == ["raspberry", "strawberry"]
+        assert page["pageInfo"]["hasPreviousPage"] is True
+
+        result = self.execute_query(
+            query,
+            {"before": page["pageInfo"]["startCursor"]},
+        )
+        page = result["data"]["fruitsConnection"]
+        assert [e["node"]["name"] for e in page["edges"]] == ["cherry", "plum"]
+
+    def test_total_count_only_when_selected(
+        self,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test ``totalCount`` costs a COUNT query only when requested."""
+        with django_assert_num_queries(1):
+            self.execute_query("{ colorsConnection(first: 1) { edges { cursor } } }")
+
+        with django_assert_num_queries(2) as ctx:
+            result = self.execute_query(
+                "{ colorsConnection(first: 1) { totalCount edges { cursor } } }",
+            )
+
+        assert result["data"]["colorsConnection"]["totalCount"] == 2
+        assert "COUNT" in ctx.captured_queries[1]["sql"]
+
+    def test_filters_apply_to_connection(self) -> None:
+        """Test ``FruitFilter`` narrows the connection."""
+        query = """
+            query {
+                fruitsConnection(
+                    first: 10
+                    filters: {name: {endsWith: "berry"}, color: {name: {exact: "red"}}}
+                    ordering: [{name: ASC}]
+                ) {
+                    edges { node { name } }
+                }
+            }
+        """
+        result = self.execute_query(query)
+
+        edges = result["data"]["fruitsConnection"]["edges"]
+        assert [e["node"]["name"] for e in edges] == ["raspberry", "strawberry"]
+
+    def test_invalid_cursor(self) -> None:
+        """Test a malformed cursor is reported as an error."""
+        result = self.execute_query(
+            FRUITS_PAGE,
+            {"first": 2, "after": "not-a-cursor", "ordering": []},
+        )
+
+        assert "errors" in result
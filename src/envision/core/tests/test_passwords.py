@@ -0,0 +1,110 @@
+"""Tests for registering users with passwords hashed on a thread pool."""
+
+import json
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import (
+    CommonPasswordValidator,
+    get_default_password_validators,
+)
+from django.test import Client, override_settings
+
+from envision.core import passwords
+
+REGISTER = """
+    mutation ($input: UserInput!) {
+        register(data: $input) { username }
+    }
+"""
+
+
+@pytest.mark.django_db
+class TestRegister:
+    """Test cases for the ``register`` mutation."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client and GraphQL endpoint."""
+        self.client = Client()
+        self.graphql_url = request.param
+
+    def register(self, username: str, password: str) -> dict[str, Any]:
+        """Register ``username`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps(
+                {
+                    "query": REGISTER,
+                    "variables": {
+                        "input": {
+                            "username": username,
+                            "email": f"{username}@example.com",
+                            "password": password,
+                        }
+                    },
+                }
+            ),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_register(self, workers: int) -> None:
+        """Test the stored password checks, hashed on the pool or inline."""
+        with override_settings(GRAPHQL_PASSWORD_WORKERS=workers):
+            result = self.register("ada", "analytical-engine")
+
+        assert result["data"] == {"register": {"username": "ada"}}
+        user = get_user_model().objects.get(username="ada")
+        assert user.check_password("analytical-engine")
+
+    def test_common_password(self) -> None:
+        """Test validation still rejects common passwords."""
+        result = self.register("ada", "password123")
+
+        assert result["data"] is None
+        assert "too common" in result["errors"][0]["message"]
+        assert not get_user_model().objects.exists()
+
+    def test_pool_full(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test registrations are refused while every slot is taken."""
+        full = passwords.HashingPool(workers=1, queue=0)
+        monkeypatch.setattr(passwords, "_pool", full)
+        full.slots.acquire()
+
+        result = self.register("ada", "analytical-engine")
+        full.slots.release()
+
+        assert result["data"] is None
+        assert result["errors"][0]["extensions"]["code"] == "SERVICE_UNAVAILABLE"
+        assert not get_user_model().objects.exists()
+        assert self.register("ada", "analytical-engine")["data"] is not None
+
+
+class TestWords:
+    """Test cases for the preloaded common-password list."""
+
+    def test_contains(self) -> None:
+        """Test membership matches the words given."""
+        words = passwords.Words(["tulip", "apple", "mango"])
+
+        assert list(words) == ["apple", "mango", "tulip"]
+        assert len(words) == 3
+        assert "mango" in words
+        assert "kiwi" not in words
+        assert "zebra" not in words
+        assert 1 not in words
+
+    def test_preloaded(self) -> None:
+        """Test the validator's list was compacted when the app loaded."""
+        (validator,) = (
+            validator
+            for validator in get_default_password_validators()
+            if isinstance(validator, CommonPasswordValidator)
+        )
+
+        assert isinstance(validator.passwords, passwords.Words)
+        assert len(validator.passwords) > 10_000
+        assert "password" in validator.passwords
@@ -0,0 +1,158 @@
+"""Tests for automatic persisted queries."""
+
+import io
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from envision.core.documents import document_hash
+from envision.core.models import Fruit
+from envision.core.persisted_queries import persisted_query_store
+
+QUERY = "{ fruits { name } }"
+
+
+def persisted_query(sha256: str, version: int = 1) -> dict[str, Any]:
+    """Return the ``extensions`` payload for a persisted query."""
+    return {"persistedQuery": {"version": version, "sha256Hash": sha256}}
+
+
+@pytest.mark.django_db
+class TestPersistedQueries:
+    """Test cases for the APQ handshake on both endpoints."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> Iterator[None]:
+        """Set up test client, GraphQL endpoint and an empty store."""
+        self.client = Client()
+        self.graphql_url = request.param
+        persisted_query_store.cache.clear()
+        yield
+        persisted_query_store.cache.clear()
+
+    def post(self, payload: dict[str, Any]) -> Any:
+        """POST ``payload`` as JSON and return the response."""
+        return self.client.post(
+            self.graphql_url,
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_hash_miss(self) -> None:
+        """Test an unknown hash asks the client to send the document."""
+        response = self.post({"extensions": persisted_query(document_hash(QUERY))})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "data": None,
+            "errors": [
+                {
+                    "message": "PersistedQueryNotFound",
+                    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+                },
+            ],
+        }
+
+    def test_retry_registers_document(self, strawberry: Fruit) -> None:
+        """Test the hash alone works once the document has been sent."""
+        extensions = persisted_query(document_hash(QUERY))
+        first = self.post({"query": QUERY, "extensions": extensions}).json()
+        second = self.post({"extensions": extensions}).json()
+
+        assert first["data"] == second["data"] == {"fruits": [{"name": "strawberry"}]}
+        assert persisted_query_store.get(document_hash(QUERY)) == QUERY
+
+    def test_hash_only_get(self, strawberry: Fruit) -> None:
+        """Test registered documents can be fetched with a GET request."""
+        persisted_query_store.add(QUERY)
+        response = self.client.get(
+            self.graphql_url,
+            {"extensions": json.dumps(persisted_query(document_hash(QUERY)))},
+        )
+
+        assert response.json()["data"] == {"fruits": [{"name": "strawberry"}]}
+
+    def test_hash_mismatch(self) -> None:
+        """Test a document that does not match its hash is rejected."""
+        response = self.post(
+            {"query": QUERY, "extensions": persisted_query(document_hash("{ x }"))},
+        )
+
+        assert response.status_code == 400
+        assert persisted_query_store.get(document_hash("{ x }")) is None
+
+    def test_unsupported_version(self) -> None:
+        """Test only version 1 of the extension is accepted."""
+        response = self.post(
+            {"extensions": persisted_query(document_hash(QUERY), version=2)},
+        )
+
+        assert response.status_code == 400
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ALLOWLIST=True)
+    def test_allowlist(self, strawberry: Fruit) -> None:
+        """Test only registered documents run in allow-list mode."""
+        extensions = persisted_query(document_hash(QUERY))
+        not_allowed = [
+            {
+                "message": "PersistedQueryNotAllowed",
+                "extensions": {"code": "PERSISTED_QUERY_NOT_ALLOWED"},
+            },
+        ]
+
+        assert self.post({"query": QUERY}).json()["errors"] == not_allowed
+        assert self.post({"extensions": extensions}).json()["errors"] == not_allowed
+        assert (
+            self.post({"query": QUERY, "extensions": extensions}).json()["errors"]
+            == not_allowed
+        )
+        assert persisted_query_store.get(document_hash(QUERY)) is None
+
+        persisted_query_store.add(QUERY)
+        expected = {"fruits": [{"name": "strawberry"}]}
+        assert self.post({"query": QUERY}).json()["data"] == expected
+        assert self.post({"extensions": extensions}).json()["data"] == expected
+
+    def test_plain_queries_bypass_store(self, strawberry: Fruit) -> None:
+        """Test requests without the extension are not registered."""
+        result = self.post({"query": QUERY}).json()
+
+        assert result["data"] == {"fruits": [{"name": "strawberry"}]}
+        assert persisted_query_store.get(document_hash(QUERY)) is None
+
+
+class TestPersistedQueryStore:
+    """Test cases for PersistedQueryStore over different cache backends."""
+
+    def test_file_based_cache(self, tmp_path: Path) -> None:
+        """Test documents survive in a file-based cache."""
+        caches = {
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            "persisted_queries": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(tmp_path),
+            },
+        }
+        with override_settings(CACHES=caches):
+            sha256 = persisted_query_store.add(QUERY)
+
+            assert list(tmp_path.iterdir())
+            assert persisted_query_store.get(sha256) == QUERY
+
+    def test_register_queries_command(self, tmp_path: Path) -> None:
+        """Test the management command registers each file."""
+        path = tmp_path / "fruits.graphql"
+        path.write_text(QUERY)
+        stdout = io.StringIO()
+
+        call_command("register_queries", str(path), stdout=stdout)
+
+        sha256 = document_hash(QUERY)
+        assert stdout.getvalue() == f"{sha256}  {path}\n"
+        assert persisted_query_store.get(sha256) == QUERY
+        persisted_query_store.delete(sha256)
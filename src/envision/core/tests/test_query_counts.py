@@ -0,0 +1,124 @@
+"""Tests that GraphQL operations cost as many statements at any size."""
+
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from django.test import Client
+
+from envision.core.models import Color, Fruit
+from envision.core.tests.query_counts import Operation, QueryCounts, normalize
+
+OPERATIONS = {
+    "fruits": "query Fruits { fruits { id name color { id name } } }",
+    "colors": "query Colors { colors { name fruits { name color { name } } } }",
+    "connection": """
+        query FruitsPage {
+            fruitsConnection(first: 10, ordering: [{name: ASC}]) {
+                edges { node { name color { name } } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+    """,
+    "update": """
+        mutation Rename {
+            bulkUpdateColors(filters: {name: {startsWith: "color"}}, data: {}) {
+                name fruits { name }
+            }
+        }
+    """,
+}
+
+
+def seed(size: int) -> None:
+    """Top up to ``size`` colors, each with two fruits."""
+    for i in range(Color.objects.count(), size):
+        color = Color.objects.create(name=f"color{i}")
+        Fruit.objects.bulk_create(
+            Fruit(name=f"fruit{i}-{j}", color=color) for j in range(2)
+        )
+
+
+@pytest.mark.django_db
+class TestQueryScaling:
+    """Test cases for the statement count of operations as rows grow."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client and GraphQL endpoint."""
+        self.client = Client()
+        self.graphql_url = request.param
+
+    def execute_query(self, query: str) -> dict[str, Any]:
+        """Execute ``query`` and return the response data."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        result = response.json()
+        assert "errors" not in result
+        return result["data"]  # type: ignore[no-any-return]
+
+    @pytest.mark.parametrize("name", OPERATIONS)
+    def test_constant(
+        self,
+        name: str,
+        query_scaling: Callable[..., dict[int, list[int]]],
+    ) -> None:
+        """Test the operation runs a fixed number of statements."""
+        counts = query_scaling(lambda: self.execute_query(OPERATIONS[name]), seed)
+
+        assert all(count for count in counts.values())
+
+
+class TestNormalize:
+    """Test cases for SQL normalization in snapshots."""
+
+    @pytest.mark.parametrize(
+        ("sql", "expected"),
+        [
+            (
+                'SELECT "id" FROM "core_fruit"\n  WHERE "id" IN (%s, %s, %s)',
+                'SELECT "id" FROM "core_fruit" WHERE "id" IN (...)',
+            ),
+            (
+                'INSERT INTO "core_color" ("name") VALUES (%s), (%s), (%s)',
+                'INSERT INTO "core_color" ("name") VALUES (%s), ...',
+            ),
+            ('SAVEPOINT "s1407_x12"', 'SAVEPOINT "savepoint"'),
+            (
+                'SELECT "name" FROM "core_color" LIMIT 21',
+                'SELECT "name" FROM "core_color" LIMIT N',
+            ),
+        ],
+    )
+    def test_normalize(self, sql: str, expected: str) -> None:
+        """Test parameters, savepoints and limits are normalized."""
+        assert normalize(sql) == expected
+
+
+class TestMissingSnapshots:
+    """Test cases for tests that have no query count snapshot yet."""
+
+    def test_recorded(self, tmp_path: Path) -> None:
+        """Test ``--query-counts=record`` adds a new test's operations."""
+        plugin = QueryCounts(tmp_path / "query_counts.json", update=False, strict=False)
+        plugin.check("test_new", [Operation("Fruits", ["SELECT 1"])])
+
+        assert plugin.snapshots["test_new"][0]["count"] == 1
+        assert plugin.recorded == ["test_new"]
+        plugin.pytest_sessionfinish()
+        assert "test_new" in json.loads((tmp_path / "query_counts.json").read_text())
+
+    def test_fails_by_default(self, tmp_path: Path) -> None:
+        """Test a test without a snapshot fails and nothing is written."""
+        plugin = QueryCounts(tmp_path / "query_counts.json", update=False)
+
+        with pytest.raises(pytest.fail.Exception, match="No query count snapshot"):
+            plugin.check("test_new", [Operation("Fruits", ["SELECT 1"])])
+        assert not plugin.changed
+        plugin.pytest_sessionfinish()
+        assert not (tmp_path / "query_counts.json").exists()
@@ -0,0 +1,129 @@
+"""Tests for filters across to-many relations."""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import Client
+
+from envision.core.exporter import filter_queryset
+from envision.core.models import Color, Fruit
+
+CASES: list[tuple[str, Callable[[], QuerySet[Any]]]] = [
+    (
+        '{fruits: {name: {startsWith: "a"}, color: {}}}',
+        lambda: Color.objects.filter(fruits__name__startswith="a"),
+    ),
+    (
+        '{fruits: {search: "lime", color: {}}}',
+        lambda: Color.objects.filter(fruits__name="lime"),
+    ),
+    (
+        '{NOT: {fruits: {name: {exact: "apple"}, color: {}}}}',
+        lambda: Color.objects.exclude(fruits__name="apple"),
+    ),
+    (
+        '{fruits: {name: {exact: "lime"}, color: {}}, '
+        'OR: {fruits: {name: {exact: "avocado"}, color: {}}}}',
+        lambda: Color.objects.filter(fruits__name__in=["lime", "avocado"]),
+    ),
+    (
+        '{name: {exact: "red"}, fruits: {name: {exact: "lime"}, color: {}}}',
+        lambda: Color.objects.none(),
+    ),
+]
+
+
+@pytest.mark.django_db
+class TestToManyFilters:
+    """Test cases for ``ColorFilter.fruits``."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> None:
+        """Set up test client, GraphQL endpoint and colors with many fruits."""
+        self.client = Client()
+        self.graphql_url = request.param
+        red, green, _ = Color.objects.bulk_create(
+            Color(name=name) for name in ["red", "green", "blue"]
+        )
+        Fruit.objects.bulk_create(
+            [
+                *(Fruit(name=name, color=red) for name in ["apple", "avocado"] * 5),
+                Fruit(name="lime", color=green),
+                Fruit(name="apple", color=green),
+            ]
+        )
+
+    def execute_query(self, query: str) -> dict[str, Any]:
+        """Execute ``query`` and return the response data."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        return result["data"]  # type: ignore[no-any-return]
+
+    def colors(self, filters: str) -> list[str]:
+        """Return the names of the colors matching ``filters``."""
+        data = self.execute_query(f"{{ colors(filters: {filters}) {{ name }} }}")
+        return [color["name"] for color in data["colors"]]
+
+    @pytest.mark.parametrize(
+        ("filters", "expected"),
+        CASES,
+        ids=["lookup", "search", "not", "or", "and"],
+    )
+    def test_equivalent(
+        self,
+        filters: str,
+        expected: Callable[[], QuerySet[Any]],
+    ) -> None:
+        """Test results match the distinct rows of the equivalent join."""
+        reference = expected().distinct().order_by("pk")
+
+        assert self.colors(filters) == [color.name for color in reference]
+
+    def test_exists_subquery(self) -> None:
+        """Test the relation is filtered without a join or ``DISTINCT``."""
+        statements: list[str] = []
+
+        def record(execute: Callable[..., Any], sql: str, *args: Any) -> Any:
+            statements.append(sql)
+            return execute(sql, *args)
+
+        with connection.execute_wrapper(record):
+            assert self.colors('{fruits: {name: {exact: "apple"}, color: {}}}') == [
+                "red",
+                "green",
+            ]
+            self.colors('{fruits: {name: {exact: "lime"}, color: {}}}')
+
+        select, same_shape = [s for s in statements if "core_color" in s]
+        assert "EXISTS" in select
+        assert "JOIN" not in select
+        assert "DISTINCT" not in select
+        # Filter values are parameters, not part of the SQL text.
+        assert same_shape == select
+
+    def test_nested(self) -> None:
+        """Test a to-many filter under a to-one relation."""
+        query = """{
+            fruits(filters: {color: {fruits: {name: {exact: "lime"}, color: {}}}}) {
+                name
+            }
+        }"""
+        names = [fruit["name"] for fruit in self.execute_query(query)["fruits"]]
+
+        assert names == ["lime", "apple"]
+
+
+def test_export(red_color: Color, blue_color: Color, strawberry: Fruit) -> None:
+    """Test the filter also applies outside GraphQL, to exports."""
+    filters = {"fruits": {"name": {"exact": "strawberry"}, "color": {}}}
+
+    assert list(filter_queryset(Color, filters)) == [red_color]
@@ -0,0 +1,231 @@
+"""Tests for the tag-invalidated response cache."""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, override_settings
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.models import Color, Fruit
+from envision.core.response_cache import response_cache
+
+CREATE_FRUIT = """
+    mutation CreateFruit($input: FruitInput!) {
+        createFruit(data: $input) { name }
+    }
+"""
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """Test cases for caching query responses."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> Iterator[None]:
+        """Set up test client, GraphQL endpoint and an empty cache."""
+        self.client = Client()
+        self.graphql_url = request.param
+        cache.clear()
+        response_cache.reset()
+        with override_settings(GRAPHQL_RESPONSE_CACHE="default"):
+            yield
+
+    def execute_query(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def test_repeated_query_is_served_from_cache(
+        self,
+        strawberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test the second identical query runs no SQL."""
+        first = self.execute_query("{ fruits { name color { name } } }")
+        with django_assert_num_queries(0):
+            second = self.execute_query("{ fruits { name color { name } } }")
+
+        assert first["data"] == second["data"]
+        info = response_cache.info()
+        assert (info.hits, info.misses, info.hit_ratio) == (1, 1, 0.5)
+
+    def test_document_is_normalized(self, strawberry: Fruit) -> None:
+        """Test formatting differences share one entry."""
+        self.execute_query("{ fruits { name } }")
+        self.execute_query("""
+            # Same selection, other layout.
+            {
+                fruits {
+                    name
+                }
+            }
+        """)
+
+        assert response_cache.info().hits == 1
+
+    def test_variables_are_part_of_the_key(self, red_color: Color) -> None:
+        """Test different variables are cached separately."""
+        query = "query GetColor($pk: ID!) { color(pk: $pk) { name } }"
+        blue = Color.objects.create(name="blue")
+
+        red_result = self.execute_query(query, {"pk": red_color.pk})
+        blue_result = self.execute_query(query, {"pk": blue.pk})
+
+        assert red_result["data"] == {"color": {"name": "red"}}
+        assert blue_result["data"] == {"color": {"name": "blue"}}
+        assert response_cache.info().hits == 0
+
+    def test_mutation_invalidates_tagged_responses(self, red_color: Color) -> None:
+        """Test creating a fruit drops cached fruit lists."""
+        assert self.execute_query("{ fruits { name } }")["data"] == {"fruits": []}
+
+        self.execute_query(
+            CREATE_FRUIT,
+            {"input": {"name": "apple", "color": {"set": red_color.pk}}},
+        )
+        result = self.execute_query("{ fruits { name } }")
+
+        assert result["data"] == {"fruits": [{"name": "apple"}]}
+        assert response_cache.info().invalidations >= 1
+        assert response_cache.info().hits == 0
+
+    def test_other_models_keep_their_responses(
+        self,
+        red_color: Color,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test saving a fruit keeps responses that only select colors."""
+        self.execute_query("{ colors { name } }")
+        Fruit.objects.create(name="apple", color=red_color)
+
+        with django_assert_num_queries(0):
+            self.execute_query("{ colors { name } }")
+
+        assert response_cache.info().hits == 1
+
+    def test_nested_models_are_tagged(self, red_color: Color) -> None:
+        """Test a color query selecting fruits is invalidated by fruits."""
+        self.execute_query("{ colors { fruits { name } } }")
+        Fruit.objects.create(name="apple", color=red_color)
+        result = self.execute_query("{ colors { fruits { name } } }")
+
+        assert result["data"]["colors"] == [{"fruits": [{"name": "apple"}]}]
+
+    def test_responses_are_per_user(
+        self,
+        strawberry: Fruit,
+        user: User,
+    ) -> None:
+        """Test a signed-in user does not share the anonymous entry."""
+        self.execute_query("{ fruits { name } }")
+        self.client.force_login(user)
+        self.execute_query("{ fruits { name } }")
+
+        info = response_cache.info()
+        assert (info.hits, info.misses) == (0, 2)
+
+    def test_errors_are_not_cached(self) -> None:
+        """Test failed queries are executed again."""
+        query = "{ fruit(pk: 0) { name } }"
+        self.execute_query(query)
+        result = self.execute_query(query)
+
+        assert "errors" in result
+        assert response_cache.info().hits == 0
+
+    def test_mutations_are_not_cached(self, red_color: Color) -> None:
+        """Test mutations always execute."""
+        for name in ["apple", "cherry"]:
+            self.execute_query(
+                CREATE_FRUIT,
+                {"input": {"name": name, "color": {"set": red_color.pk}}},
+            )
+
+        assert Fruit.objects.count() == 2
+        assert response_cache.info().misses == 0
+
+    @override_settings(GRAPHQL_RESPONSE_CACHE=None)
+    def test_disabled(
+        self,
+        strawberry: Fruit,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test nothing is cached unless a cache alias is configured."""
+        self.execute_query("{ fruits { name } }")
+        with django_assert_num_queries(1):
+            self.execute_query("{ fruits { name } }")
+
+    def test_counts_are_tagged_with_the_counted_model(self, red_color: Color) -> None:
+        """Test a cached ``fruitCount`` is recounted once a fruit is created."""
+        assert self.execute_query("{ colors { fruitCount } }")["data"] == {
+            "colors": [{"fruitCount": 0}],
+        }
+        Fruit.objects.create(name="apple", color=red_color)
+        result = self.execute_query("{ colors { fruitCount } }")
+
+        assert result["data"] == {"colors": [{"fruitCount": 1}]}
+
+    def test_filter_models_are_tagged(self, red_color: Color) -> None:
+        """Test a color list filtered by fruits is invalidated by fruits."""
+        query = """
+            { colors(filters: {fruits: {name: {exact: "apple"}, color: {}}}) { id } }
+        """
+        assert self.execute_query(query)["data"] == {"colors": []}
+        Fruit.objects.create(name="apple", color=red_color)
+        result = self.execute_query(query)
+
+        assert result["data"] == {"colors": [{"id": str(red_color.pk)}]}
+
+    def test_filter_variables_are_tagged(self, red_color: Color) -> None:
+        """Test a filter passed as a variable tags the models it can reach."""
+        query = "query Colors($f: ColorFilter) { colors(filters: $f) { id } }"
+        variables = {"f": {"fruits": {"name": {"exact": "apple"}, "color": {}}}}
+        assert self.execute_query(query, variables)["data"] == {"colors": []}
+        Fruit.objects.create(name="apple", color=red_color)
+        result = self.execute_query(query, variables)
+
+        assert result["data"] == {"colors": [{"id": str(red_color.pk)}]}
+
+    def test_ordering_models_are_tagged(
+        self,
+        strawberry: Fruit,
+        blueberry: Fruit,
+        blue_color: Color,
+    ) -> None:
+        """Test fruits ordered by color name are reordered on a rename."""
+        query = "{ fruits(ordering: [{color: {name: ASC}}]) { name } }"
+        first = self.execute_query(query)["data"]["fruits"]
+        blue_color.name = "yellow"
+        blue_color.save()
+        second = self.execute_query(query)["data"]["fruits"]
+
+        assert [f["name"] for f in first] == ["blueberry", "strawberry"]
+        assert [f["name"] for f in second] == ["strawberry", "blueberry"]
+
+    def test_bulk_created_fruits_recount(self, red_color: Color) -> None:
+        """Test a cached ``fruitCount`` is recounted after ``bulkCreateFruits``."""
+        query = "{ colors { fruitCount } }"
+        assert self.execute_query(query)["data"] == {"colors": [{"fruitCount": 0}]}
+        self.execute_query(
+            """
+            mutation Create($input: [FruitInput!]!) {
+                bulkCreateFruits(data: $input) { name }
+            }
+            """,
+            {"input": [{"name": "apple", "color": {"set": red_color.pk}}]},
+        )
+        result = self.execute_query(query)
+
+        assert result["data"] == {"colors": [{"fruitCount": 1}]}
@@ -0,0 +1,96 @@
+"""Tests for reading GraphQL queries from a replica database."""
+
+import json
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+from django.test import Client, override_settings
+
+from envision.core.models import Color, Fruit
+
+FRUITS = "{ fruits(filters: {color: {}}) { name color { name } } }"
+CREATE_COLOR = 'mutation { createColor(data: {name: "green"}) { name } }'
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+class TestReplica:
+    """Test cases for query operations routed to ``replica``."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(
+        self,
+        request: pytest.FixtureRequest,
+        strawberry: Fruit,
+        sync_replica: Callable[[], None],
+    ) -> Iterator[None]:
+        """Set up a replica one rename behind the primary."""
+        self.client = Client()
+        self.graphql_url = request.param
+        sync_replica()
+        Fruit.objects.filter(pk=strawberry.pk).update(name="fresh strawberry")
+        with override_settings(GRAPHQL_READ_DATABASES=["replica"]):
+            yield
+
+    def post(self, query: Any) -> Any:
+        """Post ``query`` and return the decoded response."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps(query),
+            content_type="application/json",
+        )
+        return response.json()
+
+    def names(self) -> list[str]:
+        """Return the fruit names a query reads."""
+        result = self.post({"query": FRUITS})
+        assert "errors" not in result, result["errors"]
+        return [fruit["name"] for fruit in result["data"]["fruits"]]
+
+    def test_query(self) -> None:
+        """Test queries read from the replica."""
+        assert self.names() == ["strawberry"]
+
+    def test_disabled(self) -> None:
+        """Test queries read from the primary without read databases."""
+        with override_settings(GRAPHQL_READ_DATABASES=[]):
+            assert self.names() == ["fresh strawberry"]
+
+    def test_mutation(self) -> None:
+        """Test mutations write to the primary and pin the client to it."""
+        result = self.post({"query": CREATE_COLOR})
+
+        assert result["data"] == {"createColor": {"name": "green"}}
+        assert Color.objects.using("default").filter(name="green").exists()
+        assert not Color.objects.using("replica").filter(name="green").exists()
+        assert self.names() == ["fresh strawberry"]
+
+        del self.client.cookies["pin-primary"]
+        assert self.names() == ["strawberry"]
+
+    @override_settings(GRAPHQL_PIN_PRIMARY_SECONDS=0)
+    def test_pin_request_only(self) -> None:
+        """Test a zero pin window leaves later requests on the replica."""
+        self.post({"query": CREATE_COLOR})
+
+        assert "pin-primary" not in self.client.cookies
+        assert self.names() == ["strawberry"]
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+@override_settings(GRAPHQL_READ_DATABASES=["replica"])
+def test_batch_pinned_after_mutation(
+    strawberry: Fruit, sync_replica: Callable[[], None]
+) -> None:
+    """Test a batch reads from the primary once its mutation has run."""
+    sync_replica()
+    Fruit.objects.filter(pk=strawberry.pk).update(name="fresh strawberry")
+
+    response = Client().post(
+        "/graphql/sync",
+        data=json.dumps([{"query": CREATE_COLOR}, {"query": FRUITS}]),
+        content_type="application/json",
+    )
+
+    _, result = response.json()
+    assert result["data"]["fruits"][0]["name"] == "fresh strawberry"
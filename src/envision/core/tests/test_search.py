@@ -0,0 +1,136 @@
+"""Tests for name indexes and the full-text ``search`` filter."""
+
+import json
+from typing import Any
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from envision.core.models import Color, Fruit
+
+FRUITS = """
+    query Fruits($search: String!) {
+        fruits(filters: {search: $search, color: {}}) { name }
+    }
+"""
+
+
+@pytest.mark.django_db
+class TestSearch:
+    """Test cases for ``FruitFilter.search`` and ``ColorFilter.search``."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest, red_color: Color) -> None:
+        """Set up test client, GraphQL endpoint and a few fruits."""
+        self.client = Client()
+        self.graphql_url = request.param
+        Fruit.objects.bulk_create(
+            Fruit(name=name, color=red_color)
+            for name in ["red apple", "pineapple", "apple", "Äpfel"]
+        )
+
+    def execute_query(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Execute ``query`` and return the response data."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query, "variables": variables or {}}),
+            content_type="application/json",
+        )
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        return result["data"]  # type: ignore[no-any-return]
+
+    def search(self, value: str) -> list[str]:
+        """Return the names of the fruits matching ``value``, in order."""
+        fruits = self.execute_query(FRUITS, {"search": value})["fruits"]
+        return [fruit["name"] for fruit in fruits]
+
+    def test_ranked_word_prefixes(self) -> None:
+        """Test words match as prefixes and closer matches come first."""
+        assert self.search("app") == ["apple", "red apple"]
+        assert self.search("APPLE red") == ["red apple"]
+        assert self.search("apfel") == ["Äpfel"]
+
+    @pytest.mark.parametrize(
+        "value",
+        ["", "  ", '"', "app* OR (", "NEAR("],
+        ids=["empty", "blank", "quote", "operators", "near"],
+    )
+    def test_query_syntax_is_not_interpreted(self, value: str) -> None:
+        """Test operators and quotes in the value are matched as text."""
+        assert self.search(value) == []
+
+    def test_kept_in_sync(self) -> None:
+        """Test saves, bulk updates and deletes reach the search table."""
+        Fruit.objects.filter(name="pineapple").update(name="ananas")
+        Fruit.objects.filter(name="apple").delete()
+        Fruit.objects.create(name="apple pie")
+
+        assert self.search("apple") == ["red apple", "apple pie"]
+        assert self.search("ananas") == ["ananas"]
+
+    def test_ordering_overrides_rank(self) -> None:
+        """Test an ``ordering`` argument replaces the rank order."""
+        query = """{
+            fruits(filters: {search: "app", color: {}}, ordering: [{name: DESC}]) {
+                name
+            }
+        }"""
+        fruits = self.execute_query(query)["fruits"]
+
+        assert [fruit["name"] for fruit in fruits] == ["red apple", "apple"]
+
+    def test_rank_is_joined_once(self) -> None:
+        """Test ranks come from one joined query, not a subquery per row."""
+        with CaptureQueriesContext(connection) as queries:
+            self.search("apple")
+
+        (sql,) = [q["sql"] for q in queries if "core_fruit_fts" in q["sql"]]
+        assert sql.count("bm25(") == 1
+        assert "LEFT OUTER JOIN (SELECT rowid, bm25(" in sql
+
+    def test_or_keeps_other_rows(self) -> None:
+        """Test a search under ``OR`` keeps the rows the other branch matches."""
+        query = """{
+            fruits(filters: {
+                search: "pine", color: {}, OR: {name: {exact: "Äpfel"}, color: {}}
+            }) { name }
+        }"""
+        fruits = self.execute_query(query)["fruits"]
+
+        assert sorted(fruit["name"] for fruit in fruits) == ["pineapple", "Äpfel"]
+
+    def test_with_counts(self) -> None:
+        """Test ranked colors can be annotated with their fruit count."""
+        query = '{ colors(filters: {search: "red"}) { name fruitCount } }'
+
+        assert self.execute_query(query)["colors"] == [
+            {"name": "red", "fruitCount": 4},
+        ]
+
+    def test_nested(self, blue_color: Color) -> None:
+        """Test searching a relation filters by the related rows."""
+        Fruit.objects.create(name="blueberry", color=blue_color)
+        query = """{
+            colors(filters: {fruits: {search: "blue", color: {}}}) { name }
+            fruits(filters: {color: {search: "RED"}}) { name }
+        }"""
+        data = self.execute_query(query)
+
+        assert data["colors"] == [{"name": "blue"}]
+        assert len(data["fruits"]) == 4
+
+
+def test_indexes(db: None) -> None:
+    """Test name lookups and the color relation are indexed."""
+    with connection.cursor() as cursor:
+        fruit = connection.introspection.get_constraints(cursor, "core_fruit")
+        color = connection.introspection.get_constraints(cursor, "core_color")
+
+    assert fruit["core_fruit_name_idx"]["columns"] == ["name"]
+    assert fruit["core_fruit_color_name_idx"]["columns"] == ["color_id", "name"]
+    assert color["core_color_name_idx"]["columns"] == ["name"]
@@ -0,0 +1,106 @@
+"""Tests for sessions and users under the base and API-only settings."""
+
+import json
+from collections.abc import Iterator
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import global_settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from envision.core.middleware import LazyUserMiddleware
+from envision.settings import api, base
+
+PROFILES = {
+    "base": {
+        "SESSION_ENGINE": global_settings.SESSION_ENGINE,
+        "MIDDLEWARE": base.MIDDLEWARE,
+    },
+    "api": {"SESSION_ENGINE": api.SESSION_ENGINE, "MIDDLEWARE": api.MIDDLEWARE},
+}
+
+# The response cache keys on the user, so this query reads it.
+COLORS = json.dumps({"query": "{ colors { name } }"})
+
+
+def lookups(queries: CaptureQueriesContext, table: str) -> int:
+    """Return how many of ``queries`` read ``table``."""
+    return sum(f'"{table}"' in query["sql"] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+class TestRequests:
+    """Test cases for the queries sessions add to GraphQL requests."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> Iterator[None]:
+        """Set up test client, GraphQL endpoint and the response cache."""
+        self.client = Client()
+        self.graphql_url = request.param
+        cache.clear()
+        with override_settings(GRAPHQL_RESPONSE_CACHE="default"):
+            yield
+
+    @pytest.fixture(params=list(PROFILES))
+    def profile(self, request: pytest.FixtureRequest) -> Iterator[str]:
+        """Use the session settings of the base or the API profile."""
+        with override_settings(**PROFILES[request.param]):
+            yield request.param
+
+    def queries(self) -> tuple[int, int]:
+        """Return the session and user queries of a cached query."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.graphql_url, data=COLORS, content_type="application/json"
+            )
+        assert response.json()["data"] == {"colors": []}
+        return lookups(queries, "django_session"), lookups(queries, "auth_user")
+
+    def test_anonymous(self, profile: str) -> None:
+        """Test only database sessions look up a stale cookie."""
+        assert self.queries() == (0, 0)
+
+        self.client.cookies["sessionid"] = "stale" * 8
+        assert self.queries() == ((1, 0) if profile == "base" else (0, 0))
+
+    def test_signed_in(self, profile: str, user: User) -> None:
+        """Test signed-cookie sessions leave only the user lookup."""
+        self.client.force_login(user)
+
+        assert self.queries() == ((1, 1) if profile == "base" else (0, 1))
+
+
+@pytest.mark.django_db
+@override_settings(SESSION_ENGINE=api.SESSION_ENGINE)
+@pytest.mark.parametrize(
+    ("middleware", "expected"),
+    [(AuthenticationMiddleware, 2), (LazyUserMiddleware, 1)],
+)
+def test_user_loaded_once(
+    user: User,
+    middleware: type[AuthenticationMiddleware],
+    expected: int,
+) -> None:
+    """Test ``request.user`` and ``request.auser()`` share one lookup."""
+    client = Client()
+    client.force_login(user)
+    request = RequestFactory().get("/")
+    request.COOKIES = {name: morsel.value for name, morsel in client.cookies.items()}
+
+    def view(request: HttpRequest) -> HttpResponse:
+        return HttpResponse()
+
+    SessionMiddleware(view).process_request(request)
+    middleware(view).process_request(request)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert request.user.pk == user.pk
+        assert async_to_sync(request.auser)().pk == user.pk
+    assert lookups(queries, "auth_user") == expected
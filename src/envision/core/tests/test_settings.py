@@ -0,0 +1,81 @@
+"""Tests for the production settings profile."""
+
+import importlib
+from collections.abc import Iterator
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import ConnectionHandler
+
+
+@pytest.fixture
+def production(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    """Import ``envision.settings.production`` with its environment set."""
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "production-secret")
+    monkeypatch.setenv("DJANGO_ALLOWED_HOSTS", "example.com,api.example.com")
+    return importlib.reload(importlib.import_module("envision.settings.production"))
+
+
+class TestProduction:
+    """Test cases for ``envision.settings.production``."""
+
+    @pytest.fixture
+    def connections(
+        self,
+        production: ModuleType,
+        tmp_path: Path,
+        django_db_blocker: Any,
+    ) -> Iterator[ConnectionHandler]:
+        """Return connections to a file database with the production options."""
+        database = {**production.DATABASES["default"], "NAME": tmp_path / "db.sqlite3"}
+        handler = ConnectionHandler({"default": database})
+        with django_db_blocker.unblock():
+            yield handler
+            handler.close_all()
+
+    def test_environment(self, production: ModuleType) -> None:
+        """Test debugging is off and secrets come from the environment."""
+        assert production.DEBUG is False
+        assert production.SECRET_KEY == "production-secret"
+        assert production.ALLOWED_HOSTS == ["example.com", "api.example.com"]
+
+    def test_missing_secret_key(
+        self,
+        production: ModuleType,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a missing secret key names the variable to set."""
+        monkeypatch.delenv("DJANGO_SECRET_KEY")
+
+        with pytest.raises(ImproperlyConfigured, match="DJANGO_SECRET_KEY"):
+            importlib.reload(production)
+
+    def test_persistent_connections(self, production: ModuleType) -> None:
+        """Test every database keeps checked connections open."""
+        for database in production.DATABASES.values():
+            assert database["CONN_MAX_AGE"] > 0
+            assert database["CONN_HEALTH_CHECKS"] is True
+
+    def test_pragmas(self, connections: ConnectionHandler) -> None:
+        """Test new connections are configured by ``SQLITE_PRAGMAS``."""
+        with connections["default"].cursor() as cursor:
+            pragmas = {}
+            for name in ["journal_mode", "synchronous", "mmap_size", "busy_timeout"]:
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+
+        assert pragmas == {
+            "journal_mode": "wal",
+            "synchronous": 1,
+            "mmap_size": 256 * 2**20,
+            "busy_timeout": 5_000,
+        }
+
+    def test_cached_templates(self, production: ModuleType) -> None:
+        """Test templates are loaded through the cached loader."""
+        ((loader, _),) = production.TEMPLATES[0]["OPTIONS"]["loaders"]
+
+        assert loader == "django.template.loaders.cached.Loader"
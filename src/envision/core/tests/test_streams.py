@@ -0,0 +1,287 @@
+"""Tests for ``@stream`` lists sent in multipart responses."""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient, Client, override_settings
+from pytest_django import DjangoAssertNumQueries
+
+from envision.core.models import Fruit
+
+STREAM = """
+    query ($initialCount: Int!, $stream: Boolean! = true) {
+        fruits(filters: {color: {}})
+        @stream(initialCount: $initialCount, label: "fruits", if: $stream) {
+            name
+            color { name }
+        }
+    }
+"""
+
+
+def parse_parts(body: bytes) -> list[dict[str, Any]]:
+    """Return the JSON payloads of a ``multipart/mixed; boundary="-"`` body."""
+    payloads = []
+    for part in body.decode().split("\r\n---"):
+        _, separator, content = part.partition("\r\n\r\n")
+        if separator:
+            payloads.append(json.loads(content))
+    return payloads
+
+
+@pytest.mark.django_db
+class TestStream:
+    """Test cases for incremental delivery on the async endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def setup(
+        self,
+        strawberry: Fruit,
+        raspberry: Fruit,
+        blueberry: Fruit,
+    ) -> Iterator[None]:
+        """Set up three fruits, streamed two at a time."""
+        with override_settings(GRAPHQL_STREAM_CHUNK_SIZE=2):
+            yield
+
+    def post(
+        self,
+        query: str,
+        variables: dict[str, Any],
+        accept: str = "multipart/mixed",
+    ) -> tuple[str, bytes]:
+        """Post ``query`` to the async endpoint; return content type and body."""
+
+        async def fetch() -> tuple[str, bytes]:
+            response = await AsyncClient().post(
+                "/graphql",
+                data=json.dumps({"query": query, "variables": variables}),
+                content_type="application/json",
+                headers={"accept": accept},
+            )
+            if not isinstance(response, StreamingHttpResponse):
+                return response["Content-Type"], response.content
+            chunks = [chunk async for chunk in response.streaming_content]
+            return response["Content-Type"], b"".join(chunks)
+
+        return async_to_sync(fetch)()
+
+    def test_stream(self) -> None:
+        """Test rows past ``initialCount`` arrive in later payloads."""
+        content_type, body = self.post(STREAM, {"initialCount": 1})
+
+        assert content_type == 'multipart/mixed; boundary="-"'
+        assert body.endswith(b"\r\n-----\r\n")
+        initial, *subsequent = parse_parts(body)
+        assert initial["data"] == {
+            "fruits": [{"name": "strawberry", "color": {"name": "red"}}],
+        }
+        assert initial["pending"] == [
+            {"id": "0", "path": ["fruits"], "label": "fruits"}
+        ]
+        assert initial["hasNext"] is True
+        assert subsequent == [
+            {
+                "incremental": [
+                    {
+                        "id": "0",
+                        "items": [
+                            {"name": "raspberry", "color": {"name": "red"}},
+                            {"name": "blueberry", "color": {"name": "blue"}},
+                        ],
+                    }
+                ],
+                "hasNext": True,
+            },
+            {"completed": [{"id": "0"}], "hasNext": False},
+        ]
+
+    def test_initial_rows_only(self) -> None:
+        """Test a stream with no rows left is completed in one payload."""
+        _, body = self.post(STREAM, {"initialCount": 5})
+
+        initial, final = parse_parts(body)
+        assert len(initial["data"]["fruits"]) == 3
+        assert final == {"completed": [{"id": "0"}], "hasNext": False}
+
+    @pytest.mark.parametrize(
+        ("variables", "accept"),
+        [
+            ({"initialCount": 1}, "application/json"),
+            ({"initialCount": 1, "stream": False}, "multipart/mixed"),
+        ],
+    )
+    def test_not_streamed(self, variables: dict[str, Any], accept: str) -> None:
+        """Test the whole list is sent as JSON unless streaming applies."""
+        content_type, body = self.post(STREAM, variables, accept)
+
+        assert content_type == "application/json"
+        assert len(json.loads(body)["data"]["fruits"]) == 3
+
+    def test_nested_stream(
+        self,
+        django_assert_num_queries: DjangoAssertNumQueries,
+    ) -> None:
+        """Test relation lists send their first rows, then stream per parent."""
+        query = "{ colors { name fruits @stream(initialCount: 1) { name } } }"
+        # Colors and the first fruits of each, then the rest of each color.
+        with django_assert_num_queries(4):
+            _, body = self.post(query, {})
+
+        initial, *subsequent = parse_parts(body)
+        assert initial["data"] == {
+            "colors": [
+                {"name": "red", "fruits": [{"name": "strawberry"}]},
+                {"name": "blue", "fruits": [{"name": "blueberry"}]},
+            ],
+        }
+        assert initial["pending"] == [
+            {"id": "0", "path": ["colors", 0, "fruits"]},
+            {"id": "1", "path": ["colors", 1, "fruits"]},
+        ]
+        assert subsequent == [
+            {
+                "incremental": [{"id": "0", "items": [{"name": "raspberry"}]}],
+                "completed": [{"id": "0"}],
+                "hasNext": True,
+            },
+            {"completed": [{"id": "1"}], "hasNext": False},
+        ]
+
+    def test_stream_in_stream(self) -> None:
+        """Test streams of rows sent later are announced when they are sent."""
+        query = """{
+            colors @stream(initialCount: 0) {
+                fruits @stream(initialCount: 0) { name }
+            }
+        }"""
+        _, body = self.post(query, {})
+
+        initial, *subsequent = parse_parts(body)
+        assert initial["data"] == {"colors": []}
+        assert initial["pending"] == [{"id": "0", "path": ["colors"]}]
+        assert subsequent[0] == {
+            "incremental": [{"id": "0", "items": [{"fruits": []}, {"fruits": []}]}],
+            "pending": [
+                {"id": "1", "path": ["colors", 0, "fruits"]},
+                {"id": "2", "path": ["colors", 1, "fruits"]},
+            ],
+            "hasNext": True,
+        }
+        assert subsequent[1:] == [
+            {"completed": [{"id": "0"}], "hasNext": True},
+            {
+                "incremental": [
+                    {
+                        "id": "1",
+                        "items": [{"name": "strawberry"}, {"name": "raspberry"}],
+                    }
+                ],
+                "hasNext": True,
+            },
+            {"completed": [{"id": "1"}], "hasNext": True},
+            {
+                "incremental": [{"id": "2", "items": [{"name": "blueberry"}]}],
+                "completed": [{"id": "2"}],
+                "hasNext": False,
+            },
+        ]
+
+    def test_defer(self) -> None:
+        """Test deferred fragments are sent after the data holding them."""
+        query = """{
+            colors(filters: {name: {exact: "blue"}}) {
+                name
+                ... @defer(label: "fruits") { fruits { name } }
+            }
+            ... @defer { fruitCount: fruits(filters: {color: {}}) { id } }
+        }"""
+        _, body = self.post(query, {})
+
+        initial, *subsequent = parse_parts(body)
+        assert initial["data"] == {"colors": [{"name": "blue"}]}
+        assert initial["pending"] == [
+            {"id": "0", "path": []},
+            {"id": "1", "path": ["colors", 0], "label": "fruits"},
+        ]
+        assert subsequent[0]["incremental"][0]["id"] == "0"
+        assert len(subsequent[0]["incremental"][0]["data"]["fruitCount"]) == 3
+        assert subsequent[1] == {
+            "incremental": [{"id": "1", "data": {"fruits": [{"name": "blueberry"}]}}],
+            "completed": [{"id": "1"}],
+            "hasNext": False,
+        }
+
+    def test_negative_initial_count(self) -> None:
+        """Test ``initialCount`` below zero is an error."""
+        _, body = self.post(STREAM, {"initialCount": -1})
+
+        result = json.loads(body)
+        assert result["data"] is None
+        assert result["errors"][0]["message"] == (
+            "initialCount must be a positive integer"
+        )
+
+
+@pytest.mark.django_db
+class TestDirectives:
+    """Test cases for documents using ``@stream`` and ``@defer`` over JSON."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest, strawberry: Fruit) -> None:
+        """Set up test client, GraphQL endpoint and a fruit."""
+        self.client = Client()
+        self.graphql_url = request.param
+
+    def test_inline(self) -> None:
+        """Test both directives are accepted and resolved inline."""
+        query = """{
+            fruits(filters: {color: {}}) @stream(initialCount: 0) {
+                name
+                ... @defer(label: "color") { color { name } }
+            }
+        }"""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        assert result["data"] == {
+            "fruits": [{"name": "strawberry", "color": {"name": "red"}}],
+        }
+
+    def test_nested_inline(self) -> None:
+        """Test relation lists marked ``@stream`` are sent whole over JSON."""
+        query = "{ colors { fruits @stream(initialCount: 0) { name } } }"
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+
+        result = response.json()
+        assert "errors" not in result, result["errors"]
+        assert result["data"] == {"colors": [{"fruits": [{"name": "strawberry"}]}]}
+
+    def test_not_streamable(self) -> None:
+        """Test ``@stream`` on other lists is rejected instead of ignored."""
+        query = "{ fruitsPage { results @stream(initialCount: 1) { name } } }"
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+        )
+
+        result = response.json()
+        assert result.get("data") is None
+        assert [error["message"] for error in result["errors"]] == [
+            "@stream is only supported on lists of rows, not on "
+            "'FruitOffsetPaginated.results'.",
+        ]
@@ -0,0 +1,118 @@
+"""Tests for per-phase, per-resolver and SQL tracing."""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from strawberry_django.optimizer import DjangoOptimizerExtension
+
+from envision.core.metrics import registry
+from envision.core.models import Fruit
+
+QUERY = "{ colors { name fruits { name } } }"
+OPERATION = (("operation_name", "anonymous"), ("operation_type", "query"))
+
+
+@pytest.mark.django_db
+class TestTracingExtension:
+    """Test cases for ``extensions.tracing`` and the sampled metrics."""
+
+    @pytest.fixture(autouse=True, params=["/graphql", "/graphql/sync"])
+    def setup(self, request: pytest.FixtureRequest) -> Iterator[None]:
+        """Set up test client, GraphQL endpoint and empty histograms."""
+        self.client = Client()
+        self.graphql_url = request.param
+        registry.reset()
+        with override_settings(DEBUG=True):
+            yield
+
+    def execute_query(self, query: str, *, trace: bool = True) -> dict[str, Any]:
+        """Execute ``query``, asking for a trace unless ``trace`` is false."""
+        response = self.client.post(
+            self.graphql_url,
+            data=json.dumps({"query": query}),
+            content_type="application/json",
+            headers={"X-GraphQL-Trace": "1"} if trace else {},
+        )
+        return response.json()  # type: ignore[no-any-return]
+
+    def test_trace(self, strawberry: Fruit) -> None:
+        """Test phases and resolvers are timed and SQL is counted."""
+        tracing = self.execute_query(QUERY)["extensions"]["tracing"]
+
+        assert tracing["version"] == 1
+        assert tracing["duration"] > 0
+        for phase in ["parsing", "validation", "execution"]:
+            assert tracing[phase]["startOffset"] >= 0
+            assert 0 <= tracing[phase]["duration"] <= tracing["duration"]
+        resolvers = {
+            tuple(resolver["path"]): resolver
+            for resolver in tracing["execution"]["resolvers"]
+        }
+        assert set(resolvers) == {
+            ("colors",),
+            ("colors", 0, "name"),
+            ("colors", 0, "fruits"),
+            ("colors", 0, "fruits", 0, "name"),
+        }
+        colors = resolvers["colors",]
+        assert (colors["parentType"], colors["fieldName"]) == ("Query", "colors")
+        assert colors["returnType"] == "[Color!]!"
+        # The optimizer prefetches the fruits along with the colors.
+        assert colors["sqlCount"] == tracing["sql"]["count"] == 2
+        assert 0 < colors["sqlDuration"] <= tracing["sql"]["duration"]
+
+    def test_sql_is_charged_to_the_loading_field(self, strawberry: Fruit) -> None:
+        """Test a relation loaded by its own resolver is charged to it."""
+        with DjangoOptimizerExtension.disabled():
+            tracing = self.execute_query(QUERY)["extensions"]["tracing"]
+
+        sql = {
+            tuple(resolver["path"]): resolver["sqlCount"]
+            for resolver in tracing["execution"]["resolvers"]
+            if resolver["sqlCount"]
+        }
+        assert sql == {("colors",): 1, ("colors", 0, "fruits"): 1}
+
+    def test_no_header(self, strawberry: Fruit) -> None:
+        """Test untraced responses carry no trace and time nothing else."""
+        result = self.execute_query(QUERY, trace=False)
+
+        assert "tracing" not in result.get("extensions", {})
+        assert registry.snapshot().histograms.keys() == {
+            ("graphql_operation_duration_seconds", OPERATION),
+        }
+
+    @override_settings(DEBUG=False)
+    def test_header_needs_staff(self, strawberry: Fruit, user: User) -> None:
+        """Test traces are only sent to staff when DEBUG is off."""
+        self.client.force_login(user)
+        assert "tracing" not in self.execute_query(QUERY).get("extensions", {})
+
+        user.is_staff = True
+        user.save()
+        assert "tracing" in self.execute_query(QUERY)["extensions"]
+
+    @override_settings(GRAPHQL_TRACING_SAMPLE_RATE=1.0)
+    def test_sampled_into_histograms(self, strawberry: Fruit) -> None:
+        """Test sampled operations are recorded as metrics instead."""
+        for _ in range(3):
+            result = self.execute_query(QUERY, trace=False)
+            assert "tracing" not in result.get("extensions", {})
+
+        snapshot = registry.snapshot()
+        phase = "graphql_phase_duration_seconds"
+        resolver = "graphql_resolver_duration_seconds"
+        assert snapshot.histograms[phase, (("phase", "operation"),)].count == 3
+        assert snapshot.histograms[phase, (("phase", "execution"),)].count == 3
+        assert snapshot.histograms[resolver, (("field", "Query.colors"),)].count == 3
+        assert snapshot.histograms[resolver, (("field", "Color.name"),)].count == 3
+        assert (
+            snapshot.counters[
+                "graphql_resolver_sql_queries_total", (("field", "Query.colors"),)
+            ]
+            == 6
+        )
@@ -0,0 +1,286 @@
+"""Phase, resolver and SQL timings for GraphQL operations.
+
+:class:`TracingExtension` times parsing, validation and execution, every
+resolver by path, and the SQL each resolver runs.  SQL is attributed
+through an ``execute_wrapper`` installed on every database connection
+(see :mod:`.signals`), which charges each statement to the field whose
+resolver is running in the current context.  Batched loads are charged
+to the field that triggered the batch.
+
+A request carrying the ``GRAPHQL_TRACING_HEADER`` header, sent by a staff
+user or while ``DEBUG`` is on, gets the trace under
+``extensions.tracing``, in the Apollo tracing format plus ``sql`` totals.
+Otherwise ``GRAPHQL_TRACING_SAMPLE_RATE`` of the operations are traced
+into the histograms of :mod:`.metrics`.  Untraced operations only pay
+for a context variable lookup per field and per statement.  Every
+statement is also counted per connection by :func:`.metrics.record_query`.
+"""
+
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from inspect import isawaitable
+from typing import Any
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from .metrics import record_query, registry
+
+
+@dataclass
+class Span:
+    """Timing of one phase or resolver, relative to the operation start."""
+
+    start: int
+    end: int = 0
+    sql_count: int = 0
+    sql_duration: int = 0
+
+    @property
+    def duration(self) -> int:
+        """Return the elapsed nanoseconds."""
+        return self.end - self.start
+
+
+@dataclass
+class ResolverSpan(Span):
+    """Timing of one resolver call."""
+
+    path: list[str | int] = field(default_factory=list)
+    parent_type: str = ""
+    field_name: str = ""
+    return_type: str = ""
+
+
+@dataclass
+class Trace:
+    """Everything recorded for one operation."""
+
+    report: bool
+    started: datetime = field(default_factory=lambda: datetime.now(UTC))
+    origin: int = field(default_factory=time.perf_counter_ns)
+    phases: dict[str, Span] = field(default_factory=dict)
+    resolvers: list[ResolverSpan] = field(default_factory=list)
+    sql: Span = field(default_factory=lambda: Span(0))
+
+    def now(self) -> int:
+        """Return the nanoseconds since the operation started."""
+        return time.perf_counter_ns() - self.origin
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace in the Apollo tracing format."""
+        operation = self.phases["operation"]
+
+        def phase(name: str) -> dict[str, int] | None:
+            span = self.phases.get(name)
+            if span is None:
+                return None
+            return {"startOffset": span.start, "duration": span.duration}
+
+        return {
+            "version": 1,
+            "startTime": self.started.isoformat(),
+            "endTime": (
+                self.started + timedelta(microseconds=operation.end / 1000)
+            ).isoformat(),
+            "duration": operation.duration,
+            "parsing": phase("parsing"),
+            "validation": phase("validation"),
+            "execution": {
+                **(phase("execution") or {}),
+                "resolvers": [
+                    {
+                        "path": span.path,
+                        "parentType": span.parent_type,
+                        "fieldName": span.field_name,
+                        "returnType": span.return_type,
+                        "startOffset": span.start,
+                        "duration": span.duration,
+                        "sqlCount": span.sql_count,
+                        "sqlDuration": span.sql_duration,
+                    }
+                    for span in self.resolvers
+                ],
+            },
+            "sql": {"count": self.sql.sql_count, "duration": self.sql.sql_duration},
+        }
+
+    def observe(self) -> None:
+        """Add the trace to the metrics :data:`~.metrics.registry`."""
+        for name, span in self.phases.items():
+            registry.observe(
+                "graphql_phase_duration_seconds",
+                (("phase", name),),
+                span.duration / 1e9,
+            )
+        for span in self.resolvers:
+            labels = (("field", f"{span.parent_type}.{span.field_name}"),)
+            registry.observe(
+                "graphql_resolver_duration_seconds",
+                labels,
+                span.duration / 1e9,
+            )
+            if span.sql_count:
+                registry.inc(
+                    "graphql_resolver_sql_queries_total",
+                    labels,
+                    span.sql_count,
+                )
+
+
+_trace: ContextVar[Trace | None] = ContextVar("graphql_trace", default=None)
+_span: ContextVar[Span | None] = ContextVar("graphql_trace_span", default=None)
+
+
+def record_sql(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    """Execute wrapper counting the statement and charging it to the resolver."""
+    start = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter_ns() - start
+        record_query(context["connection"], elapsed / 1e9)
+        trace = _trace.get()
+        if trace is not None:
+            trace.sql.sql_count += 1
+            trace.sql.sql_duration += elapsed
+            span = _span.get()
+            if span is not None:
+                span.sql_count += 1
+                span.sql_duration += elapsed
+
+
+def instrument(connection: BaseDatabaseWrapper) -> None:
+    """Install :func:`record_sql` on ``connection``."""
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+def header() -> str:
+    """Return the name of the request header asking for a trace."""
+    name: str = getattr(settings, "GRAPHQL_TRACING_HEADER", "X-GraphQL-Trace")
+    return name
+
+
+def requested(request: HttpRequest | None) -> bool:
+    """Return whether ``request`` carries the tracing header."""
+    return request is not None and bool(request.headers.get(header()))
+
+
+def may_report(request: HttpRequest) -> bool:
+    """Return whether the trace of ``request`` may be sent back."""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_staff)
+
+
+class TracingExtension(SchemaExtension):
+    """Record phase, resolver and SQL timings of traced operations."""
+
+    def on_operation(self) -> Iterator[None]:
+        """Decide whether to trace, and finish the trace afterwards."""
+        ec = self.execution_context
+        request = getattr(ec.context, "request", None)
+        if request is not None and requested(request) and may_report(request):
+            trace = Trace(report=True)
+        elif random.random() < getattr(settings, "GRAPHQL_TRACING_SAMPLE_RATE", 0.0):
+            trace = Trace(report=False)
+        else:
+            yield
+            return
+
+        token = _trace.set(trace)
+        span = trace.phases["operation"] = Span(trace.now())
+        try:
+            yield
+        finally:
+            span.end = trace.now()
+            _trace.reset(token)
+        if trace.report:
+            ec.extensions_results["tracing"] = trace.as_dict()
+        else:
+            trace.observe()
+
+    def _phase(self, name: str) -> Iterator[None]:
+        trace = _trace.get()
+        if trace is None:
+            yield
+            return
+        span = trace.phases[name] = Span(trace.now())
+        try:
+            yield
+        finally:
+            span.end = trace.now()
+
+    def on_parse(self) -> Iterator[None]:
+        """Time parsing."""
+        yield from self._phase("parsing")
+
+    def on_validate(self) -> Iterator[None]:
+        """Time validation."""
+        yield from self._phase("validation")
+
+    def on_execute(self) -> Iterator[None]:
+        """Time execution."""
+        yield from self._phase("execution")
+
+    def resolve(
+        self,
+        _next: Callable[..., Any],
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Time the resolver and charge its SQL to its path."""
+        trace = _trace.get()
+        if trace is None:
+            return _next(root, info, *args, **kwargs)
+
+        span = ResolverSpan(
+            trace.now(),
+            path=list(info.path.as_list()),
+            parent_type=info.parent_type.name,
+            field_name=info.field_name,
+            return_type=str(info.return_type),
+        )
+        trace.resolvers.append(span)
+        token = _span.set(span)
+        try:
+            result = _next(root, info, *args, **kwargs)
+        finally:
+            span.end = trace.now()
+            _span.reset(token)
+        if not isawaitable(result):
+            return result
+
+        async def finish() -> Any:
+            # Runs in the task awaiting the field, so SQL issued while
+            # awaiting is charged to this span too.
+            token = _span.set(span)
+            try:
+                return await result
+            finally:
+                span.end = trace.now()
+                _span.reset(token)
+
+        return finish()
+
+    def get_results(self) -> dict[str, Any]:
+        """Return the trace of a traced request."""
+        tracing = self.execution_context.extensions_results.get("tracing")
+        return {} if tracing is None else {"tracing": tracing}
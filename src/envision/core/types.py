@@ -1,13 +1,15 @@
 """Kudos: https://github.com/strawberry-graphql/strawberry-django/blob/b8fa1c1/examples/django/app/types.py"""
 
-from typing import List, Optional
+from typing import Any, List
 
 from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
 
 import strawberry_django
 from strawberry import auto
 
-from . import models
+from . import fulltext, models, subqueries
+from .fields import LoaderField, count_field
 
 
 # filters
@@ -19,12 +21,30 @@ class FruitFilter:
     name: auto
     color: "ColorFilter"
 
+    @strawberry_django.filter_field
+    def search(
+        self, queryset: QuerySet[Any], value: str, prefix: str
+    ) -> tuple[QuerySet[Any], Q]:
+        """Match names by word prefixes, best matches first."""
+        return fulltext.search(models.Fruit, queryset, value, prefix)
+
 
 @strawberry_django.filters.filter_type(models.Color, lookups=True)
 class ColorFilter:
     id: auto
     name: auto
-    fruits: Optional[FruitFilter] = None
+
+    @strawberry_django.filter_field
+    def fruits(self, value: FruitFilter, prefix: str) -> Q:
+        """Match colors with at least one fruit matching ``value``."""
+        return subqueries.exists(models.Color, "fruits", value, prefix)
+
+    @strawberry_django.filter_field
+    def search(
+        self, queryset: QuerySet[Any], value: str, prefix: str
+    ) -> tuple[QuerySet[Any], Q]:
+        """Match names by word prefixes, best matches first."""
+        return fulltext.search(models.Color, queryset, value, prefix)
 
 
 # order
@@ -51,7 +71,7 @@ class ColorOrder:
 class Fruit:
     id: auto
     name: auto
-    color: "Color"
+    color: "Color" = strawberry_django.field(field_cls=LoaderField)
 
 
 @strawberry_django.type(
@@ -60,7 +80,10 @@ class Fruit:
 class Color:
     id: auto
     name: auto
-    fruits: List[Fruit]
+    fruits: List[Fruit] = strawberry_django.field(
+        ordering=FruitOrder, field_cls=LoaderField
+    )
+    fruitCount: int = count_field(models.Color, "fruits")
 
 
 @strawberry_django.type(get_user_model())
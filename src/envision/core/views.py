@@ -0,0 +1,278 @@
+"""GraphQL views building the per-request :class:`~.context.Context`."""
+
+import json
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase
+from django.views.decorators.http import require_GET
+from lia import AsyncHTTPRequestAdapter, HTTPException, SyncHTTPRequestAdapter
+from strawberry.django import views
+from strawberry.http import GraphQLHTTPResponse, GraphQLRequestData
+from strawberry.types import ExecutionResult
+
+from . import encoding, exporter, metrics, persisted_queries, streams, tracing
+from .context import Context
+from .response_cache import response_cache
+
+
+def copy_sub_response(response: HttpResponseBase, sub_response: HttpResponse) -> None:
+    """Apply the headers, status and cookies resolvers set on ``sub_response``."""
+    for name, value in sub_response.items():
+        response[name] = value
+    if sub_response.status_code:
+        response.status_code = sub_response.status_code
+    for name, cookie in sub_response.cookies.items():
+        response.cookies[name] = cookie
+
+
+class CodecMixin:
+    """Decode requests and encode responses with :func:`~.encoding.codec`.
+
+    Responses are built from the encoded bytes instead of going through
+    the ``str`` that ``encode_json`` returns.
+    """
+
+    def decode_json(self, data: str | bytes) -> object:
+        """Decode a JSON request body or parameter."""
+        return encoding.codec().loads(data)
+
+    def encode_json(self, data: object) -> str:
+        """Encode ``data`` as a JSON string."""
+        return encoding.codec().dumps(data).decode()
+
+    def create_response(
+        self,
+        response_data: GraphQLHTTPResponse | list[GraphQLHTTPResponse],
+        sub_response: HttpResponse,
+    ) -> HttpResponseBase:
+        """Return the JSON response for ``response_data``."""
+        response = HttpResponse(
+            encoding.codec().dumps(response_data),
+            content_type="application/json",
+        )
+        copy_sub_response(response, sub_response)
+        return response
+
+
+class BatchMixin:
+    """Hold batches to ``GRAPHQL_MAX_BATCH_OPERATIONS`` as of each request.
+
+    Strawberry reads the limit from the schema's config, which is fixed
+    once the schema is built.  ``batched`` is set while parsing a batch and
+    copied to the context of its operations, which holds them to the
+    ``GRAPHQL_MAX_BATCH_COST`` budget (see :mod:`.cost`).
+    """
+
+    batched = False
+
+    def _validate_batch_request(
+        self,
+        request_data: list[GraphQLRequestData],
+        protocol: str,
+    ) -> None:
+        max_operations: int | None = getattr(
+            settings, "GRAPHQL_MAX_BATCH_OPERATIONS", None
+        )
+        if max_operations is None:
+            raise HTTPException(400, "Batching is not enabled")
+        if protocol == "multipart-subscription":
+            raise HTTPException(
+                400, "Batching is not supported for multipart subscriptions"
+            )
+        if len(request_data) > max_operations:
+            raise HTTPException(400, "Too many operations")
+
+
+class GraphQLView(BatchMixin, CodecMixin, views.GraphQLView[Context, None]):
+    """Sync GraphQL view with request-scoped loaders and persisted queries."""
+
+    def get_context(self, request: HttpRequest, response: HttpResponse) -> Context:
+        """Return a fresh context for ``request``."""
+        return Context(request=request, response=response)
+
+    def parse_http_body(
+        self,
+        request: SyncHTTPRequestAdapter,
+    ) -> GraphQLRequestData | list[GraphQLRequestData]:
+        """Parse the request, noting whether it is a batch."""
+        data = super().parse_http_body(request)
+        self.batched = isinstance(data, list)
+        return data
+
+    def execute_single(
+        self,
+        request: HttpRequest,
+        request_adapter: SyncHTTPRequestAdapter,
+        sub_response: views.TemporalHttpResponse,
+        context: Context,
+        root_value: None,
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        """Fill in persisted documents before executing ``request_data``."""
+        if persisted_queries.uses_store(request_data):
+            try:
+                request_data = persisted_queries.resolve(request_data)
+            except persisted_queries.PersistedQueryError as error:
+                return error.as_result()
+        context.batched = self.batched
+        return super().execute_single(
+            request,
+            request_adapter,
+            sub_response,
+            context,
+            root_value,
+            request_data,
+        )
+
+
+class AsyncGraphQLView(BatchMixin, CodecMixin, views.AsyncGraphQLView[Context, None]):
+    """Async GraphQL view with request-scoped loaders and persisted queries.
+
+    Operations with ``@stream`` lists or ``@defer`` fragments are answered
+    as ``multipart/mixed`` when the client accepts it (see :mod:`.streams`).
+    Django creates a view per request, which carries the pending payloads
+    from execution to the response.
+    """
+
+    incremental = False
+    pending: Sequence[streams.Incremental] = ()
+
+    async def get_context(
+        self,
+        request: HttpRequest,
+        response: HttpResponse,
+    ) -> Context:
+        """Return a fresh context for ``request``."""
+        if response_cache.alias is not None or tracing.requested(request):
+            # The response cache keys on the user and traces are only sent
+            # to staff; the user cannot be loaded lazily in the event loop.
+            request.user = await request.auser()
+        return Context(request=request, response=response)
+
+    async def parse_http_body(
+        self,
+        request: AsyncHTTPRequestAdapter,
+    ) -> GraphQLRequestData | list[GraphQLRequestData]:
+        """Parse the request, noting whether it is a batch or may be streamed."""
+        data = await super().parse_http_body(request)
+        self.batched = isinstance(data, list)
+        # A batch is answered with one JSON array.
+        self.incremental = not self.batched and streams.accepted(request.headers)
+        return data
+
+    async def execute_single(
+        self,
+        request: HttpRequest,
+        request_adapter: AsyncHTTPRequestAdapter,
+        sub_response: views.TemporalHttpResponse,
+        context: Context,
+        root_value: None,
+        request_data: GraphQLRequestData,
+    ) -> ExecutionResult:
+        """Fill in persisted documents before executing ``request_data``."""
+        if persisted_queries.uses_store(request_data):
+            try:
+                request_data = await sync_to_async(persisted_queries.resolve)(
+                    request_data,
+                )
+            except persisted_queries.PersistedQueryError as error:
+                return error.as_result()
+        context.batched = self.batched
+        context.incremental = self.incremental
+        result = await super().execute_single(
+            request,
+            request_adapter,
+            sub_response,
+            context,
+            root_value,
+            request_data,
+        )
+        if result.data is not None:
+            self.pending = context.streams
+        return result
+
+    def create_response(
+        self,
+        response_data: GraphQLHTTPResponse | list[GraphQLHTTPResponse],
+        sub_response: HttpResponse,
+    ) -> HttpResponseBase:
+        """Return the JSON response, or the multipart one of a stream."""
+        if not self.pending:
+            return super().create_response(response_data, sub_response)
+        assert isinstance(response_data, dict)
+        response = StreamingHttpResponse(self.stream(response_data))
+        copy_sub_response(response, sub_response)
+        response["Content-Type"] = 'multipart/mixed; boundary="-"'
+        return response
+
+    def encode_multipart_data(self, data: Any, separator: str) -> str:
+        """Encode one part of a multipart response.
+
+        Unlike strawberry's, the ``Content-Length`` counts bytes, which
+        differ from characters once the JSON holds non-ASCII text.
+        """
+        encoded = encoding.codec().dumps(data)
+        return "".join(
+            [
+                "\r\n",
+                "Content-Type: application/json; charset=utf-8\r\n",
+                f"Content-Length: {len(encoded)}\r\n",
+                "\r\n",
+                encoded.decode(),
+                f"\r\n--{separator}",
+            ]
+        )
+
+    async def stream(self, initial: GraphQLHTTPResponse) -> AsyncIterator[str]:
+        """Yield the parts of the multipart response, as rows are fetched."""
+        payload: dict[str, Any] = {
+            **initial,
+            "pending": [stream.pending for stream in self.pending],
+            "hasNext": True,
+        }
+        yield "---"
+        yield self.encode_multipart_data(payload, "-")
+        async for payload in streams.subsequent(self.pending):
+            yield self.encode_multipart_data(payload, "-")
+        yield "--\r\n"
+
+
+@require_GET
+def export(request: HttpRequest, name: str, fmt: str) -> HttpResponseBase:
+    """Stream all ``fruits`` or ``colors`` as NDJSON or CSV.
+
+    The optional ``filters`` query parameter holds a JSON ``FruitFilter``
+    or ``ColorFilter`` value.
+    """
+    try:
+        filters = json.loads(request.GET.get("filters") or "null")
+        lines = exporter.export(name, fmt, filters)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    # Under ASGI a sync iterator would be read to the end before sending.
+    size = exporter.BATCH_SIZE
+    content = (
+        exporter.abatches(lines, size)
+        if isinstance(request, ASGIRequest)
+        else exporter.batches(lines, size)
+    )
+    response = StreamingHttpResponse(content, content_type=exporter.FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    return response
+
+
+@require_GET
+def export_metrics(request: HttpRequest) -> HttpResponse:
+    """Return the metrics of every worker in the Prometheus text format."""
+    snapshot = metrics.registry.collect()
+    return HttpResponse(metrics.render(snapshot), content_type=metrics.CONTENT_TYPE)
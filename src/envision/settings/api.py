@@ -0,0 +1,24 @@
+"""Settings for API-only GraphQL traffic.
+
+Select them with ``DJANGO_SETTINGS_MODULE=envision.settings.api``;
+``production`` builds on them.  Sessions live in signed cookies, so
+reading one needs no query, and the user is loaded by
+:class:`~envision.core.middleware.LazyUserMiddleware` only when asked for.
+Signed-cookie sessions cannot be revoked on the server before they
+expire; ``cached_db`` sessions can, at a cache lookup per request.
+"""
+
+from .base import *  # noqa: F403
+from .base import MIDDLEWARE
+
+SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
+SESSION_COOKIE_HTTPONLY = True
+
+MIDDLEWARE = [
+    (
+        "envision.core.middleware.LazyUserMiddleware"
+        if middleware == "django.contrib.auth.middleware.AuthenticationMiddleware"
+        else middleware
+    )
+    for middleware in MIDDLEWARE
+]
@@ -60,12 +60,32 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "envision.wsgi.application"
+ASGI_APPLICATION = "envision.asgi.application"
 
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    # Copy of the primary, read by query operations once it is listed in
+    # GRAPHQL_READ_DATABASES.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "replica.sqlite3",
+    },
+}
+
+DATABASE_ROUTERS = ["envision.core.routers.ReplicaRouter"]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "persisted_queries": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "persisted-queries",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
 }
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -79,3 +99,76 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = "static/"
+
+# GraphQL
+
+# Parsed and validated documents kept in memory, keyed by query hash.
+GRAPHQL_DOCUMENT_CACHE_SIZE = 256
+
+# Budgets enforced before execution; ``None`` disables a check. Lists
+# without a ``pagination.limit``/``first``/``last`` count as this many items.
+GRAPHQL_MAX_QUERY_DEPTH = 10
+GRAPHQL_MAX_QUERY_COST = 10_000
+GRAPHQL_DEFAULT_LIST_SIZE = 20
+
+# Batched requests: a JSON array of up to this many operations, executed
+# concurrently by the async view with one shared context (loaders and
+# cost budget included); ``None`` disables batching. Operations of a batch
+# are not ordered, so a query may not see a mutation sent alongside it.
+GRAPHQL_MAX_BATCH_OPERATIONS = 10
+GRAPHQL_MAX_BATCH_COST = 20_000
+
+# Rows read per query and sent per payload for root lists marked @stream.
+GRAPHQL_STREAM_CHUNK_SIZE = 100
+
+# JSON codec of the GraphQL views, "orjson" or "json"; None uses orjson
+# when it is installed (the ``orjson`` extra). orjson writes compact UTF-8,
+# json the ASCII-escaped output of strawberry's views.
+GRAPHQL_JSON_CODEC = None
+
+# Response cache for queries; set to a CACHES alias to enable it. Entries
+# are dropped when a Fruit or Color they may include is saved or deleted.
+GRAPHQL_RESPONSE_CACHE = None
+GRAPHQL_RESPONSE_CACHE_TIMEOUT = 300
+
+# Database aliases query operations read from, picked at random per
+# operation; empty reads from "default". After a mutation the rest of the
+# request, and the client's requests for PIN_PRIMARY_SECONDS, read from
+# "default" to see their own writes.
+GRAPHQL_READ_DATABASES: list[str] = []
+GRAPHQL_PIN_PRIMARY_SECONDS = 5
+GRAPHQL_PIN_PRIMARY_COOKIE = "pin-primary"
+
+# Rows per INSERT/UPDATE/DELETE statement in the bulk list mutations.
+GRAPHQL_BULK_BATCH_SIZE = 500
+
+# Automatic persisted queries. Point the cache at a FileBasedCache to share
+# documents between processes; with the allow-list enabled only documents
+# added by ``manage.py register_queries`` are executed.
+GRAPHQL_PERSISTED_QUERIES_CACHE = "persisted_queries"
+GRAPHQL_PERSISTED_QUERIES_TIMEOUT = None
+GRAPHQL_PERSISTED_QUERIES_ALLOWLIST = False
+
+# Tracing. Requests with this header get phase, resolver and SQL timings
+# under ``extensions.tracing`` while DEBUG is on or the user is staff; this
+# share of other operations is timed into the /metrics histograms.
+GRAPHQL_TRACING_HEADER = "X-GraphQL-Trace"
+GRAPHQL_TRACING_SAMPLE_RATE = 0.0
+
+# Read ``Color.fruitCount`` from the trigger-maintained ``fruit_count``
+# column instead of counting fruits (SQLite only).
+GRAPHQL_COUNTER_COLUMNS = False
+
+# Prometheus metrics served at /metrics. Under a multi-process server, point
+# this at a directory shared by the workers and emptied before they start;
+# each writes its counters there at most every FLUSH_INTERVAL seconds.
+GRAPHQL_METRICS_DIR = None
+GRAPHQL_METRICS_FLUSH_INTERVAL = 1.0
+# Operation names beyond this many are counted as "other".
+GRAPHQL_METRICS_MAX_OPERATIONS = 100
+
+# Threads hashing passwords for ``register`` off the database thread, and
+# how many passwords may wait for them before registrations are refused.
+# 0 hashes inline.
+GRAPHQL_PASSWORD_WORKERS = 2
+GRAPHQL_PASSWORD_QUEUE = 8
@@ -0,0 +1,77 @@
+"""Settings for serving envision in production.
+
+Select them with ``DJANGO_SETTINGS_MODULE=envision.settings.production``.
+They build on the API-only ``api`` profile.  The secret key and the
+allowed hosts are read from ``DJANGO_SECRET_KEY``, which must be set, and
+``DJANGO_ALLOWED_HOSTS`` (comma separated).
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .api import *  # noqa: F403
+from .api import DATABASES
+
+# Without DEBUG, Django no longer keeps every SQL string it ran in memory.
+DEBUG = False
+
+try:
+    SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+except KeyError:
+    msg = "Set the DJANGO_SECRET_KEY environment variable."
+    raise ImproperlyConfigured(msg) from None
+ALLOWED_HOSTS = [
+    host for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host
+]
+
+# Applied to every new SQLite connection. With WAL, readers no longer wait
+# for writers; NORMAL only syncs at checkpoints, which is safe in WAL mode.
+# Writers wait up to busy_timeout ms for the lock, and IMMEDIATE takes it
+# at BEGIN, so a read transaction is never refused its upgrade to a write.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 2**20,
+    "busy_timeout": 5_000,
+}
+
+DATABASES = {
+    alias: {
+        **database,
+        # Reuse connections for 10 minutes, checking them before each request.
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": "".join(
+                f"PRAGMA {name}={value};" for name, value in SQLITE_PRAGMAS.items()
+            ),
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+    for alias, database in DATABASES.items()
+}
+
+# Templates are compiled once per process.
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+            ],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+]